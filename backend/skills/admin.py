@@ -1,8 +1,52 @@
+from django import forms
 from django.contrib import admin
-from .models import Skill
+from skillswap_backend.pagination import EstimatedCountPaginator
+from .models import Skill, SkillAlias, normalize_name
+from .search import matching_skills
+
+class SkillAdminForm(forms.ModelForm):
+    class Meta:
+        model = Skill
+        fields = '__all__'
+
+    def clean_name(self):
+        """Reject a name that is already another skill's name or alias; those are merged, not renamed."""
+        name = self.cleaned_data['name']
+        key = normalize_name(name)
+        existing = Skill.objects.filter(normalized_name=key).exclude(pk=self.instance.pk).first()
+        if existing is None:
+            alias = SkillAlias.objects.select_related('skill').filter(alias=key).exclude(skill_id=self.instance.pk).first()
+            existing = alias.skill if alias else None
+        if existing is not None:
+            raise forms.ValidationError(
+                f'"{existing.name}" (id {existing.pk}) already has this name. To combine the two skills, merge this '
+                f'one into it with POST /api/skills/admin/merge/ or `python manage.py dedup_skills`.'
+            )
+        return name
 
 @admin.register(Skill)
 class SkillAdmin(admin.ModelAdmin):
-    list_display = ['name']
+    form = SkillAdminForm
+    # Kept by skills.counters; Skill.save() never writes them back
+    readonly_fields = Skill.COUNTER_FIELDS
+    list_display = ['name', 'level', 'offered_count', 'wanted_count', 'swap_count', 'created_at']
     search_fields = ['name']
-    ordering = ['name'] 
\ No newline at end of file
+    # normalized_name is unique, so this ordering is an index scan
+    ordering = ['normalized_name']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_search_results(self, request, queryset, search_term):
+        # Also serves the user and swap autocomplete widgets, through the trigram index
+        if not search_term.strip():
+            return queryset, False
+        return queryset.filter(id__in=matching_skills(search_term).values('id')), False
+
+@admin.register(SkillAlias)
+class SkillAliasAdmin(admin.ModelAdmin):
+    list_display = ['alias', 'skill']
+    list_select_related = ['skill']
+    search_fields = ['alias']
+    autocomplete_fields = ['skill']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
@@ -0,0 +1,61 @@
+"""
+Cached public skill catalog.
+
+The full catalog is stored in Django's cache as a prebuilt JSON body plus
+its ETag, under a key that includes a catalog version. Any Skill save or
+delete bumps the version (see signals.py), so the next request rebuilds the
+body once and every other request is served without touching the database.
+Usage counters are left out of the body (CatalogSkillSerializer): they
+change far more often than skills do, through UPDATEs that skip signals.
+"""
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.renderers import JSONRenderer
+
+from .models import Skill
+from .serializers import CatalogSkillSerializer
+
+VERSION_KEY = 'skills:catalog:version'
+
+
+def catalog_version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, 1, timeout=None)
+        version = cache.get(VERSION_KEY, 1)
+    return version
+
+
+def bump_catalog_version():
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        # Nothing cached yet; start a fresh version sequence
+        cache.add(VERSION_KEY, 1, timeout=None)
+
+
+def build_catalog():
+    """Serialize every skill; returns (body, etag)."""
+    body = JSONRenderer().render(CatalogSkillSerializer(Skill.objects.order_by('id'), many=True).data)
+    etag = '"%s"' % hashlib.sha1(body).hexdigest()
+    return body, etag
+
+
+def get_catalog():
+    """(body, etag) for the current catalog version, building it on a miss."""
+    key = f'skills:catalog:{catalog_version()}'
+    cached = cache.get(key)
+    if cached is None:
+        cached = build_catalog()
+        cache.set(key, cached, timeout=settings.SKILL_CATALOG_TTL)
+    return cached
+
+
+def etag_matches(if_none_match, etag):
+    """True if an If-None-Match header value covers `etag`."""
+    if not if_none_match:
+        return False
+    candidates = [value.strip() for value in if_none_match.split(',')]
+    return '*' in candidates or any(value.removeprefix('W/') == etag for value in candidates)
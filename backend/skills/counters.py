@@ -0,0 +1,185 @@
+"""
+Per-skill supply, demand and swap counters.
+
+The m2m_changed receivers in signals.py turn every change to a user's
+offered/wanted skills or a swap's skills into {skill_id: delta} maps, and
+the functions here apply them as F-expression UPDATEs: the running counters
+on Skill plus today's SkillDailyStats row. Trending skills are read from
+those daily rollups, never from the M2M tables.
+
+counter_updates() rebuilds every counter from the source tables and backs
+the rebuild_skill_counters command and skill merges.
+"""
+from collections import defaultdict
+from datetime import timedelta
+
+from django.apps import apps as global_apps
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Exists, F, FloatField, IntegerField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Cast, Coalesce, NullIf, Round
+from django.db.models.lookups import GreaterThan
+from django.utils import timezone
+
+from .models import Skill, SkillDailyStats
+
+# kind -> (counter, flag, rollup column)
+HOLDER_KINDS = {
+    'offered': ('offered_count', 'is_offered', 'offered_delta'),
+    'wanted': ('wanted_count', 'is_wanted', 'wanted_delta'),
+}
+TRENDING_KINDS = {
+    # Net new demand in the window
+    'demand': F('wanted'),
+    # Net new demand not met by new supply in the window
+    'undersupplied': F('wanted') - F('offered'),
+}
+TRENDING_WINDOWS = (1, 7, 30, 90)
+
+
+def _by_delta(skill_deltas):
+    grouped = defaultdict(list)
+    for skill_id, delta in skill_deltas.items():
+        if delta:
+            grouped[delta].append(skill_id)
+    return grouped.items()
+
+
+def _record_activity(column, skill_deltas):
+    today = timezone.localdate()
+    SkillDailyStats.objects.bulk_create(
+        [SkillDailyStats(skill_id=skill_id, day=today) for skill_id, delta in skill_deltas.items() if delta],
+        ignore_conflicts=True,
+    )
+    for delta, skill_ids in _by_delta(skill_deltas):
+        SkillDailyStats.objects.filter(skill_id__in=skill_ids, day=today).update(**{column: F(column) + delta})
+
+
+def adjust_holders(kind, skill_deltas):
+    """Apply {skill_id: delta} to the users-offering or users-wanting counters."""
+    counter, flag, column = HOLDER_KINDS[kind]
+    for delta, skill_ids in _by_delta(skill_deltas):
+        Skill.objects.filter(id__in=skill_ids).update(**{
+            counter: F(counter) + delta,
+            'popularity': F('popularity') + delta,
+            # Right-hand sides see the old count, so new > 0 means old > -delta
+            flag: GreaterThan(F(counter), -delta),
+        })
+    _record_activity(column, skill_deltas)
+
+
+def adjust_swaps(skill_deltas):
+    """Apply {skill_id: delta} to the swap/skill link counters."""
+    for delta, skill_ids in _by_delta(skill_deltas):
+        Skill.objects.filter(id__in=skill_ids).update(swap_count=F('swap_count') + delta)
+    _record_activity('swaps_delta', skill_deltas)
+
+
+def swap_skill_ids(swap_id):
+    from swaps.models import SwapRequest
+
+    offered = SwapRequest.skills_offered.through.objects.filter(swaprequest_id=swap_id).values_list('skill_id', flat=True)
+    wanted = SwapRequest.skills_wanted.through.objects.filter(swaprequest_id=swap_id).values_list('skill_id', flat=True)
+    return set(offered) | set(wanted)
+
+
+def record_swap_rating(swap_id, value):
+    """Fold a new rating of a swap into the average of every skill it involves."""
+    Skill.objects.filter(id__in=swap_skill_ids(swap_id)).update(
+        rating=Round(Cast(F('swap_rating_sum') + value, FloatField()) / (F('swap_rating_count') + 1), 2),
+        swap_rating_sum=F('swap_rating_sum') + value,
+        swap_rating_count=F('swap_rating_count') + 1,
+    )
+
+
+def unrecord_swap_rating(swap_id, value):
+    """Take a deleted rating of a swap back out of its skills' averages."""
+    remaining = F('swap_rating_count') - 1
+    Skill.objects.filter(id__in=swap_skill_ids(swap_id), swap_rating_count__gt=0).update(
+        rating=Coalesce(Round(Cast(F('swap_rating_sum') - value, FloatField()) / NullIf(remaining, 0), 2), Value(0.0)),
+        swap_rating_sum=F('swap_rating_sum') - value,
+        swap_rating_count=remaining,
+    )
+
+
+def _count(queryset):
+    rows = queryset.order_by().annotate(group=Value(1)).values('group').annotate(total=Count('*')).values('total')
+    return Coalesce(Subquery(rows, output_field=IntegerField()), Value(0))
+
+
+def counter_updates(apps=global_apps):
+    """Keyword arguments for Skill.objects.update() that recompute every counter from scratch."""
+    User = apps.get_model('users', 'User')
+    SwapRequest = apps.get_model('swaps', 'SwapRequest')
+    Rating = apps.get_model('swaps', 'Rating')
+    skill = OuterRef('pk')
+
+    offered = _count(User.skills_offered.through.objects.filter(skill_id=skill))
+    wanted = _count(User.skills_wanted.through.objects.filter(skill_id=skill))
+    swap_links = (
+        _count(SwapRequest.skills_offered.through.objects.filter(skill_id=skill)) +
+        _count(SwapRequest.skills_wanted.through.objects.filter(skill_id=skill))
+    )
+
+    # Ratings of swaps that involve the skill on either side, each counted once
+    rated = Rating.objects.filter(
+        Exists(SwapRequest.skills_offered.through.objects.filter(
+            swaprequest_id=OuterRef('swap_request_id'), skill_id=OuterRef(skill))) |
+        Exists(SwapRequest.skills_wanted.through.objects.filter(
+            swaprequest_id=OuterRef('swap_request_id'), skill_id=OuterRef(skill)))
+    ).order_by().annotate(group=Value(1)).values('group')
+    rating_sum = Coalesce(Subquery(rated.annotate(total=Sum('rating')).values('total'), output_field=IntegerField()), Value(0))
+    rating_count = Coalesce(Subquery(rated.annotate(total=Count('*')).values('total'), output_field=IntegerField()), Value(0))
+
+    return {
+        'offered_count': offered,
+        'wanted_count': wanted,
+        'popularity': offered + wanted,
+        'is_offered': GreaterThan(offered, 0),
+        'is_wanted': GreaterThan(wanted, 0),
+        'swap_count': swap_links,
+        'swap_rating_sum': rating_sum,
+        'swap_rating_count': rating_count,
+        'rating': Coalesce(Round(Cast(rating_sum, FloatField()) / NullIf(rating_count, 0), 2), Value(0.0)),
+    }
+
+
+def recount_skills(skill_ids):
+    Skill.objects.filter(id__in=skill_ids).update(**counter_updates())
+
+
+def trending_skills(kind='demand', window=7, limit=10):
+    """
+    Skills with the largest net change over the last `window` days.
+
+    Sums at most window × active-skills rollup rows, and the result is
+    cached for TRENDING_CACHE_SECONDS.
+    """
+    key = f'skills:trending:{kind}:{window}:{limit}:{timezone.localdate()}'
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+
+    since = timezone.localdate() - timedelta(days=window - 1)
+    rows = (
+        SkillDailyStats.objects.filter(day__gte=since)
+        .values('skill_id', 'skill__name')
+        .order_by()
+        .annotate(offered=Sum('offered_delta'), wanted=Sum('wanted_delta'), swaps=Sum('swaps_delta'))
+        .annotate(score=TRENDING_KINDS[kind])
+        .filter(score__gt=0)
+        .order_by('-score', 'skill_id')[:limit]
+    )
+    result = [
+        {
+            'id': row['skill_id'],
+            'name': row['skill__name'],
+            'score': row['score'],
+            'offered': row['offered'],
+            'wanted': row['wanted'],
+            'swaps': row['swaps'],
+        }
+        for row in rows
+    ]
+    cache.set(key, result, timeout=settings.TRENDING_CACHE_SECONDS)
+    return result
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from skills.registry import MERGE_BATCH_SIZE, dedup_skills, duplicate_groups
+
+
+class Command(BaseCommand):
+    help = 'Merge skills whose names collide under the current normalization rules'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='List duplicate groups without merging')
+        parser.add_argument('--batch-size', type=int, default=MERGE_BATCH_SIZE,
+                            help='Owner ids per through-table rewrite')
+
+    def handle(self, *args, **options):
+        if options['dry_run']:
+            groups = duplicate_groups()
+            for key, ids in groups.items():
+                self.stdout.write(f'{key!r}: keep {ids[0]}, merge {ids[1:]}')
+            self.stdout.write(f'{len(groups)} duplicate groups')
+            return
+
+        def progress(key, ids):
+            self.stdout.write(f'Merged {ids[1:]} into {ids[0]} ({key!r})')
+
+        removed = dedup_skills(batch_size=options['batch_size'], progress=progress)
+        self.stdout.write(self.style.SUCCESS(f'Removed {removed} duplicate skills'))
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Max
+
+from skills.counters import recount_skills
+from skills.models import Skill
+
+
+class Command(BaseCommand):
+    help = 'Recompute per-skill supply, demand, swap and rating counters from the source tables'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        last_id = Skill.objects.aggregate(last=Max('id'))['last'] or 0
+        for start in range(1, last_id + 1, batch_size):
+            recount_skills(Skill.objects.filter(id__gte=start, id__lt=start + batch_size).values('id'))
+            self.stdout.write(f'Recounted skills up to id {min(start + batch_size - 1, last_id)}')
+        self.stdout.write(self.style.SUCCESS('Skill counters rebuilt'))
@@ -0,0 +1,64 @@
+# Generated by Django 5.1.1 on 2026-10-18 12:10
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_search_fields(apps, schema_editor):
+    from skills.models import normalize_name
+
+    Skill = apps.get_model('skills', 'Skill')
+    User = apps.get_model('users', 'User')
+
+    skills = list(Skill.objects.only('id', 'name'))
+    for skill in skills:
+        skill.normalized_name = normalize_name(skill.name)
+    Skill.objects.bulk_update(skills, ['normalized_name'], batch_size=1000)
+
+    def holders(through):
+        rows = (
+            through.objects.filter(skill_id=OuterRef('pk'))
+            .order_by()
+            .values('skill_id')
+            .annotate(total=Count('*'))
+            .values('total')
+        )
+        return Coalesce(Subquery(rows, output_field=IntegerField()), Value(0))
+
+    Skill.objects.update(popularity=holders(User.skills_offered.through) + holders(User.skills_wanted.through))
+
+
+def install_search_index(apps, schema_editor):
+    from skills.search import install_search_index
+
+    install_search_index(schema_editor.connection.alias, rebuild=True)
+
+
+def drop_search_index(apps, schema_editor):
+    from skills.search import drop_search_index
+
+    drop_search_index(schema_editor.connection.alias)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('skills', '0002_alter_skill_options_skill_description_and_more'),
+        ('users', '0008_rating_aggregates'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='skill',
+            name='normalized_name',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=100),
+        ),
+        migrations.AddField(
+            model_name='skill',
+            name='popularity',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_search_fields, migrations.RunPython.noop),
+        migrations.RunPython(install_search_index, drop_search_index),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.1.1 on 2026-10-18 12:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def merge_duplicates(apps, schema_editor):
+    from skills.registry import dedup_skills
+
+    dedup_skills(apps=apps)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('skills', '0003_skill_search'),
+        ('swaps', '0005_swaprequest_inbox_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SkillAlias',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('alias', models.CharField(max_length=100, unique=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('skill', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='aliases', to='skills.skill')),
+            ],
+        ),
+        # Duplicates must be merged before the key can be unique
+        migrations.RunPython(merge_duplicates, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='skill',
+            name='normalized_name',
+            field=models.CharField(editable=False, max_length=100, unique=True),
+        ),
+    ]
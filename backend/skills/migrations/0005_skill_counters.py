@@ -0,0 +1,61 @@
+# Generated by Django 5.1.1 on 2026-10-18 12:14
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_counters(apps, schema_editor):
+    from skills.counters import counter_updates
+
+    apps.get_model('skills', 'Skill').objects.update(**counter_updates(apps))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('skills', '0004_skill_registry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='skill',
+            name='offered_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='skill',
+            name='swap_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='skill',
+            name='swap_rating_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='skill',
+            name='swap_rating_sum',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='skill',
+            name='wanted_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name='SkillDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('offered_delta', models.IntegerField(default=0)),
+                ('wanted_delta', models.IntegerField(default=0)),
+                ('swaps_delta', models.IntegerField(default=0)),
+                ('skill', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='skills.skill')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['day', 'skill'], name='skill_daily_stats_day_idx')],
+                'constraints': [models.UniqueConstraint(fields=('skill', 'day'), name='skill_daily_stats_unique')],
+            },
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
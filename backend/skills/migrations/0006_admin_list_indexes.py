@@ -0,0 +1,21 @@
+# Generated by Django 5.1.1 on 2026-10-18 13:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('skills', '0005_skill_counters'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='skill',
+            index=models.Index(fields=['popularity', 'id'], name='skill_popularity_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='skill',
+            index=models.Index(fields=['created_at', 'id'], name='skill_created_idx'),
+        ),
+    ]
@@ -0,0 +1,20 @@
+from django.db import migrations
+
+
+def rebuild_search_index(apps, schema_editor):
+    from skills.search import drop_search_index, install_search_index
+
+    # The FTS table gains a description column; recreate it with its triggers
+    drop_search_index(schema_editor.connection.alias)
+    install_search_index(schema_editor.connection.alias, rebuild=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('skills', '0006_admin_list_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(rebuild_search_index, migrations.RunPython.noop),
+    ]
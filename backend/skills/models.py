@@ -1,19 +1,91 @@
 from django.db import models
 from django.conf import settings
 
+
+def normalize_name(name):
+    """Case- and whitespace-insensitive form of a skill name."""
+    return ' '.join(name.split()).casefold()
+
+
 class Skill(models.Model):
+    COUNTER_FIELDS = (
+        'offered_count', 'wanted_count', 'popularity', 'swap_count',
+        'swap_rating_sum', 'swap_rating_count', 'is_offered', 'is_wanted', 'rating',
+    )
+
     name = models.CharField(max_length=100)
+    # Canonical key and prefix search column; always normalize_name(name)
+    normalized_name = models.CharField(max_length=100, unique=True, editable=False)
     level = models.CharField(max_length=50, blank=True, null=True)
-    is_offered = models.BooleanField(default=False)
-    is_wanted = models.BooleanField(default=False)
-    rating = models.FloatField(default=0)
+
+    # Counters kept by skills.counters from M2M changes and ratings
+    offered_count = models.PositiveIntegerField(default=0)  # users offering
+    wanted_count = models.PositiveIntegerField(default=0)  # users wanting
+    popularity = models.PositiveIntegerField(default=0)  # offered_count + wanted_count
+    swap_count = models.PositiveIntegerField(default=0)  # swap/skill links
+    swap_rating_sum = models.PositiveIntegerField(default=0)
+    swap_rating_count = models.PositiveIntegerField(default=0)
+    is_offered = models.BooleanField(default=False)  # offered_count > 0
+    is_wanted = models.BooleanField(default=False)  # wanted_count > 0
+    rating = models.FloatField(default=0)  # average rating of swaps involving the skill
     description = models.TextField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # Admin list orderings
+            models.Index(fields=['popularity', 'id'], name='skill_popularity_idx'),
+            models.Index(fields=['created_at', 'id'], name='skill_created_idx'),
+        ]
+
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        self.normalized_name = normalize_name(self.name)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'name' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'normalized_name'}
+        elif update_fields is None and not self._state.adding:
+            # Never write back counters loaded earlier; they move by atomic UPDATEs
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.COUNTER_FIELDS
+            ]
+        super().save(*args, **kwargs)
+
+class SkillAlias(models.Model):
+    """A normalized name that resolves to a different, canonical skill."""
+    alias = models.CharField(max_length=100, unique=True)
+    skill = models.ForeignKey(Skill, on_delete=models.CASCADE, related_name='aliases')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.alias} -> {self.skill}"
+
+class SkillDailyStats(models.Model):
+    """
+    Per-skill, per-day net changes, the rollup behind trending skills.
+    Incremented by skills.counters alongside the running counters.
+    """
+    skill = models.ForeignKey(Skill, on_delete=models.CASCADE, related_name='daily_stats')
+    day = models.DateField()
+    offered_delta = models.IntegerField(default=0)
+    wanted_delta = models.IntegerField(default=0)
+    swaps_delta = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['skill', 'day'], name='skill_daily_stats_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['day', 'skill'], name='skill_daily_stats_day_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.skill_id} on {self.day}"
+
 class Swap(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     skill = models.ForeignKey(Skill, on_delete=models.CASCADE)
@@ -0,0 +1,188 @@
+"""
+Canonical skill registry.
+
+Every skill has a unique normalized_name (see normalize_name), and
+SkillAlias maps the normalized names of merged-away skills onto the skill
+that absorbed them. resolve_skill() is the one way user input becomes a
+Skill: it returns the canonical row for any spelling and never creates a
+duplicate, even under concurrent inserts.
+
+merge_skills() folds duplicates into one skill. It rewrites every
+many-to-many through table that points at Skill (users, profiles, swaps)
+with set-based statements in owner-id windows, repoints plain foreign keys,
+records aliases and deletes the merged rows. The tables are discovered from
+the app registry, so migrations can run the same code on historical models.
+"""
+from django.apps import apps as global_apps
+from django.db import IntegrityError, transaction
+from django.db.models import F, Max, Min, Sum
+from django.dispatch import Signal
+
+from .models import normalize_name
+
+MERGE_BATCH_SIZE = 5000
+
+# Sent after a merge commits, with `target` (the surviving Skill) and `source_ids`
+skills_merged = Signal()
+
+
+def resolve_skill(name, defaults=None):
+    """Return (skill, created) for `name`, matching any spelling or alias of an existing skill."""
+    from .models import Skill, SkillAlias
+
+    key = normalize_name(name or '')
+    if not key:
+        raise ValueError('Skill name is required')
+    skill = Skill.objects.filter(normalized_name=key).first()
+    if skill is None:
+        alias = SkillAlias.objects.select_related('skill').filter(alias=key).first()
+        skill = alias.skill if alias else None
+    if skill is not None:
+        return skill, False
+    try:
+        with transaction.atomic():
+            return Skill.objects.create(name=' '.join(name.split()), **(defaults or {})), True
+    except IntegrityError:
+        # Lost a race with a concurrent insert of the same name
+        return Skill.objects.get(normalized_name=key), False
+
+
+def skill_references(apps=global_apps):
+    """
+    Every table holding a foreign key to Skill.
+
+    Returns (through_tables, foreign_keys): through_tables are
+    (model, skill_column, owner_column) for auto-created M2M tables,
+    foreign_keys are (model, skill_column) for everything else.
+    """
+    Skill = apps.get_model('skills', 'Skill')
+    through_tables, foreign_keys = [], []
+    for model in apps.get_models(include_auto_created=True):
+        skill_fields = [
+            field for field in model._meta.local_fields
+            if field.many_to_one and field.related_model is Skill
+        ]
+        for field in skill_fields:
+            if model._meta.auto_created:
+                owner = next(other for other in model._meta.local_fields if other.many_to_one and other is not field)
+                through_tables.append((model, field.attname, owner.attname))
+            else:
+                foreign_keys.append((model, field.attname))
+    return through_tables, foreign_keys
+
+
+def _merge_through(model, skill_column, owner_column, source_ids, target_id, batch_size):
+    rows = model.objects.filter(**{f'{skill_column}__in': source_ids})
+    bounds = rows.aggregate(first=Min(owner_column), last=Max(owner_column))
+    if bounds['first'] is None:
+        return
+    start = bounds['first']
+    while start <= bounds['last']:
+        window = {f'{owner_column}__gte': start, f'{owner_column}__lt': start + batch_size}
+        moving = rows.filter(**window)
+        with transaction.atomic():
+            # Owners that already hold the target just lose the duplicate rows
+            holders = model.objects.filter(**{skill_column: target_id}, **window).values(owner_column)
+            moving.filter(**{f'{owner_column}__in': holders}).delete()
+            # Owners holding several sources keep one row each
+            keep = moving.values(owner_column).annotate(keep=Min('pk')).values('keep')
+            moving.exclude(pk__in=keep).delete()
+            moving.update(**{skill_column: target_id})
+        start += batch_size
+
+
+def _merge_rollups(model, source_ids, target_id):
+    """Add the sources' daily rollups into the target's rows for the same days."""
+    columns = ('offered_delta', 'wanted_delta', 'swaps_delta')
+    days = (
+        model.objects.filter(skill_id__in=source_ids)
+        .values('day').order_by('day')
+        .annotate(**{column: Sum(column) for column in columns})
+    )
+    for row in days:
+        model.objects.bulk_create([model(skill_id=target_id, day=row['day'])], ignore_conflicts=True)
+        model.objects.filter(skill_id=target_id, day=row['day']).update(
+            **{column: F(column) + row[column] for column in columns}
+        )
+    model.objects.filter(skill_id__in=source_ids).delete()
+
+
+def merge_skills(target, source_ids, apps=global_apps, batch_size=MERGE_BATCH_SIZE):
+    """Fold the skills in `source_ids` into `target` and delete them."""
+    Skill = apps.get_model('skills', 'Skill')
+    SkillAlias = apps.get_model('skills', 'SkillAlias')
+    User = apps.get_model('users', 'User')
+
+    source_ids = [skill_id for skill_id in source_ids if skill_id != target.pk]
+    sources = list(Skill.objects.filter(id__in=source_ids).values_list('id', 'normalized_name'))
+    if not sources:
+        return target
+    source_ids = [skill_id for skill_id, _ in sources]
+
+    through_tables, foreign_keys = skill_references(apps)
+    for model, skill_column, owner_column in through_tables:
+        _merge_through(model, skill_column, owner_column, source_ids, target.pk, batch_size)
+
+    with transaction.atomic():
+        for model, skill_column in foreign_keys:
+            if model._meta.label == 'skills.SkillDailyStats':
+                _merge_rollups(model, source_ids, target.pk)
+                continue
+            model.objects.filter(**{f'{skill_column}__in': source_ids}).update(**{skill_column: target.pk})
+        SkillAlias.objects.bulk_create(
+            [SkillAlias(alias=key, skill_id=target.pk) for _, key in sources if key != target.normalized_name],
+            ignore_conflicts=True,
+        )
+        Skill.objects.filter(id__in=source_ids).delete()
+        Skill.objects.filter(pk=target.pk).update(popularity=(
+            User.skills_offered.through.objects.filter(skill_id=target.pk).count() +
+            User.skills_wanted.through.objects.filter(skill_id=target.pk).count()
+        ))
+
+    if apps is global_apps:
+        from .counters import recount_skills
+
+        recount_skills([target.pk])
+        transaction.on_commit(lambda: skills_merged.send(sender=Skill, target=target, source_ids=source_ids))
+    target.refresh_from_db()
+    return target
+
+
+def duplicate_groups(apps=global_apps):
+    """
+    Skills that collide under the current normalize_name, as lists of ids.
+
+    The first id in each group is the one to keep: the most popular, then
+    the oldest.
+    """
+    Skill = apps.get_model('skills', 'Skill')
+    groups = {}
+    for skill_id, name in Skill.objects.order_by('-popularity', 'id').values_list('id', 'name').iterator():
+        groups.setdefault(normalize_name(name), []).append(skill_id)
+    return {key: ids for key, ids in groups.items() if len(ids) > 1}
+
+
+def dedup_skills(apps=global_apps, batch_size=MERGE_BATCH_SIZE, progress=None):
+    """Merge every duplicate group and refresh stale keys; returns the number of skills removed."""
+    Skill = apps.get_model('skills', 'Skill')
+    removed = 0
+    for key, ids in duplicate_groups(apps).items():
+        target = Skill.objects.get(pk=ids[0])
+        merge_skills(target, ids[1:], apps=apps, batch_size=batch_size)
+        removed += len(ids) - 1
+        if progress:
+            progress(key, ids)
+
+    # Keys written under an older normalize_name
+    stale = [
+        skill for skill in Skill.objects.only('id', 'name', 'normalized_name').iterator()
+        if skill.normalized_name != normalize_name(skill.name)
+    ]
+    # Two passes, so swapping keys between rows never trips the unique index
+    for skill in stale:
+        skill.normalized_name = f'#{skill.pk}'
+    Skill.objects.bulk_update(stale, ['normalized_name'], batch_size=1000)
+    for skill in stale:
+        skill.normalized_name = normalize_name(skill.name)
+    Skill.objects.bulk_update(stale, ['normalized_name'], batch_size=1000)
+    return removed
@@ -0,0 +1,148 @@
+"""
+Skill search for autocomplete and the admin skill list.
+
+Two structures back it:
+
+* Skill.normalized_name (indexed) answers prefix matches as an index range
+  scan on every backend.
+* A trigram index answers substring matches in names and descriptions: an
+  FTS5 table with the trigram tokenizer on SQLite (one column each, queried
+  with a column filter), pg_trgm GIN indexes on PostgreSQL. Other backends
+  fall back to a plain LIKE.
+
+On SQLite the FTS table is external-content and kept in sync with
+skills_skill by triggers, so every write path (including bulk ones) updates
+it. install_search_index() is idempotent and runs after every migrate, so
+the triggers survive table rebuilds.
+
+Results are ranked prefix matches first, then by Skill.popularity (how
+many users offer or want the skill).
+"""
+from django.db import connections
+from django.db.models.expressions import RawSQL
+
+from .models import Skill, normalize_name
+
+FTS_TABLE = 'skills_skill_fts'
+FTS_COLUMNS = ('name', 'description')
+MIN_TRIGRAM_LENGTH = 3
+# Highest code point, so 'abc' <= value < 'abc' + PREFIX_END covers every 'abc…'
+PREFIX_END = '\U0010ffff'
+
+_columns = ', '.join(FTS_COLUMNS)
+SQLITE_TRIGGERS = {
+    'skills_skill_fts_ai': f"""
+        CREATE TRIGGER IF NOT EXISTS skills_skill_fts_ai AFTER INSERT ON skills_skill BEGIN
+            INSERT INTO {FTS_TABLE}(rowid, {_columns}) VALUES (new.id, new.name, new.description);
+        END""",
+    'skills_skill_fts_ad': f"""
+        CREATE TRIGGER IF NOT EXISTS skills_skill_fts_ad AFTER DELETE ON skills_skill BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {_columns})
+            VALUES ('delete', old.id, old.name, old.description);
+        END""",
+    'skills_skill_fts_au': f"""
+        CREATE TRIGGER IF NOT EXISTS skills_skill_fts_au AFTER UPDATE OF {_columns} ON skills_skill BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {_columns})
+            VALUES ('delete', old.id, old.name, old.description);
+            INSERT INTO {FTS_TABLE}(rowid, {_columns}) VALUES (new.id, new.name, new.description);
+        END""",
+}
+
+
+def install_search_index(using='default', rebuild=False):
+    """Create the backend's trigram index if missing; rebuild it if asked or if it was missing."""
+    connection = connections[using]
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.execute(
+                "SELECT name FROM sqlite_master WHERE type IN ('table', 'trigger') AND name LIKE %s",
+                [f'{FTS_TABLE}%'],
+            )
+            existing = {row[0] for row in cursor.fetchall()}
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+                f"{_columns}, content='skills_skill', content_rowid='id', tokenize='trigram')"
+            )
+            for sql in SQLITE_TRIGGERS.values():
+                cursor.execute(sql)
+            if rebuild or not existing.issuperset([FTS_TABLE, *SQLITE_TRIGGERS]):
+                cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+        elif connection.vendor == 'postgresql':
+            cursor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+            cursor.execute(
+                'CREATE INDEX IF NOT EXISTS skills_skill_name_trgm '
+                'ON skills_skill USING gin (normalized_name gin_trgm_ops)'
+            )
+            cursor.execute(
+                'CREATE INDEX IF NOT EXISTS skills_skill_description_trgm '
+                'ON skills_skill USING gin ((UPPER(description::text)) gin_trgm_ops)'
+            )
+
+
+def drop_search_index(using='default'):
+    connection = connections[using]
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            for trigger in SQLITE_TRIGGERS:
+                cursor.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+            cursor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+        elif connection.vendor == 'postgresql':
+            cursor.execute('DROP INDEX IF EXISTS skills_skill_name_trgm')
+            cursor.execute('DROP INDEX IF EXISTS skills_skill_description_trgm')
+
+
+def prefix_matches(query):
+    return Skill.objects.filter(normalized_name__gte=query, normalized_name__lt=query + PREFIX_END)
+
+
+def _fts_matches(column, query):
+    # A column filter on an FTS5 phrase; quoting keeps user input from being parsed as query syntax
+    phrase = '%s : "%s"' % (column, query.replace('"', '""'))
+    return Skill.objects.filter(id__in=RawSQL(f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', [phrase]))
+
+
+def substring_matches(query):
+    """Skills whose name contains `query`, answered from the trigram index."""
+    if connections[Skill.objects.db].vendor == 'sqlite':
+        return _fts_matches('name', query)
+    # PostgreSQL serves this LIKE from the pg_trgm index
+    return Skill.objects.filter(normalized_name__contains=query)
+
+
+def description_matches(query):
+    """Skills whose description contains `query` (case-insensitively), answered from the trigram index."""
+    if connections[Skill.objects.db].vendor == 'sqlite':
+        return _fts_matches('description', query)
+    # PostgreSQL serves this icontains from the UPPER(description) pg_trgm index
+    return Skill.objects.filter(description__icontains=query)
+
+
+def matching_skills(query):
+    """All skills whose name starts with or contains `query`."""
+    query = normalize_name(query)
+    if len(query) < MIN_TRIGRAM_LENGTH:
+        return prefix_matches(query)
+    return prefix_matches(query) | substring_matches(query)
+
+
+def admin_matches(query):
+    """Skills matching `query` by name, or containing it in their description."""
+    skills = matching_skills(query)
+    query = query.strip()
+    if len(query) < MIN_TRIGRAM_LENGTH:
+        # Too short for a trigram; descriptions are only searched by substring
+        return skills
+    return skills | description_matches(query)
+
+
+def autocomplete(query, limit=10):
+    """Top `limit` skills for a typeahead box: prefix matches first, then substring matches."""
+    query = normalize_name(query)
+    if not query:
+        return []
+    ranking = ('-popularity', 'normalized_name', 'id')
+    results = list(prefix_matches(query).order_by(*ranking)[:limit])
+    if len(results) < limit and len(query) >= MIN_TRIGRAM_LENGTH:
+        seen = [skill.id for skill in results]
+        results += substring_matches(query).exclude(id__in=seen).order_by(*ranking)[:limit - len(results)]
+    return results
@@ -1,10 +1,23 @@
 from rest_framework import serializers
+from skillswap_backend.sparse import FastFieldsMixin
 from .models import Skill, Swap, Notification
 
-class SkillSerializer(serializers.ModelSerializer):
+class SkillSerializer(FastFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Skill
-        fields = '__all__'
+        # Search bookkeeping stays out of the cached public catalog
+        exclude = ['normalized_name', 'popularity']
+
+class CatalogSkillSerializer(SkillSerializer):
+    class Meta(SkillSerializer.Meta):
+        # The counters move through F() UPDATEs that do not bump the catalog
+        # version, so a cached copy of them would go stale
+        exclude = ['normalized_name', *Skill.COUNTER_FIELDS]
+
+class SkillSuggestionSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Skill
+        fields = ['id', 'name', 'popularity']
 
 class SwapSerializer(serializers.ModelSerializer):
     class Meta:
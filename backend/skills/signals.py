@@ -0,0 +1,89 @@
+from django.contrib.auth import get_user_model
+from django.db import connections, transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from swaps.models import Rating, SwapRequest
+from .catalog import bump_catalog_version
+from .counters import adjust_holders, adjust_swaps, unrecord_swap_rating
+from .models import Skill
+from .search import install_search_index
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=Skill)
+@receiver(post_delete, sender=Skill)
+def invalidate_catalog(sender, **kwargs):
+    # After commit, so a rebuild can never cache rows that were rolled back
+    transaction.on_commit(bump_catalog_version)
+
+
+def _skill_deltas(sender, instance, action, reverse, pk_set):
+    """{skill_id: delta} for an m2m_changed event on a through table to Skill, or None."""
+    if action == 'pre_clear':
+        owner = next(field.attname for field in sender._meta.local_fields if field.many_to_one and field.name != 'skill')
+        column, value = ('skill_id', owner) if reverse else (owner, 'skill_id')
+        instance._cleared_ids = list(sender.objects.filter(**{column: instance.pk}).values_list(value, flat=True))
+        return None
+    if action == 'post_clear':
+        cleared = getattr(instance, '_cleared_ids', [])
+        if reverse:
+            return {instance.pk: -len(cleared)}
+        return dict.fromkeys(cleared, -1)
+    if action not in ('post_add', 'post_remove') or not pk_set:
+        return None
+
+    delta = 1 if action == 'post_add' else -1
+    # Reverse side (skill.users_offering.add(...)): pk_set holds owner ids
+    if reverse:
+        return {instance.pk: delta * len(pk_set)}
+    return dict.fromkeys(pk_set, delta)
+
+
+@receiver(m2m_changed, sender=User.skills_offered.through)
+@receiver(m2m_changed, sender=User.skills_wanted.through)
+def count_skill_holders(sender, instance, action, reverse, pk_set, **kwargs):
+    """Keep the users-offering/wanting counters and daily rollups current."""
+    deltas = _skill_deltas(sender, instance, action, reverse, pk_set)
+    if deltas:
+        adjust_holders('offered' if sender is User.skills_offered.through else 'wanted', deltas)
+
+
+@receiver(m2m_changed, sender=SwapRequest.skills_offered.through)
+@receiver(m2m_changed, sender=SwapRequest.skills_wanted.through)
+def count_skill_swaps(sender, instance, action, reverse, pk_set, **kwargs):
+    deltas = _skill_deltas(sender, instance, action, reverse, pk_set)
+    if deltas:
+        adjust_swaps(deltas)
+
+
+def _held_skills(through, column, owner_id):
+    return dict.fromkeys(through.objects.filter(**{column: owner_id}).values_list('skill_id', flat=True), -1)
+
+
+@receiver(pre_delete, sender=User)
+def forget_deleted_user_skills(sender, instance, **kwargs):
+    """Deleting a user cascades their M2M rows without firing m2m_changed."""
+    adjust_holders('offered', _held_skills(User.skills_offered.through, 'user_id', instance.pk))
+    adjust_holders('wanted', _held_skills(User.skills_wanted.through, 'user_id', instance.pk))
+
+
+@receiver(pre_delete, sender=SwapRequest)
+def forget_deleted_swap_skills(sender, instance, **kwargs):
+    deltas = _held_skills(SwapRequest.skills_offered.through, 'swaprequest_id', instance.pk)
+    for skill_id in _held_skills(SwapRequest.skills_wanted.through, 'swaprequest_id', instance.pk):
+        deltas[skill_id] = deltas.get(skill_id, 0) - 1
+    adjust_swaps(deltas)
+
+
+@receiver(pre_delete, sender=Rating)
+def forget_deleted_rating(sender, instance, **kwargs):
+    # pre_delete runs before any cascade, so the swap's skills are still there
+    unrecord_swap_rating(instance.swap_request_id, instance.rating)
+
+
+def ensure_search_index(using, **kwargs):
+    # Table rebuilds during migrate drop the SQLite triggers; put them back
+    if Skill._meta.db_table in connections[using].introspection.table_names():
+        install_search_index(using)
@@ -1,3 +1,279 @@
+from django.core.cache import cache
 from django.test import TestCase
- 
-# Create your tests here. 
\ No newline at end of file
+from rest_framework.test import APIClient
+
+from users.models import User
+from .models import Skill, SkillAlias
+
+
+class SkillCatalogTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.skill = Skill.objects.create(name='Python')
+        self.client = APIClient()
+
+    def test_cached_catalog_needs_no_queries(self):
+        first = self.client.get('/api/skills/')
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual([skill['name'] for skill in first.json()], ['Python'])
+
+        with self.assertNumQueries(0):
+            again = self.client.get('/api/skills/', HTTP_AUTHORIZATION='Bearer not-even-checked')
+        self.assertEqual(again.content, first.content)
+        self.assertEqual(again['ETag'], first['ETag'])
+
+    def test_counters_stay_out_of_the_cached_catalog(self):
+        etag = self.client.get('/api/skills/')['ETag']
+        User.objects.create(username='learner').skills_wanted.add(self.skill)
+        response = self.client.get('/api/skills/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        skill = self.client.get('/api/skills/').json()[0]
+        self.assertNotIn('wanted_count', skill)
+        self.assertNotIn('popularity', skill)
+
+    def test_if_none_match_returns_304(self):
+        etag = self.client.get('/api/skills/')['ETag']
+        response = self.client.get('/api/skills/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_writes_invalidate_catalog(self):
+        etag = self.client.get('/api/skills/')['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            Skill.objects.create(name='Guitar')
+        response = self.client.get('/api/skills/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()), 2)
+
+        admin = User.objects.create(username='admin', is_staff=True)
+        self.client.force_authenticate(admin)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete('/api/skills/admin/', {'id': self.skill.id}, format='json')
+        self.assertEqual([skill['name'] for skill in self.client.get('/api/skills/').json()], ['Guitar'])
+
+
+class AdminSkillListTests(TestCase):
+    def setUp(self):
+        self.python = Skill.objects.create(name='Python', level='advanced', popularity=5, is_offered=True)
+        self.pottery = Skill.objects.create(name='Pottery', description='Wheel and glaze', popularity=9)
+        self.piano = Skill.objects.create(name='Piano', level='advanced', popularity=1, is_wanted=True)
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create(username='admin', is_staff=True))
+
+    def names(self, **params):
+        response = self.client.get('/api/skills/admin/', params)
+        self.assertEqual(response.status_code, 200)
+        return [skill['name'] for skill in response.data['results']]
+
+    def test_pages_by_popularity(self):
+        response = self.client.get('/api/skills/admin/', {'limit': 2})
+        self.assertEqual([skill['name'] for skill in response.data['results']], ['Pottery', 'Python'])
+        self.assertEqual((response.data['count'], response.data['count_exact']), (3, True))
+        self.assertEqual(self.names(limit=2, cursor=response.data['next_cursor']), ['Piano'])
+
+    def test_filters_and_ordering(self):
+        self.assertEqual(self.names(search='p', ordering='name'), ['Piano', 'Pottery', 'Python'])
+        self.assertEqual(self.names(level='advanced', is_offered='true'), ['Python'])
+        self.assertEqual(self.names(is_wanted='1'), ['Piano'])
+        self.assertEqual(self.client.get('/api/skills/admin/', {'ordering': 'rating'}).status_code, 400)
+
+    def test_search_matches_descriptions(self):
+        self.assertEqual(self.names(search='GLAZE'), ['Pottery'])
+        # Autocomplete still matches names only
+        self.assertEqual(self.client.get('/api/skills/autocomplete/', {'q': 'glaze'}).data, [])
+        self.pottery.description = 'Hand building'
+        self.pottery.save()
+        self.assertEqual(self.names(search='glaze'), [])
+
+
+class SkillAutocompleteTests(TestCase):
+    def setUp(self):
+        self.python = Skill.objects.create(name='Python')
+        self.pytorch = Skill.objects.create(name='PyTorch')
+        self.micropython = Skill.objects.create(name='MicroPython')
+        Skill.objects.create(name='Guitar')
+        self.users = [User.objects.create(username=f'user{index}') for index in range(3)]
+        self.client = APIClient()
+
+    def suggest(self, q, **params):
+        response = self.client.get('/api/skills/autocomplete/', {'q': q, **params})
+        self.assertEqual(response.status_code, 200)
+        return [skill['name'] for skill in response.data]
+
+    def test_prefix_before_substring_ranked_by_popularity(self):
+        for user in self.users:
+            user.skills_wanted.add(self.pytorch)
+        self.users[0].skills_offered.add(self.python)
+
+        self.assertEqual(self.suggest('  PY'), ['PyTorch', 'Python'])
+        self.assertEqual(self.suggest('python'), ['Python', 'MicroPython'])
+        self.assertEqual(self.suggest('py', limit=1), ['PyTorch'])
+        self.assertEqual(self.suggest(''), [])
+
+    def test_popularity_follows_m2m_changes(self):
+        self.users[0].skills_offered.add(self.python)
+        self.python.users_wanting.add(self.users[1], self.users[2])
+        self.python.refresh_from_db()
+        self.assertEqual(self.python.popularity, 3)
+
+        self.users[0].skills_offered.clear()
+        self.users[1].delete()
+        self.python.refresh_from_db()
+        self.assertEqual(self.python.popularity, 1)
+
+    def test_index_follows_renames_and_deletes(self):
+        self.micropython.name = 'CircuitPython'
+        self.micropython.save()
+        self.pytorch.delete()
+        self.assertEqual(self.suggest('python'), ['Python', 'CircuitPython'])
+        self.assertEqual(self.suggest('circ'), ['CircuitPython'])
+        self.assertEqual(self.suggest('torch'), [])
+
+    def test_name_filter_uses_search(self):
+        response = self.client.get('/api/skills/', {'name': 'thon'})
+        self.assertEqual({skill['name'] for skill in response.json()}, {'Python', 'MicroPython'})
+
+
+class SkillRegistryTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create(username='learner')
+        self.client.force_authenticate(self.user)
+
+    def test_spellings_resolve_to_one_skill(self):
+        ids = {
+            self.client.post('/api/users/skills/offered/', {'name': name}, format='json').data['id']
+            for name in ('Python', 'python ', '  PYTHON')
+        }
+        self.assertEqual(len(ids), 1)
+        self.assertEqual(Skill.objects.get().name, 'Python')
+
+        response = self.client.post('/api/skills/', {'name': 'pYthon'}, format='json')
+        self.assertEqual((response.status_code, response.data['id']), (200, ids.pop()))
+
+    def test_merge_rewrites_every_reference(self):
+        from swaps.models import SwapRequest
+        from users.models import UserProfile
+        from .models import SkillAlias
+
+        target = Skill.objects.create(name='JavaScript')
+        sources = [Skill.objects.create(name='JS'), Skill.objects.create(name='Javascript ES6')]
+        other = User.objects.create(username='other')
+        self.user.skills_offered.add(target, *sources)
+        other.skills_wanted.add(sources[0])
+        profile = UserProfile.objects.create(user=other)
+        profile.skills_offered.add(*sources)
+        swap = SwapRequest.objects.create(from_user=self.user, to_user=other)
+        swap.skills_offered.add(sources[1])
+
+        admin = User.objects.create(username='admin', is_staff=True)
+        self.client.force_authenticate(admin)
+        response = self.client.post(
+            '/api/skills/admin/merge/',
+            {'target_id': target.id, 'source_ids': [skill.id for skill in sources]},
+            format='json',
+        )
+        self.assertEqual(response.status_code, 200)
+
+        self.assertEqual(list(self.user.skills_offered.all()), [target])
+        self.assertEqual(list(other.skills_wanted.all()), [target])
+        self.assertEqual(list(profile.skills_offered.all()), [target])
+        self.assertEqual(list(swap.skills_offered.all()), [target])
+        self.assertEqual(Skill.objects.count(), 1)
+        target.refresh_from_db()
+        self.assertEqual(target.popularity, 2)
+
+        self.assertEqual(SkillAlias.objects.count(), 2)
+        self.client.force_authenticate(self.user)
+        response = self.client.post('/api/users/skills/wanted/', {'name': 'js'}, format='json')
+        self.assertEqual(response.data['id'], target.id)
+
+    def test_dedup_command_merges_colliding_names(self):
+        from io import StringIO
+
+        from django.core.management import call_command
+
+        keep = Skill.objects.create(name='Guitar')
+        self.user.skills_offered.add(keep)
+        # A row written before normalization existed
+        legacy = Skill.objects.create(name='placeholder')
+        Skill.objects.filter(pk=legacy.pk).update(name='guitar ', normalized_name='legacy')
+        User.objects.create(username='strummer').skills_wanted.add(legacy)
+
+        output = StringIO()
+        call_command('dedup_skills', '--dry-run', stdout=output)
+        self.assertIn(f'keep {keep.id}, merge [{legacy.id}]', output.getvalue())
+
+        call_command('dedup_skills', stdout=StringIO())
+        self.assertEqual(list(Skill.objects.values_list('id', flat=True)), [keep.id])
+        self.assertEqual(User.objects.get(username='strummer').skills_wanted.get(), keep)
+
+
+class SkillAdminRenameTests(TestCase):
+    def test_rename_onto_an_existing_name_is_a_form_error(self):
+        python = Skill.objects.create(name='Python')
+        SkillAlias.objects.create(alias='golang', skill=Skill.objects.create(name='Go'))
+        piano = Skill.objects.create(name='Piano')
+        self.client.force_login(User.objects.create_superuser(username='root', password='x'))
+
+        for name in (' PYTHON', 'Golang'):
+            response = self.client.post(f'/admin/skills/skill/{piano.id}/change/', {'name': name, 'level': '', 'description': ''})
+            self.assertEqual(response.status_code, 200)
+            self.assertContains(response, '/api/skills/admin/merge/')
+        response = self.client.post(f'/admin/skills/skill/{python.id}/change/', {'name': 'python', 'level': '', 'description': ''})
+        self.assertEqual(response.status_code, 302)
+
+
+class SkillCounterTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.python = Skill.objects.create(name='Python')
+        self.guitar = Skill.objects.create(name='Guitar')
+        self.users = [User.objects.create(username=f'member{index}') for index in range(3)]
+        self.client = APIClient()
+
+    def test_counters_follow_users_and_swaps(self):
+        from swaps.models import Rating, SwapRequest
+        from swaps.ratings import record_rating
+
+        self.users[0].skills_offered.add(self.python)
+        for user in self.users:
+            user.skills_wanted.add(self.guitar)
+        self.users[2].skills_wanted.remove(self.guitar)
+        swap = SwapRequest.objects.create(from_user=self.users[0], to_user=self.users[1], status='completed')
+        swap.skills_offered.add(self.python)
+        swap.skills_wanted.add(self.guitar)
+        record_rating(Rating.objects.create(swap_request=swap, rater=self.users[1], rated_user=self.users[0], rating=4))
+
+        self.python.refresh_from_db()
+        self.guitar.refresh_from_db()
+        self.assertEqual((self.python.offered_count, self.python.is_offered, self.python.swap_count), (1, True, 1))
+        self.assertEqual((self.guitar.wanted_count, self.guitar.is_wanted, self.guitar.is_offered), (2, True, False))
+        self.assertEqual((self.python.rating, self.guitar.rating), (4.0, 4.0))
+
+        self.users[0].delete()
+        self.python.refresh_from_db()
+        self.assertEqual((self.python.offered_count, self.python.is_offered, self.python.swap_count), (0, False, 0))
+
+        # The rebuild command agrees with the incremental counters
+        before = list(Skill.objects.order_by('id').values(*Skill.COUNTER_FIELDS))
+        from io import StringIO
+
+        from django.core.management import call_command
+
+        call_command('rebuild_skill_counters', stdout=StringIO())
+        self.assertEqual(list(Skill.objects.order_by('id').values(*Skill.COUNTER_FIELDS)), before)
+
+    def test_trending_reads_daily_rollups(self):
+        for user in self.users:
+            user.skills_wanted.add(self.guitar)
+        self.users[0].skills_wanted.add(self.python)
+        self.users[1].skills_offered.add(self.python)
+
+        response = self.client.get('/api/skills/trending/', {'kind': 'demand', 'window': 7})
+        self.assertEqual([(row['name'], row['score']) for row in response.data['results']], [('Guitar', 3), ('Python', 1)])
+
+        response = self.client.get('/api/skills/trending/', {'kind': 'undersupplied', 'window': 1})
+        self.assertEqual([row['name'] for row in response.data['results']], ['Guitar'])
+
+        self.assertEqual(self.client.get('/api/skills/trending/', {'window': 5}).status_code, 400)
@@ -1,9 +1,12 @@
 from django.urls import path
-from .views import SkillsListView, OfferedSkillsView, WantedSkillsView, AdminSkillsListView
+from .views import SkillsListView, SkillAutocompleteView, TrendingSkillsView, OfferedSkillsView, WantedSkillsView, AdminSkillsListView, AdminSkillMergeView
 
 urlpatterns = [
     path('', SkillsListView.as_view(), name='skills-list'),
+    path('autocomplete/', SkillAutocompleteView.as_view(), name='skills-autocomplete'),
+    path('trending/', TrendingSkillsView.as_view(), name='skills-trending'),
     path('offered/', OfferedSkillsView.as_view(), name='offered-skills'),
     path('wanted/', WantedSkillsView.as_view(), name='wanted-skills'),
     path('admin/', AdminSkillsListView.as_view(), name='admin-skills'),
+    path('admin/merge/', AdminSkillMergeView.as_view(), name='admin-skills-merge'),
 ]
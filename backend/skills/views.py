@@ -1,56 +1,147 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny, IsAdminUser
-from django.db.models import Q
+from django.http import HttpResponse, HttpResponseNotModified
+from .catalog import etag_matches, get_catalog
+from .counters import TRENDING_KINDS, TRENDING_WINDOWS, trending_skills
+from .registry import merge_skills, resolve_skill
+from .search import admin_matches, autocomplete, matching_skills
+from skillswap_backend.filters import parse_bool
+from skillswap_backend.pagination import estimated_count, paginate_keyset, parse_limit, parse_ordering
 from .models import Skill
-from .serializers import SkillSerializer
+from .serializers import CatalogSkillSerializer, SkillSerializer, SkillSuggestionSerializer
 
 class SkillsListView(APIView):
     permission_classes = [AllowAny]
+    replica_reads = True
+    # Public endpoint: skip JWT authentication so the cached catalog needs no user lookup
+    authentication_classes = []
 
     def get(self, request):
         search = request.query_params.get('name', '')
         if search:
-            skills = Skill.objects.filter(name__icontains=search)
+            skills = matching_skills(search).order_by('-popularity', 'normalized_name', 'id')
+            return Response(CatalogSkillSerializer(skills, many=True).data)
+
+        # Full catalog: served from cache, with conditional GET support
+        body, etag = get_catalog()
+        if etag_matches(request.headers.get('If-None-Match'), etag):
+            response = HttpResponseNotModified()
         else:
-            skills = Skill.objects.all()
-        return Response(SkillSerializer(skills, many=True).data)
+            response = HttpResponse(body, content_type='application/json')
+        response['ETag'] = etag
+        response['Cache-Control'] = 'no-cache'
+        return response
 
     def post(self, request):
         serializer = SkillSerializer(data=request.data)
         if serializer.is_valid():
-            serializer.save()
-            return Response(serializer.data, status=201)
+            # Any spelling of an existing skill returns that skill
+            data = dict(serializer.validated_data)
+            skill, created = resolve_skill(data.pop('name'), defaults=data)
+            return Response(SkillSerializer(skill).data, status=201 if created else 200)
         return Response(serializer.errors, status=400)
 
+class SkillAutocompleteView(APIView):
+    permission_classes = [AllowAny]
+    replica_reads = True
+    authentication_classes = []
+
+    def get(self, request):
+        """Typeahead: top `limit` skills for ?q=, prefix matches first, then by popularity."""
+        skills = autocomplete(request.query_params.get('q', ''), parse_limit(request, default=10, maximum=50))
+        return Response(SkillSuggestionSerializer(skills, many=True).data)
+
+class TrendingSkillsView(APIView):
+    permission_classes = [AllowAny]
+    replica_reads = True
+    authentication_classes = []
+
+    def get(self, request):
+        """
+        Most-demanded or most-undersupplied skills over a sliding window.
+
+        Query params: kind (demand|undersupplied), window (days: 1, 7, 30 or 90), limit.
+        """
+        kind = request.query_params.get('kind', 'demand')
+        if kind not in TRENDING_KINDS:
+            return Response({'error': f'kind must be one of {", ".join(TRENDING_KINDS)}'}, status=400)
+        try:
+            window = int(request.query_params.get('window', 7))
+        except ValueError:
+            window = None
+        if window not in TRENDING_WINDOWS:
+            return Response({'error': f'window must be one of {", ".join(map(str, TRENDING_WINDOWS))}'}, status=400)
+
+        return Response({
+            'kind': kind,
+            'window': window,
+            'results': trending_skills(kind, window, parse_limit(request, default=10, maximum=50)),
+        })
+
 class OfferedSkillsView(APIView):
     permission_classes = [IsAuthenticated]
+    replica_reads = True
 
     def get(self, request):
-        # Get skills that are offered by any user
-        skills = Skill.objects.filter(is_offered=True)
+        # Get skills that are offered by any user, most offered first
+        skills = Skill.objects.filter(is_offered=True).order_by('-offered_count', 'id')
         return Response(SkillSerializer(skills, many=True).data)
 
 class WantedSkillsView(APIView):
     permission_classes = [IsAuthenticated]
+    replica_reads = True
 
     def get(self, request):
-        # Get skills that are wanted by any user
-        skills = Skill.objects.filter(is_wanted=True)
+        # Get skills that are wanted by any user, most wanted first
+        skills = Skill.objects.filter(is_wanted=True).order_by('-wanted_count', 'id')
         return Response(SkillSerializer(skills, many=True).data)
 
+ADMIN_SKILL_ORDERINGS = {
+    '-popularity': ('-popularity', '-id'),
+    'name': ('normalized_name',),
+    '-created_at': ('-created_at', '-id'),
+}
+
 class AdminSkillsListView(APIView):
     permission_classes = [IsAdminUser]
+    replica_reads = True
 
     def get(self, request):
-        search = request.query_params.get('search', '')
+        """
+        Keyset-paginated skill list.
+
+        Query params: search (skill name or description), level, is_offered, is_wanted,
+        ordering, limit, cursor.
+        """
+        params = request.query_params
         skills = Skill.objects.all()
+        search = params.get('search', '').strip()
         if search:
-            skills = skills.filter(
-                Q(name__icontains=search) |
-                Q(description__icontains=search)
-            )
-        return Response(SkillSerializer(skills, many=True).data)
+            skills = skills.filter(id__in=admin_matches(search).values('id'))
+        level = params.get('level')
+        if level:
+            skills = skills.filter(level=level)
+        try:
+            ordering = parse_ordering(request, ADMIN_SKILL_ORDERINGS, '-popularity')
+            for flag in ('is_offered', 'is_wanted'):
+                value = parse_bool(params, flag)
+                if value is not None:
+                    skills = skills.filter(**{flag: value})
+        except ValueError as e:
+            return Response({'error': str(e)}, status=400)
+
+        count, count_exact = estimated_count(skills)
+        try:
+            page, next_cursor = paginate_keyset(skills, ordering, params.get('cursor'), parse_limit(request))
+        except ValueError as e:
+            return Response({'error': str(e)}, status=400)
+        return Response({
+            'results': SkillSerializer(page, many=True).data,
+            'next_cursor': next_cursor,
+            'count': count,
+            'count_exact': count_exact,
+        })
 
     def delete(self, request):
         skill_id = request.data.get('id')
@@ -62,3 +153,24 @@ class AdminSkillsListView(APIView):
             return Response({'message': 'Skill deleted'}, status=200)
         except Skill.DoesNotExist:
             return Response({'error': 'Skill not found'}, status=404)
+
+class AdminSkillMergeView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def post(self, request):
+        """Merge `source_ids` into `target_id`; their users, profiles and swaps move to the target."""
+        target_id = request.data.get('target_id')
+        source_ids = request.data.get('source_ids')
+        if not target_id or not isinstance(source_ids, list) or not source_ids:
+            return Response({'error': 'target_id and a list of source_ids required'}, status=400)
+        try:
+            target = Skill.objects.get(id=target_id)
+        except Skill.DoesNotExist:
+            return Response({'error': 'Skill not found'}, status=404)
+        try:
+            source_ids = [int(source_id) for source_id in source_ids]
+        except (TypeError, ValueError):
+            return Response({'error': 'source_ids must be skill ids'}, status=400)
+
+        target = merge_skills(target, source_ids)
+        return Response(SkillSerializer(target).data)
@@ -13,4 +13,15 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'skillswap_backend.settings')
 
-application = get_asgi_application() 
\ No newline at end of file
+django_application = get_asgi_application()
+
+# Imported after Django is set up
+from users.realtime import websocket_application  # noqa: E402
+
+
+async def application(scope, receive, send):
+    # Notification push sockets are handled outside Django's HTTP stack
+    if scope['type'] == 'websocket':
+        await websocket_application(scope, receive, send)
+    else:
+        await django_application(scope, receive, send) 
\ No newline at end of file
@@ -0,0 +1,44 @@
+"""
+Shared in-process worker pool for background work (report jobs, broadcast
+materialization).
+
+BACKGROUND_WORKERS sets the pool size per web process. With 0, nothing runs
+in-process and the matching management commands do the work instead.
+"""
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_lock = threading.Lock()
+
+
+def enabled():
+    return getattr(settings, 'BACKGROUND_WORKERS', 2) > 0
+
+
+def _run(func, args):
+    close_old_connections()
+    try:
+        func(*args)
+    except Exception:
+        logger.exception('Background task %s failed', getattr(func, '__name__', func))
+    finally:
+        close_old_connections()
+
+
+def submit(func, *args):
+    """Run func(*args) on the pool; returns False when in-process work is disabled."""
+    global _executor
+    if not enabled():
+        return False
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=settings.BACKGROUND_WORKERS, thread_name_prefix='background')
+    _executor.submit(_run, func, args)
+    return True
@@ -0,0 +1,59 @@
+"""
+Query-parameter parsing for server-side list filters.
+
+Each helper raises ValueError with a message fit for a 400 response.
+"""
+from datetime import datetime, time
+
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+TRUE_VALUES = ('1', 'true', 'yes')
+FALSE_VALUES = ('0', 'false', 'no')
+
+
+def parse_bool(params, name):
+    """True/False for ?name=true|false (also 1/0, yes/no, or a JSON boolean); None if absent."""
+    value = params.get(name)
+    if isinstance(value, bool):
+        return value
+    value = '' if value is None else str(value).strip().lower()
+    if not value:
+        return None
+    if value in TRUE_VALUES:
+        return True
+    if value in FALSE_VALUES:
+        return False
+    raise ValueError(f'{name} must be true or false')
+
+
+def _parse_moment(params, name, end_of_day):
+    value = params.get(name, '').strip()
+    if not value:
+        return None
+    moment = parse_datetime(value)
+    if moment is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(f'{name} must be a date (YYYY-MM-DD) or an ISO 8601 datetime')
+        moment = datetime.combine(day, time.max if end_of_day else time.min)
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+def date_range(params, field, prefix):
+    """
+    Q for ?{prefix}_from= and ?{prefix}_to= on `field` (both inclusive).
+
+    A bare date in `_to` covers that whole day.
+    """
+    condition = Q()
+    start = _parse_moment(params, f'{prefix}_from', end_of_day=False)
+    end = _parse_moment(params, f'{prefix}_to', end_of_day=True)
+    if start is not None:
+        condition &= Q(**{f'{field}__gte': start})
+    if end is not None:
+        condition &= Q(**{f'{field}__lte': end})
+    return condition
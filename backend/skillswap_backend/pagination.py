@@ -0,0 +1,177 @@
+"""
+Keyset (cursor) pagination helpers shared by the list endpoints.
+
+A cursor is the ordering values of the last row on the previous page,
+encoded as URL-safe base64 JSON. Fetching the next page is a range scan
+that starts right after that row, so its cost does not grow with depth
+the way OFFSET pagination does.
+
+List totals come from estimated_count(), which counts exactly only up to
+EXACT_COUNT_LIMIT rows, so a total never costs a full scan of a big table.
+EstimatedCountPaginator applies the same rule to Django admin changelists.
+"""
+import base64
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+
+def parse_limit(request, default=20, maximum=100):
+    """Read ?limit= from the request, clamped to [1, maximum]."""
+    try:
+        limit = int(request.query_params.get('limit', default))
+    except (TypeError, ValueError):
+        return default
+    return max(1, min(limit, maximum))
+
+
+def parse_ordering(request, choices, default):
+    """
+    Map ?ordering= to one of `choices` ({param value: ordering tuple}).
+
+    Raises ValueError for a value that is not offered; each choice should be
+    backed by an index so that pages stay range scans.
+    """
+    value = request.query_params.get('ordering') or default
+    if value not in choices:
+        raise ValueError(f'ordering must be one of {", ".join(choices)}')
+    return choices[value]
+
+
+def encode_cursor(values):
+    raw = json.dumps(list(values), separators=(',', ':'), default=str)
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, size):
+    """Decode a cursor produced by encode_cursor, raising ValueError if malformed."""
+    padding = '=' * (-len(cursor) % 4)
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + padding))
+    except (ValueError, TypeError):
+        raise ValueError('Invalid cursor')
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError('Invalid cursor')
+    return values
+
+
+def keyset_filter(ordering, values):
+    """
+    Build a Q selecting rows that sort strictly after `values` under `ordering`.
+
+    `ordering` uses the usual order_by syntax ('-created_at', '-id'); the last
+    field must be unique so that ties are broken deterministically.
+    """
+    condition = Q()
+    for index, field in enumerate(ordering):
+        name = field.lstrip('-')
+        lookup = 'lt' if field.startswith('-') else 'gt'
+        clause = Q(**{f'{name}__{lookup}': values[index]})
+        for previous, value in zip(ordering[:index], values[:index]):
+            clause &= Q(**{previous.lstrip('-'): value})
+        condition |= clause
+    return condition
+
+
+def paginate_keyset(queryset, ordering, cursor=None, limit=20):
+    """
+    Return (rows, next_cursor) for one page of `queryset` ordered by `ordering`.
+
+    Raises ValueError for a malformed cursor so views can answer 400.
+    """
+    queryset = queryset.order_by(*ordering)
+    if cursor:
+        values = decode_cursor(cursor, len(ordering))
+        queryset = queryset.filter(keyset_filter(ordering, values))
+
+    # Fetch one extra row to learn whether another page exists
+    rows = list(queryset[:limit + 1])
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(getattr(last, field.lstrip('-')) for field in ordering)
+    return rows, next_cursor
+
+
+def _table_estimate(queryset):
+    """Row estimate for the queryset's table from planner statistics, or None."""
+    connection = connections[queryset.db]
+    table = queryset.model._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass', [table])
+            row = cursor.fetchone()
+            return row[0] if row and row[0] >= 0 else None
+        if connection.vendor == 'sqlite':
+            # Written by ANALYZE; the first number of a row is the table's row count
+            cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'")
+            if cursor.fetchone() is None:
+                return None
+            cursor.execute('SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1', [table])
+            row = cursor.fetchone()
+            return int(row[0].split()[0]) if row else None
+    return None
+
+
+def _query_estimate(queryset):
+    """The planner's row estimate for a filtered queryset (PostgreSQL only), or None."""
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+    sql, params = queryset.order_by().query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+def estimated_count(queryset):
+    """
+    (count, exact) for a list total.
+
+    Up to EXACT_COUNT_LIMIT rows are counted exactly with a bounded scan.
+    Past that, an unfiltered table uses the database's statistics (falling
+    back to a COUNT(*) cached for COUNT_CACHE_SECONDS). A filtered queryset
+    uses the PostgreSQL planner's estimate; on SQLite the limit itself is
+    returned as a lower bound.
+    """
+    limit = settings.EXACT_COUNT_LIMIT
+    queryset = queryset.order_by()
+    count = queryset[:limit + 1].count()
+    if count <= limit:
+        return count, True
+
+    if not queryset.query.has_filters():
+        estimate = _table_estimate(queryset)
+        if estimate is None:
+            key = f'count:{queryset.db}:{queryset.model._meta.db_table}'
+            estimate = cache.get(key)
+            if estimate is None:
+                estimate = queryset.count()
+                cache.set(key, estimate, timeout=settings.COUNT_CACHE_SECONDS)
+        return max(estimate, count), False
+
+    estimate = _query_estimate(queryset)
+    return max(estimate or 0, limit), False
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Admin changelist paginator whose total comes from estimated_count().
+
+    Past EXACT_COUNT_LIMIT the page count is approximate; use it with
+    show_full_result_count = False so the changelist does not count the
+    whole table either.
+    """
+
+    @cached_property
+    def count(self):
+        return estimated_count(self.object_list)[0]
@@ -0,0 +1,274 @@
+"""
+Per-request performance instrumentation.
+
+PerfMiddleware times every request and, through a database execute
+wrapper, each SQL statement it runs. Statements are grouped by their SQL
+text (parameters are not part of it), so the same statement run many times
+in one request - the N+1 signature - shows up as duplicates. Time spent in
+authentication, serializer `.data` and response rendering is recorded too.
+
+Each response gets a Server-Timing header, e.g.
+
+    Server-Timing: db;dur=12.1;desc="9 queries, 6 duplicate", auth;dur=0.4,
+                   serialize;dur=20.3, render;dur=2.2, total;dur=38.0
+
+Serializer time includes the queries it triggers, so the phases overlap.
+Per-view histograms are kept in memory (per process) and exported in the
+Prometheus text format by render_metrics(). Requests slower than
+PERF_SLOW_REQUEST_MS, or with more than PERF_DUPLICATE_QUERY_THRESHOLD
+duplicate queries, are logged with their most expensive statements.
+"""
+import contextvars
+import logging
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+BYTES_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+# metric -> (help, buckets)
+HISTOGRAMS = {
+    'request_duration_seconds': ('Time to produce the response', DURATION_BUCKETS),
+    'db_duration_seconds': ('Time spent executing SQL', DURATION_BUCKETS),
+    'serialize_duration_seconds': ('Time spent in serializer .data', DURATION_BUCKETS),
+    'render_duration_seconds': ('Time spent rendering the response', DURATION_BUCKETS),
+    'db_queries': ('SQL statements executed', QUERY_BUCKETS),
+    'db_duplicate_queries': ('SQL statements repeating an earlier one in the same request', QUERY_BUCKETS),
+    'response_bytes': ('Response body size (not measured for streaming responses)', BYTES_BUCKETS),
+}
+METRIC_PREFIX = 'skillswap_'
+UNRESOLVED_VIEW = '<unresolved>'
+
+_current = contextvars.ContextVar('request_metrics', default=None)
+_histograms = {}
+_requests = {}
+_lock = threading.Lock()
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.statements = {}  # sql -> [count, ms]
+        self.query_count = 0
+        self.db_ms = 0.0
+        self.phases = {}  # name -> ms
+        self.serializing = False
+
+    def record_query(self, sql, ms):
+        self.query_count += 1
+        self.db_ms += ms
+        entry = self.statements.get(sql)
+        if entry is None:
+            self.statements[sql] = [1, ms]
+        else:
+            entry[0] += 1
+            entry[1] += ms
+
+    def add_phase(self, name, ms):
+        self.phases[name] = self.phases.get(name, 0.0) + ms
+
+    @property
+    def duplicate_count(self):
+        return sum(count - 1 for count, _ in self.statements.values())
+
+    def costliest_statements(self, limit):
+        """[(sql, count, ms)] by total time, most expensive first."""
+        rows = sorted(self.statements.items(), key=lambda item: item[1][1], reverse=True)[:limit]
+        return [(sql, count, ms) for sql, (count, ms) in rows]
+
+
+def current_metrics():
+    return _current.get()
+
+
+@contextmanager
+def timed(phase):
+    """Add the time spent in the block to the current request's `phase`."""
+    metrics = _current.get()
+    if metrics is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.add_phase(phase, (time.perf_counter() - started) * 1000)
+
+
+def _execute_wrapper(metrics):
+    def wrapper(execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            metrics.record_query(sql, (time.perf_counter() - started) * 1000)
+    return wrapper
+
+
+_serializer_timing_installed = False
+
+
+def install_serializer_timing():
+    """Time the outermost `.data` access of every DRF serializer."""
+    global _serializer_timing_installed
+    if _serializer_timing_installed:
+        return
+    from rest_framework.serializers import BaseSerializer
+
+    original = BaseSerializer.data
+
+    def data(self):
+        metrics = _current.get()
+        if metrics is None or metrics.serializing:
+            return original.fget(self)
+        metrics.serializing = True
+        started = time.perf_counter()
+        try:
+            return original.fget(self)
+        finally:
+            metrics.serializing = False
+            metrics.add_phase('serialize', (time.perf_counter() - started) * 1000)
+
+    BaseSerializer.data = property(data)
+    _serializer_timing_installed = True
+
+
+def server_timing(metrics, total_ms):
+    parts = [f'db;dur={metrics.db_ms:.1f};desc="{metrics.query_count} queries, '
+             f'{metrics.duplicate_count} duplicate"']
+    parts.extend(f'{name};dur={ms:.1f}' for name, ms in metrics.phases.items())
+    parts.append(f'total;dur={total_ms:.1f}')
+    return ', '.join(parts)
+
+
+def observe(view, method, status_code, metrics, total_ms, response_bytes):
+    values = {
+        'request_duration_seconds': total_ms / 1000,
+        'db_duration_seconds': metrics.db_ms / 1000,
+        'serialize_duration_seconds': metrics.phases.get('serialize', 0.0) / 1000,
+        'render_duration_seconds': metrics.phases.get('render', 0.0) / 1000,
+        'db_queries': metrics.query_count,
+        'db_duplicate_queries': metrics.duplicate_count,
+        'response_bytes': response_bytes,
+    }
+    labels = (view, method)
+    with _lock:
+        key = (*labels, str(status_code))
+        _requests[key] = _requests.get(key, 0) + 1
+        for name, value in values.items():
+            if value is None:
+                continue
+            buckets = HISTOGRAMS[name][1]
+            histogram = _histograms.get((name, labels))
+            if histogram is None:
+                histogram = _histograms[(name, labels)] = [[0] * len(buckets), 0.0, 0]
+            for index, bound in enumerate(buckets):
+                if value <= bound:
+                    histogram[0][index] += 1
+            histogram[1] += value
+            histogram[2] += 1
+
+
+def _label_text(names, values):
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for value in values)
+    return ','.join(f'{name}="{value}"' for name, value in zip(names, escaped))
+
+
+def render_metrics():
+    """Everything observed by this process, in the Prometheus text format."""
+    with _lock:
+        requests = sorted(_requests.items())
+        histograms = {key: (list(counts), total, count) for key, (counts, total, count) in _histograms.items()}
+
+    lines = [
+        f'# HELP {METRIC_PREFIX}requests_total Requests handled',
+        f'# TYPE {METRIC_PREFIX}requests_total counter',
+    ]
+    for labels, count in requests:
+        lines.append(f'{METRIC_PREFIX}requests_total{{{_label_text(("view", "method", "status"), labels)}}} {count}')
+
+    for name, (help_text, buckets) in HISTOGRAMS.items():
+        metric = METRIC_PREFIX + name
+        lines.append(f'# HELP {metric} {help_text}')
+        lines.append(f'# TYPE {metric} histogram')
+        for (histogram_name, labels), (counts, total, count) in sorted(histograms.items()):
+            if histogram_name != name:
+                continue
+            label_text = _label_text(('view', 'method'), labels)
+            for bound, bucket_count in zip(buckets, counts):
+                lines.append(f'{metric}_bucket{{{label_text},le="{bound}"}} {bucket_count}')
+            lines.append(f'{metric}_bucket{{{label_text},le="+Inf"}} {count}')
+            lines.append(f'{metric}_sum{{{label_text}}} {total:.6g}')
+            lines.append(f'{metric}_count{{{label_text}}} {count}')
+    return '\n'.join(lines) + '\n'
+
+
+def reset_metrics():
+    with _lock:
+        _histograms.clear()
+        _requests.clear()
+
+
+def _log_request(request, view, status_code, metrics, total_ms):
+    slow = total_ms >= settings.PERF_SLOW_REQUEST_MS
+    duplicated = metrics.duplicate_count > settings.PERF_DUPLICATE_QUERY_THRESHOLD
+    if not (slow or duplicated):
+        return
+    statements = '\n'.join(
+        f'  {count:>4}x {ms:8.1f} ms  {sql}'
+        for sql, count, ms in metrics.costliest_statements(settings.PERF_LOG_STATEMENTS)
+    )
+    logger.warning(
+        '%s request %s %s (%s) -> %s: %.0f ms, %d queries in %.0f ms, %d duplicate\n%s',
+        'Slow' if slow else 'Duplicate-query', request.method, request.get_full_path(), view, status_code,
+        total_ms, metrics.query_count, metrics.db_ms, metrics.duplicate_count, statements,
+    )
+
+
+class PerfMiddleware:
+    """Instrument each request; list it first in MIDDLEWARE so the total covers everything."""
+
+    def __init__(self, get_response):
+        if not settings.PERF_INSTRUMENTATION:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        install_serializer_timing()
+
+    def __call__(self, request):
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        try:
+            with ExitStack() as stack:
+                wrapper = _execute_wrapper(metrics)
+                for alias in connections:
+                    stack.enter_context(connections[alias].execute_wrapper(wrapper))
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+
+        total_ms = (time.perf_counter() - metrics.started) * 1000
+        match = getattr(request, 'resolver_match', None)
+        view = match.view_name if match is not None else UNRESOLVED_VIEW
+        response_bytes = None if response.streaming else len(response.content)
+        if settings.PERF_SERVER_TIMING:
+            response['Server-Timing'] = server_timing(metrics, total_ms)
+        observe(view, request.method, response.status_code, metrics, total_ms, response_bytes)
+        _log_request(request, view, response.status_code, metrics, total_ms)
+        return response
+
+    def process_template_response(self, request, response):
+        # DRF responses render after the view returns; time it with a callback
+        metrics = _current.get()
+        if metrics is not None:
+            started = time.perf_counter()
+            response.add_post_render_callback(
+                lambda rendered: metrics.add_phase('render', (time.perf_counter() - started) * 1000)
+            )
+        return response
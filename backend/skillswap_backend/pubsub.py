@@ -0,0 +1,145 @@
+"""
+Publish/subscribe layer used to push events to connected clients.
+
+publish() is synchronous so it can be called from regular views and signal
+handlers; subscribe() is an async context manager used by the SSE and
+WebSocket endpoints. has_subscribers() lets publishers skip building events
+nobody would receive. The broker is chosen with the PUBSUB setting:
+
+    PUBSUB = {'BACKEND': 'skillswap_backend.pubsub.InProcessBroker'}
+
+InProcessBroker only reaches clients connected to the same process. For
+several processes, point RedisBroker at Redis or any server speaking its
+protocol:
+
+    PUBSUB = {
+        'BACKEND': 'skillswap_backend.pubsub.RedisBroker',
+        'OPTIONS': {'url': 'redis://localhost:6379/0'},
+    }
+"""
+import asyncio
+import json
+import threading
+from collections import defaultdict
+from contextlib import asynccontextmanager
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.module_loading import import_string
+
+# Events buffered per subscriber before the oldest are dropped
+SUBSCRIBER_BUFFER = 100
+
+
+class Subscription:
+    """Queue of events for one connected client, fed from any thread."""
+
+    def __init__(self, loop):
+        self._loop = loop
+        self._queue = asyncio.Queue(maxsize=SUBSCRIBER_BUFFER)
+
+    def deliver(self, message):
+        self._loop.call_soon_threadsafe(self._put, message)
+
+    def _put(self, message):
+        if self._queue.full():
+            # A slow client loses the oldest events rather than blocking publishers
+            self._queue.get_nowait()
+        self._queue.put_nowait(message)
+
+    async def get(self, timeout=None):
+        """Next event; raises asyncio.TimeoutError after `timeout` seconds."""
+        return await asyncio.wait_for(self._queue.get(), timeout)
+
+
+class InProcessBroker:
+    def __init__(self, **options):
+        self._subscribers = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def has_subscribers(self, channel):
+        return channel in self._subscribers
+
+    def publish(self, channel, message):
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+        for subscription in subscribers:
+            subscription.deliver(message)
+
+    @asynccontextmanager
+    async def subscribe(self, *channels):
+        subscription = Subscription(asyncio.get_running_loop())
+        with self._lock:
+            for channel in channels:
+                self._subscribers[channel].add(subscription)
+        try:
+            yield subscription
+        finally:
+            with self._lock:
+                for channel in channels:
+                    self._subscribers[channel].discard(subscription)
+                    if not self._subscribers[channel]:
+                        del self._subscribers[channel]
+
+
+class _RedisSubscription:
+    def __init__(self, pubsub):
+        self._pubsub = pubsub
+
+    async def get(self, timeout=None):
+        message = await self._pubsub.get_message(ignore_subscribe_messages=True, timeout=timeout)
+        if message is None:
+            raise asyncio.TimeoutError
+        return json.loads(message['data'])
+
+
+class RedisBroker:
+    def __init__(self, url='redis://localhost:6379/0', **options):
+        try:
+            import redis
+        except ImportError:
+            raise ImproperlyConfigured('RedisBroker requires the "redis" package')
+        self._url = url
+        self._client = redis.Redis.from_url(url)
+
+    def has_subscribers(self, channel):
+        return any(count for _, count in self._client.pubsub_numsub(channel))
+
+    def publish(self, channel, message):
+        self._client.publish(channel, json.dumps(message))
+
+    @asynccontextmanager
+    async def subscribe(self, *channels):
+        import redis.asyncio
+
+        client = redis.asyncio.Redis.from_url(self._url)
+        pubsub = client.pubsub()
+        await pubsub.subscribe(*channels)
+        try:
+            yield _RedisSubscription(pubsub)
+        finally:
+            await pubsub.unsubscribe()
+            await pubsub.aclose()
+            await client.aclose()
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    global _broker
+    with _broker_lock:
+        if _broker is None:
+            config = getattr(settings, 'PUBSUB', {})
+            backend = import_string(config.get('BACKEND', 'skillswap_backend.pubsub.InProcessBroker'))
+            _broker = backend(**config.get('OPTIONS', {}))
+    return _broker
+
+
+def publish(channel, message):
+    get_broker().publish(channel, message)
+
+
+def has_subscribers(channel):
+    return get_broker().has_subscribers(channel)
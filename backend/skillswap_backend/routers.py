@@ -0,0 +1,138 @@
+"""
+Primary/replica database routing.
+
+Writes always go to 'default'. Reads go to a replica (settings.DATABASE_REPLICAS)
+only while ReplicaRoutingMiddleware is handling a safe-method request for a
+view that opts in with `replica_reads = True`, and only if:
+
+* the request has not written anything yet,
+* the authenticated user has not written within REPLICA_STICKY_SECONDS
+  (read-your-writes: their own changes may not have replicated yet), and
+* the replica passed its last health check (a SELECT 1, re-run at most every
+  REPLICA_HEALTH_INTERVAL seconds). A failing replica is skipped and reads fall
+  back to the primary.
+
+Everything else, including background threads and management commands, reads
+from the primary.
+"""
+import contextvars
+import random
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError, connections
+from django.utils.functional import SimpleLazyObject
+
+PRIMARY = 'default'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+_routing = contextvars.ContextVar('db_routing', default=None)
+_health = {}
+_health_lock = threading.Lock()
+
+
+class RoutingState:
+    def __init__(self, request):
+        self.request = request
+        self.replica_allowed = False
+        self.wrote = False
+        self.pinned = None
+
+
+def _pin_key(user_id):
+    return f'db:pinned:{user_id}'
+
+
+def _request_user_id(request):
+    # DRF copies the authenticated user onto the underlying HttpRequest. The
+    # session middleware's lazy user is left alone: evaluating it runs a query,
+    # which would re-enter the router.
+    user = request.__dict__.get('user')
+    if user is None or isinstance(user, SimpleLazyObject) or not user.is_authenticated:
+        return None
+    return user.pk
+
+
+def replica_is_healthy(alias):
+    """True if `alias` answered SELECT 1 at its last check, re-checking when stale."""
+    now = time.monotonic()
+    healthy, checked_at = _health.get(alias, (False, None))
+    if checked_at is not None and now - checked_at < settings.REPLICA_HEALTH_INTERVAL:
+        return healthy
+    with _health_lock:
+        healthy, checked_at = _health.get(alias, (False, None))
+        if checked_at is not None and now - checked_at < settings.REPLICA_HEALTH_INTERVAL:
+            return healthy
+        try:
+            with connections[alias].cursor() as cursor:
+                cursor.execute('SELECT 1')
+            healthy = True
+        except DatabaseError:
+            # Drop the broken connection so the next check starts fresh
+            connections[alias].close()
+            healthy = False
+        except Exception:
+            # Unknown alias or anything else: a probe must never fail the request
+            healthy = False
+        _health[alias] = (healthy, now)
+    return healthy
+
+
+def _user_pinned(state):
+    if state.pinned is None:
+        user_id = _request_user_id(state.request)
+        if user_id is None:
+            return False
+        state.pinned = bool(cache.get(_pin_key(user_id)))
+    return state.pinned
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        state = _routing.get()
+        if state is None or not state.replica_allowed or state.wrote or _user_pinned(state):
+            return PRIMARY
+        replicas = [alias for alias in settings.DATABASE_REPLICAS if replica_is_healthy(alias)]
+        return random.choice(replicas) if replicas else PRIMARY
+
+    def db_for_write(self, model, **hints):
+        state = _routing.get()
+        if state is not None:
+            state.wrote = True
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas receive schema changes through replication
+        return db not in settings.DATABASE_REPLICAS
+
+
+class ReplicaRoutingMiddleware:
+    """Scope routing decisions to the request; pin users to the primary after they write."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        state = RoutingState(request)
+        token = _routing.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _routing.reset(token)
+        if state.wrote or request.method not in SAFE_METHODS:
+            user_id = _request_user_id(request)
+            if user_id is not None:
+                cache.set(_pin_key(user_id), 1, timeout=settings.REPLICA_STICKY_SECONDS)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        state = _routing.get()
+        view_class = getattr(view_func, 'view_class', None)
+        if state is not None and request.method in SAFE_METHODS and getattr(view_class, 'replica_reads', False):
+            state.replica_allowed = True
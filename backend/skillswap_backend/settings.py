@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
+import os
 from pathlib import Path
 from datetime import timedelta
 
@@ -39,6 +40,7 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
     'rest_framework',
+    'rest_framework_simplejwt.token_blacklist',
     'corsheaders',
     'users',
     'skills',
@@ -46,12 +48,16 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # First, so its timings cover the rest of the stack
+    'skillswap_backend.perf.PerfMiddleware',
+    'users.profiling.ProfilerMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'skillswap_backend.routers.ReplicaRoutingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -80,12 +86,83 @@ WSGI_APPLICATION = 'skillswap_backend.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 
-DATABASES = {
-    'default': {
+# Applied to every new SQLite connection in production mode (see below)
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 20000,  # ms
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -64 * 1024,  # KiB
+    'temp_store': 'MEMORY',
+}
+
+# SQLite by default. Set DB_ENGINE=postgresql (with DB_NAME, DB_USER,
+# DB_PASSWORD, DB_HOST, DB_PORT) for production: connections then come from
+# psycopg's pool (DB_POOL_MIN/DB_POOL_MAX). Read replicas are listed in
+# DB_REPLICA_HOSTS (comma-separated); with SQLite, DB_REPLICA_NAME points at a
+# second database file standing in for a replica locally.
+if os.environ.get('DB_ENGINE') == 'postgresql':
+    _primary = {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': os.environ.get('DB_NAME', 'skillswap'),
+        'USER': os.environ.get('DB_USER', ''),
+        'PASSWORD': os.environ.get('DB_PASSWORD', ''),
+        'HOST': os.environ.get('DB_HOST', 'localhost'),
+        'PORT': os.environ.get('DB_PORT', '5432'),
+        # Pooled connections replace persistent ones (CONN_MAX_AGE must be 0)
+        'CONN_MAX_AGE': 0,
+        'OPTIONS': {
+            'pool': {
+                'min_size': int(os.environ.get('DB_POOL_MIN', 2)),
+                'max_size': int(os.environ.get('DB_POOL_MAX', 10)),
+            },
+        },
+    }
+    _replicas = {
+        f'replica_{index}': {**_primary, 'HOST': host.strip()}
+        for index, host in enumerate(os.environ.get('DB_REPLICA_HOSTS', '').split(',')) if host.strip()
+    }
+else:
+    _primary = {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'NAME': os.environ.get('DB_NAME', BASE_DIR / 'db.sqlite3'),
+        # Keep connections open between requests, re-checked before reuse
+        'CONN_MAX_AGE': 60,
+        'CONN_HEALTH_CHECKS': True,
     }
+    # Production SQLite mode (DB_SQLITE_MODE=default turns it off): WAL lets
+    # readers run alongside the writer, busy_timeout waits for the write lock
+    # instead of failing with "database is locked", and BEGIN IMMEDIATE takes
+    # that lock up front so a read-then-write transaction never has to upgrade.
+    if os.environ.get('DB_SQLITE_MODE', 'production') == 'production':
+        _primary['OPTIONS'] = {
+            'init_command': ';'.join(f'PRAGMA {name}={value}' for name, value in SQLITE_PRAGMAS.items()),
+            'transaction_mode': 'IMMEDIATE',
+            'timeout': 20,
+        }
+    _replicas = {}
+    if os.environ.get('DB_REPLICA_NAME'):
+        _replicas['replica'] = {**_primary, 'NAME': os.environ['DB_REPLICA_NAME']}
+
+DATABASES = {
+    'default': _primary,
+    # In tests every replica mirrors the test database
+    **{alias: {**config, 'TEST': {'MIRROR': 'default'}} for alias, config in _replicas.items()},
 }
+DATABASE_REPLICAS = list(_replicas)
+DATABASE_ROUTERS = ['skillswap_backend.routers.PrimaryReplicaRouter']
+# Seconds a user's reads stay on the primary after they write
+REPLICA_STICKY_SECONDS = 5
+# Seconds between replica health checks (per process)
+REPLICA_HEALTH_INTERVAL = 10
+
+# Serialized SQLite writes (see skillswap_backend/writequeue.py): hot write
+# paths hand their transactions to one writer thread per process, which
+# commits up to WRITE_QUEUE_BATCH of them together, waiting at most
+# WRITE_QUEUE_WAIT_MS for a batch to fill.
+WRITE_QUEUE_ENABLED = os.environ.get('DB_WRITE_QUEUE', '1') == '1'
+WRITE_QUEUE_BATCH = 32
+WRITE_QUEUE_WAIT_MS = 2
 
 
 # Password validation
@@ -128,6 +205,36 @@ STATIC_URL = 'static/'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Profile photos (see users/photos.py). Generated files have content-hashed
+# names under profile_photos/, so serve them with a far-future, immutable
+# Cache-Control header.
+PHOTO_MAX_UPLOAD_BYTES = 10 * 1024 * 1024
+PHOTO_MAX_PIXELS = 40_000_000
+# Longest side of the re-encoded original
+PHOTO_MAX_DIMENSION = 1024
+# Square variants, in pixels
+PHOTO_VARIANT_SIZES = (64, 128, 256)
+
+# Background work
+# Threads per web process for report jobs and broadcast materialization;
+# 0 leaves that work to the run_report_worker / materialize_broadcast commands
+BACKGROUND_WORKERS = 2
+
+# Real-time notification push (see skillswap_backend/pubsub.py). The
+# in-process broker only reaches clients on the same process; use RedisBroker
+# with OPTIONS {'url': ...} when running several processes.
+PUBSUB = {
+    'BACKEND': 'skillswap_backend.pubsub.InProcessBroker',
+}
+# Seconds a single-use event stream ticket stays redeemable
+STREAM_TICKET_SECONDS = 30
+
+# Background report jobs
+# Seconds a finished report is reused for identical parameters
+REPORT_JOB_TTL = 60 * 60
+# Seconds after which a running job is considered abandoned and re-queued
+REPORT_JOB_TIMEOUT = 60 * 60
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 
@@ -141,7 +248,7 @@ AUTH_USER_MODEL = 'users.User'
 # REST Framework Settings
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'users.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
@@ -150,6 +257,51 @@ REST_FRAMEWORK = {
     'PAGE_SIZE': 10
 }
 
+# Cache. The default is per-process; point this at a shared backend (e.g.
+# django.core.cache.backends.redis.RedisCache) when running several processes,
+# so that skill catalog invalidation reaches all of them.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+}
+
+# Seconds a built skill catalog is kept; bounds staleness on per-process caches
+SKILL_CATALOG_TTL = 300
+
+# List totals are exact up to this many rows and estimated beyond it; an
+# unfiltered table without planner statistics is counted at most once per
+# COUNT_CACHE_SECONDS
+EXACT_COUNT_LIMIT = 10000
+COUNT_CACHE_SECONDS = 60
+
+# Seconds a computed trending-skills list is reused
+TRENDING_CACHE_SECONDS = 300
+
+# Seconds an authenticated user is reused per process without checking for
+# changes in the shared cache entry (see users/authentication.py). Saving a
+# user invalidates it immediately; this only bounds staleness if the shared
+# cache loses the version stamp.
+AUTH_PRINCIPAL_TTL = 60
+
+# Per-request instrumentation (see skillswap_backend/perf.py)
+PERF_INSTRUMENTATION = os.environ.get('PERF_INSTRUMENTATION', '1') == '1'
+# Add Server-Timing headers; they reveal timings to every client
+PERF_SERVER_TIMING = os.environ.get('PERF_SERVER_TIMING', '1') == '1'
+# Log requests slower than this, or with more duplicate queries than this
+PERF_SLOW_REQUEST_MS = int(os.environ.get('PERF_SLOW_REQUEST_MS', 500))
+PERF_DUPLICATE_QUERY_THRESHOLD = int(os.environ.get('PERF_DUPLICATE_QUERY_THRESHOLD', 10))
+# Statements included in each slow-request log entry
+PERF_LOG_STATEMENTS = 5
+
+# On-demand sampling profiler (see users/profiling.py). Seconds between
+# checks for newly armed sessions, default sampling interval, and limits
+# on what an admin can arm.
+PROFILER_POLL_SECONDS = 2
+PROFILER_INTERVAL_MS = 10
+PROFILER_MAX_SECONDS = 600
+PROFILER_MAX_REQUESTS = 1000
+
 # JWT Settings
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=1),
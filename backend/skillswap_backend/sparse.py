@@ -0,0 +1,142 @@
+"""
+Sparse fieldsets, expansion and fast rendering for API responses.
+
+`?fields=id,name` limits each top-level object in a response to those
+fields. Related users nested in other objects are sent as a compact summary.
+`?expand=from_user,rater` replaces the named summaries with the full
+representation. Views pass both lists to serializers with
+sparse_context(request), and loaders use wants()/expanded() to skip
+prefetches for fields that will not be rendered.
+
+FastFieldsMixin renders plain model fields without going through DRF's
+per-field get_attribute()/to_representation() calls, which dominate the
+cost of serializing long lists.
+"""
+from django.conf import settings
+from django.utils import timezone
+from rest_framework import ISO_8601, serializers
+from rest_framework.fields import SkipField
+from rest_framework.relations import PKOnlyObject
+from rest_framework.settings import api_settings
+
+# Fields whose to_representation() returns model values unchanged
+PLAIN_FIELDS = (
+    serializers.BooleanField, serializers.CharField, serializers.EmailField,
+    serializers.IntegerField, serializers.FloatField, serializers.JSONField,
+    serializers.ReadOnlyField,
+)
+
+
+def parse_field_list(value):
+    """'a, b,,c' -> frozenset({'a', 'b', 'c'}); empty or missing -> None."""
+    names = frozenset(name.strip() for name in (value or '').split(',') if name.strip())
+    return names or None
+
+
+def sparse_context(request, **extra):
+    return {
+        'request': request,
+        'fields': parse_field_list(request.query_params.get('fields')),
+        'expand': parse_field_list(request.query_params.get('expand')) or frozenset(),
+        **extra,
+    }
+
+
+def wants(context, name):
+    """True if top-level field `name` will be rendered."""
+    fields = context.get('fields')
+    return fields is None or name in fields
+
+
+def expanded(context, name):
+    """True if summary field `name` (at any depth) is rendered in full."""
+    return name in context.get('expand', ())
+
+
+class SparseFieldsMixin:
+    """
+    Serializer mixin applying context['fields'] and context['expand'].
+
+    `expandable_fields` maps a field name to the serializer class that
+    replaces it when expanded. Field filtering only applies to the outermost
+    serializer; nested objects keep their own fields.
+    """
+    expandable_fields = {}
+
+    def _is_root(self):
+        parent = self.parent
+        if isinstance(parent, serializers.ListSerializer):
+            parent = parent.parent
+        return parent is None
+
+    def get_fields(self):
+        fields = super().get_fields()
+        requested = self.context.get('fields')
+        if requested and self._is_root():
+            fields = {name: field for name, field in fields.items() if name in requested}
+        expand = self.context.get('expand', ())
+        for name, serializer_class in self.expandable_fields.items():
+            if name in fields and name in expand:
+                fields[name] = serializer_class(read_only=True)
+        return fields
+
+
+def _iso_datetime(tz):
+    def convert(value):
+        if tz is not None and timezone.is_aware(value):
+            value = value.astimezone(tz)
+        value = value.isoformat()
+        return value[:-6] + 'Z' if value.endswith('+00:00') else value
+    return convert
+
+
+def _fast_converter(field, model_fields):
+    """(True, converter or None) if `field` can skip DRF's machinery, else (False, None)."""
+    if len(field.source_attrs) != 1 or field.source_attrs[0] not in model_fields:
+        return False, None
+    if type(field) in PLAIN_FIELDS and not getattr(field, 'binary', False):
+        return True, None
+    if (type(field) is serializers.DateTimeField and not hasattr(field, 'timezone') and
+            getattr(field, 'format', api_settings.DATETIME_FORMAT) == ISO_8601 == api_settings.DATETIME_FORMAT):
+        return True, _iso_datetime(timezone.get_current_timezone() if settings.USE_TZ else None)
+    return False, None
+
+
+class FastFieldsMixin:
+    """
+    ModelSerializer mixin: plain fields are read straight off the instance.
+
+    Datetimes are formatted like DRF's ISO 8601 output with the timezone
+    looked up once per serializer instead of per value; every other field
+    (nested, method, choice, decimal...) renders through DRF as usual. The
+    plan is built once per serializer instance, so a list pays for it once.
+    """
+
+    def _representation_plan(self):
+        plan = getattr(self, '_fast_plan', None)
+        if plan is None:
+            plan = []
+            model_fields = {
+                model_field.name for model_field in self.Meta.model._meta.concrete_fields
+                if not model_field.is_relation
+            }
+            for field in self._readable_fields:
+                fast, convert = _fast_converter(field, model_fields)
+                plan.append((field.field_name, field.source_attrs[0] if fast else None, convert if fast else field))
+            self._fast_plan = plan
+        return plan
+
+    def to_representation(self, instance):
+        data = {}
+        for name, attribute, handler in self._representation_plan():
+            if attribute is not None:
+                value = getattr(instance, attribute)
+                data[name] = handler(value) if handler is not None and value is not None else value
+                continue
+            try:
+                value = handler.get_attribute(instance)
+            except SkipField:
+                continue
+            check_for_none = value.pk if isinstance(value, PKOnlyObject) else value
+            data[name] = None if check_for_none is None else handler.to_representation(value)
+        return data
@@ -0,0 +1,103 @@
+"""
+Serialized SQLite writes.
+
+SQLite allows one writer at a time. Under concurrent requests, short write
+transactions queue for the lock, and each commit pays its own fsync. With
+run_serialized() those transactions are instead handed to a single writer
+thread per process. The writer commits them in batches (up to
+WRITE_QUEUE_BATCH, collected for at most WRITE_QUEUE_WAIT_MS), each one in
+its own savepoint, so a failing write only rolls back itself. Callers block
+until their batch has committed and get their function's return value or
+exception back, as if they had run it themselves.
+
+On other backends, for in-memory databases, or when the caller is already
+inside a transaction, the function simply runs inline in a transaction.
+"""
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from django.conf import settings
+from django.db import connections, transaction
+
+logger = logging.getLogger(__name__)
+
+_queue = queue.Queue()
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def enabled(using='default'):
+    connection = connections[using]
+    return (
+        settings.WRITE_QUEUE_ENABLED and
+        connection.vendor == 'sqlite' and
+        not connection.is_in_memory_db()
+    )
+
+
+def run_serialized(func, *args, **kwargs):
+    """Run func(*args, **kwargs) in its own transaction, through the writer thread when enabled."""
+    if not enabled() or connections['default'].in_atomic_block or threading.current_thread() is _writer:
+        with transaction.atomic():
+            return func(*args, **kwargs)
+    future = Future()
+    _queue.put((future, func, args, kwargs))
+    _ensure_writer()
+    return future.result()
+
+
+def _ensure_writer():
+    global _writer
+    if _writer is not None and _writer.is_alive():
+        return
+    with _writer_lock:
+        if _writer is None or not _writer.is_alive():
+            _writer = threading.Thread(target=_writer_loop, name='sqlite-writer', daemon=True)
+            _writer.start()
+
+
+def _next_batch():
+    batch = [_queue.get()]
+    deadline = time.monotonic() + settings.WRITE_QUEUE_WAIT_MS / 1000
+    while len(batch) < settings.WRITE_QUEUE_BATCH:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        try:
+            batch.append(_queue.get(timeout=remaining))
+        except queue.Empty:
+            break
+    return batch
+
+
+def _commit_batch(batch):
+    outcomes = []
+    try:
+        with transaction.atomic():
+            for future, func, args, kwargs in batch:
+                try:
+                    with transaction.atomic():
+                        outcomes.append((future, func(*args, **kwargs), None))
+                except Exception as exc:
+                    outcomes.append((future, None, exc))
+    except Exception as exc:
+        logger.exception('Serialized write batch of %d failed to commit', len(batch))
+        for future, *_ in batch:
+            future.set_exception(exc)
+        return
+    for future, result, exc in outcomes:
+        if exc is None:
+            future.set_result(result)
+        else:
+            future.set_exception(exc)
+
+
+def _writer_loop():
+    while True:
+        batch = _next_batch()
+        # Honour CONN_MAX_AGE / health checks as a request would
+        connections['default'].close_if_unusable_or_obsolete()
+        _commit_batch(batch)
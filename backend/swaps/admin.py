@@ -1,9 +1,41 @@
-from django.contrib import admin
+from django.contrib import admin, messages
+from django.contrib.auth import get_user_model
+from django.db.models import Q
+from skillswap_backend.pagination import EstimatedCountPaginator
+from users.search import admin_search
 from .models import SwapRequest
+from .stats import set_status
+
+
+def status_action(new_status, label):
+    @admin.action(description=f'Mark selected swaps as {label.lower()}', permissions=['change'])
+    def action(modeladmin, request, queryset):
+        count = set_status(queryset, new_status)
+        modeladmin.message_user(request, f'Marked {count} swap(s) as {label.lower()}.', messages.SUCCESS)
+
+    action.__name__ = f'mark_{new_status}'
+    return action
+
 
 @admin.register(SwapRequest)
 class SwapRequestAdmin(admin.ModelAdmin):
     list_display = ['from_user', 'to_user', 'status', 'created_at']
+    list_select_related = ['from_user', 'to_user']
+    # Both filters are served by swap_status_created_idx / swap_created_idx
     list_filter = ['status', 'created_at']
     search_fields = ['from_user__username', 'to_user__username', 'message']
-    ordering = ['-created_at'] 
\ No newline at end of file
+    ordering = ['-created_at', '-id']
+    autocomplete_fields = ['from_user', 'to_user', 'skills_offered', 'skills_wanted']
+    actions = [status_action(status, label) for status, label in SwapRequest.STATUS_CHOICES]
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_search_results(self, request, queryset, search_term):
+        # Participants are found through the user search index; message text has no index and is scanned
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+        users = admin_search(get_user_model().objects.all(), search_term).values('id')
+        return queryset.filter(
+            Q(from_user__in=users) | Q(to_user__in=users) | Q(message__icontains=search_term)
+        ), False
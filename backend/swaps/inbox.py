@@ -0,0 +1,46 @@
+"""
+Swap inbox: a user's sent and received swaps as one keyset-paginated list.
+
+The page is a single query over `from_user OR to_user`, ordered newest
+first by (created_at, id). Per-status counts come from two grouped queries,
+one per direction, each answered from the composite
+(from_user|to_user, status, created_at) indexes on SwapRequest.
+"""
+from django.db.models import Count, Q
+
+from .models import SwapRequest
+
+INBOX_ORDERING = ('-created_at', '-id')
+DIRECTIONS = {
+    'sent': 'from_user',
+    'received': 'to_user',
+}
+STATUSES = [choice for choice, _ in SwapRequest.STATUS_CHOICES]
+
+
+def inbox_queryset(user, direction=None, status=None):
+    """Swaps involving `user`; `direction` is 'sent', 'received' or None for both."""
+    if direction:
+        swaps = SwapRequest.objects.filter(**{DIRECTIONS[direction]: user})
+    else:
+        swaps = SwapRequest.objects.filter(Q(from_user=user) | Q(to_user=user))
+    if status:
+        swaps = swaps.filter(status=status)
+    return swaps
+
+
+def inbox_counts(user):
+    """{'sent': {status: n, ..., 'all': n}, 'received': {...}} for `user`."""
+    counts = {}
+    for direction, column in DIRECTIONS.items():
+        rows = (
+            SwapRequest.objects.filter(**{column: user})
+            .values_list('status')
+            .order_by()
+            .annotate(swaps=Count('id'))
+        )
+        by_status = dict.fromkeys(STATUSES, 0)
+        by_status.update(rows)
+        by_status['all'] = sum(by_status.values())
+        counts[direction] = by_status
+    return counts
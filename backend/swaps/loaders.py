@@ -0,0 +1,35 @@
+"""
+Batched loading for SwapRequestSerializer.
+
+Serializing a swap touches both users, the swap's own skills and every
+rating with its nested users, plus each user's skills where a user is
+expanded to its full representation. load_swaps() fetches all of that up
+front with a fixed number of queries, however many swaps are in the page;
+SwapRequestSerializer then reads only from the prefetch caches. Given the
+serializer context, it skips whatever ?fields= / ?expand= leave out.
+"""
+from django.db.models import Prefetch
+
+from skillswap_backend.sparse import expanded, wants
+from .models import Rating
+
+USER_SKILLS = ('skills_offered', 'skills_wanted')
+
+
+def _user_skill_lookups(*paths):
+    return [f'{path}__{skills}' for path in paths for skills in USER_SKILLS]
+
+
+def load_swaps(queryset, context=None):
+    """Attach every relation SwapRequestSerializer will read to `queryset`."""
+    context = context or {}
+    users = [name for name in ('from_user', 'to_user') if wants(context, name)]
+    raters = [name for name in ('rater', 'rated_user') if expanded(context, name)]
+    lookups = [skills for skills in USER_SKILLS if wants(context, skills)]
+    lookups += _user_skill_lookups(*(name for name in users if expanded(context, name)))
+    if wants(context, 'ratings') or wants(context, 'can_rate'):
+        ratings = Rating.objects.select_related('rater', 'rated_user').prefetch_related(*_user_skill_lookups(*raters))
+        lookups.append(Prefetch('ratings', queryset=ratings))
+    if users:
+        queryset = queryset.select_related(*users)
+    return queryset.prefetch_related(*lookups)
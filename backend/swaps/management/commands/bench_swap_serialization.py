@@ -0,0 +1,85 @@
+import json
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from skills.models import Skill
+from skillswap_backend.sparse import sparse_context
+from swaps.inbox import INBOX_ORDERING, inbox_queryset
+from swaps.loaders import load_swaps
+from swaps.models import Rating, SwapRequest
+from swaps.serializers import SwapRequestSerializer
+from users.models import User
+
+# mode -> query params of GET /api/swaps/
+MODES = {
+    # The payload before compact summaries: every nested user in full
+    'full': {'expand': 'from_user,to_user,rater,rated_user'},
+    'summary': {},
+    'sparse': {'fields': 'id,status,from_user,to_user,created_at'},
+}
+
+
+class Command(BaseCommand):
+    help = 'Measure payload size and serialization time of a swap list with full, summary and sparse users'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--swaps', type=int, default=100, help='Swaps in the measured page')
+        parser.add_argument('--skills', type=int, default=5, help='Skills per user and per swap')
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--json', action='store_true', help='Print results as JSON')
+
+    def handle(self, *args, **options):
+        # Everything is created inside a transaction that is rolled back
+        with transaction.atomic():
+            user = self.create_data(options['swaps'], options['skills'])
+            results = [self.measure(user, mode, options['swaps'], options['repeat']) for mode in MODES]
+            transaction.set_rollback(True)
+
+        if options['json']:
+            self.stdout.write(json.dumps({'swaps': options['swaps'], 'results': results}, indent=2))
+            return
+        self.stdout.write(f'{options["swaps"]} swaps, {options["skills"]} skills each, median of {options["repeat"]}')
+        self.stdout.write(f'{"mode":<9} {"queries":>8} {"ms":>8} {"KB":>8}')
+        for row in results:
+            self.stdout.write(f'{row["mode"]:<9} {row["queries"]:>8} {row["ms"]:>8.1f} {row["bytes"] / 1024:>8.1f}')
+
+    def create_data(self, swap_count, skill_count):
+        stamp = time.time_ns()
+        skills = [Skill.objects.create(name=f'Bench skill {stamp} {index}') for index in range(skill_count)]
+        user = User.objects.create(username=f'bench-{stamp}', first_name='Bench')
+        user.skills_offered.set(skills)
+        for index in range(swap_count):
+            partner = User.objects.create(username=f'bench-{stamp}-{index}', first_name='Partner')
+            partner.skills_offered.set(skills)
+            partner.skills_wanted.set(skills)
+            swap = SwapRequest.objects.create(from_user=user, to_user=partner, status='completed',
+                                              message='Benchmark swap')
+            swap.skills_offered.set(skills)
+            swap.skills_wanted.set(skills)
+            Rating.objects.create(swap_request=swap, rater=partner, rated_user=user, rating=5, comment='Great')
+        return user
+
+    def measure(self, user, mode, limit, repeat):
+        request = Request(APIRequestFactory().get('/api/swaps/', MODES[mode]))
+        request.user = user
+        timings = []
+        for _ in range(repeat):
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                context = sparse_context(request)
+                swaps = load_swaps(inbox_queryset(user, None, None), context).order_by(*INBOX_ORDERING)[:limit]
+                body = JSONRenderer().render(SwapRequestSerializer(swaps, many=True, context=context).data)
+                timings.append((time.perf_counter() - started) * 1000)
+        return {
+            'mode': mode,
+            'queries': len(queries.captured_queries),
+            'ms': round(statistics.median(timings), 2),
+            'bytes': len(body),
+        }
@@ -0,0 +1,52 @@
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from swaps.ratings import AGGREGATE_FIELDS, aggregates_from_ratings, average
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = 'Verify (and by default rebuild) per-user rating aggregates from swaps.Rating'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--check', action='store_true', help='Only report drift, do not write')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        fields = ['id', 'rating', *AGGREGATE_FIELDS]
+        checked = drifted = 0
+        last_id = 0
+
+        while True:
+            users = list(User.objects.filter(id__gt=last_id).order_by('id').only(*fields)[:batch_size])
+            if not users:
+                break
+            last_id = users[-1].id
+            expected = aggregates_from_ratings([user.id for user in users])
+
+            stale = []
+            for user in users:
+                aggregate = expected[user.id]
+                correct_average = Decimal(str(average(aggregate))).quantize(Decimal('0.01'))
+                if all(getattr(user, field) == aggregate[field] for field in AGGREGATE_FIELDS) and user.rating == correct_average:
+                    continue
+                drifted += 1
+                self.stdout.write(
+                    f'User {user.id}: stored sum={user.rating_sum} count={user.rating_count} avg={user.rating}, '
+                    f'expected sum={aggregate["rating_sum"]} count={aggregate["rating_count"]} avg={correct_average}'
+                )
+                for field in AGGREGATE_FIELDS:
+                    setattr(user, field, aggregate[field])
+                user.rating = correct_average
+                stale.append(user)
+
+            if stale and not options['check']:
+                with transaction.atomic():
+                    User.objects.bulk_update(stale, ['rating', *AGGREGATE_FIELDS])
+            checked += len(users)
+
+        action = 'found' if options['check'] else 'fixed'
+        self.stdout.write(self.style.SUCCESS(f'Checked {checked} users, {action} drift on {drifted}'))
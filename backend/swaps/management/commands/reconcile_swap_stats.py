@@ -0,0 +1,63 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, transaction
+from django.db.models import Max, Min
+
+from swaps.models import SwapStats
+from swaps.stats import COUNTER_FIELDS, compute_stats
+from users.models import User
+
+
+def reconcile_chunk(first_id, last_id):
+    rows = compute_stats(first_id, last_id)
+    with transaction.atomic():
+        SwapStats.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=['user'],
+            update_fields=[*COUNTER_FIELDS, 'average_rating'],
+        )
+    return len(rows)
+
+
+def reconcile_chunk_in_thread(chunk):
+    # Worker threads get their own connection; release it when done
+    close_old_connections()
+    try:
+        return reconcile_chunk(*chunk)
+    finally:
+        close_old_connections()
+
+
+class Command(BaseCommand):
+    help = 'Recompute every SwapStats row from SwapRequest, in parallel user-id chunks'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=5000)
+        parser.add_argument('--workers', type=int, default=4,
+                            help='Parallel chunks; 1 runs inline (use it on SQLite)')
+
+    def handle(self, *args, **options):
+        bounds = User.objects.aggregate(first=Min('id'), last=Max('id'))
+        if bounds['first'] is None:
+            self.stdout.write('No users to reconcile')
+            return
+
+        chunk_size = options['chunk_size']
+        chunks = [
+            (start, min(start + chunk_size - 1, bounds['last']))
+            for start in range(bounds['first'], bounds['last'] + 1, chunk_size)
+        ]
+        if options['workers'] <= 1:
+            self.report((reconcile_chunk(*chunk) for chunk in chunks), len(chunks))
+            return
+        with ThreadPoolExecutor(max_workers=options['workers']) as pool:
+            self.report(pool.map(reconcile_chunk_in_thread, chunks), len(chunks))
+
+    def report(self, counts, chunk_count):
+        total = 0
+        for count in counts:
+            total += count
+            self.stdout.write(f'Reconciled {total} users')
+        self.stdout.write(self.style.SUCCESS(f'Swap stats reconciled for {total} users in {chunk_count} chunks'))
@@ -0,0 +1,64 @@
+# Generated by Django 5.1.1 on 2026-10-18 12:05
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_swap_stats(apps, schema_editor):
+    User = apps.get_model('users', 'User')
+    SwapRequest = apps.get_model('swaps', 'SwapRequest')
+    SwapStats = apps.get_model('swaps', 'SwapStats')
+
+    SwapStats.objects.bulk_create(
+        (SwapStats(user_id=user_id) for user_id in User.objects.values_list('id', flat=True).iterator()),
+        batch_size=1000,
+    )
+
+    def total(condition):
+        rows = (
+            SwapRequest.objects.filter(condition)
+            .order_by()
+            .annotate(group=Value(1))
+            .values('group')
+            .annotate(total=Count('*'))
+            .values('total')
+        )
+        return Coalesce(Subquery(rows, output_field=IntegerField()), Value(0))
+
+    involved = Q(from_user=OuterRef('user_id')) | Q(to_user=OuterRef('user_id'))
+    SwapStats.objects.update(
+        total=total(involved),
+        sent=total(Q(from_user=OuterRef('user_id'))),
+        received=total(Q(to_user=OuterRef('user_id'))),
+        average_rating=Subquery(User.objects.filter(pk=OuterRef('user_id')).values('rating')[:1]),
+        **{status: total(involved & Q(status=status)) for status in ('pending', 'accepted', 'rejected', 'completed')},
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('swaps', '0003_alter_swaprequest_status_rating'),
+        ('users', '0008_rating_aggregates'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SwapStats',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='swap_stats', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('total', models.IntegerField(default=0)),
+                ('pending', models.IntegerField(default=0)),
+                ('accepted', models.IntegerField(default=0)),
+                ('rejected', models.IntegerField(default=0)),
+                ('completed', models.IntegerField(default=0)),
+                ('sent', models.IntegerField(default=0)),
+                ('received', models.IntegerField(default=0)),
+                ('average_rating', models.DecimalField(decimal_places=2, default=0.0, max_digits=3)),
+            ],
+        ),
+        migrations.RunPython(backfill_swap_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.1.1 on 2026-10-18 12:07
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('skills', '0002_alter_skill_options_skill_description_and_more'),
+        ('swaps', '0004_swapstats'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='swaprequest',
+            index=models.Index(fields=['from_user', 'status', 'created_at'], name='swap_sent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='swaprequest',
+            index=models.Index(fields=['to_user', 'status', 'created_at'], name='swap_received_idx'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.1.1 on 2026-10-18 13:01
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('skills', '0006_admin_list_indexes'),
+        ('swaps', '0005_swaprequest_inbox_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='swaprequest',
+            index=models.Index(fields=['created_at', 'id'], name='swap_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='swaprequest',
+            index=models.Index(fields=['status', 'created_at', 'id'], name='swap_status_created_idx'),
+        ),
+    ]
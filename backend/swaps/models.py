@@ -24,6 +24,14 @@ class SwapRequest(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Inbox pages and per-status counts for each direction
+            models.Index(fields=['from_user', 'status', 'created_at'], name='swap_sent_idx'),
+            models.Index(fields=['to_user', 'status', 'created_at'], name='swap_received_idx'),
+            # Admin list, newest first, optionally by status
+            models.Index(fields=['created_at', 'id'], name='swap_created_idx'),
+            models.Index(fields=['status', 'created_at', 'id'], name='swap_status_created_idx'),
+        ]
 
 class Rating(models.Model):
     swap_request = models.ForeignKey(SwapRequest, on_delete=models.CASCADE, related_name='ratings')
@@ -38,4 +46,23 @@ class Rating(models.Model):
         ordering = ['-created_at']
 
     def __str__(self):
-        return f"{self.rater.username} rated {self.rated_user.username} {self.rating}/5" 
\ No newline at end of file
+        return f"{self.rater.username} rated {self.rated_user.username} {self.rating}/5" 
+
+class SwapStats(models.Model):
+    """
+    Per-user dashboard counters, kept current by swaps.stats on every swap
+    create, status change, delete and rating, so stats endpoints are a single
+    primary-key lookup. `reconcile_swap_stats` rebuilds them from scratch.
+    """
+    user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, primary_key=True, related_name='swap_stats')
+    total = models.IntegerField(default=0)
+    pending = models.IntegerField(default=0)
+    accepted = models.IntegerField(default=0)
+    rejected = models.IntegerField(default=0)
+    completed = models.IntegerField(default=0)
+    sent = models.IntegerField(default=0)
+    received = models.IntegerField(default=0)
+    average_rating = models.DecimalField(max_digits=3, decimal_places=2, default=0.00)
+
+    def __str__(self):
+        return f"Swap stats for user {self.user_id}"
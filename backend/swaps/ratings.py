@@ -0,0 +1,60 @@
+"""
+Incremental reputation aggregates.
+
+Each user carries rating_sum, rating_count and a ratings_1..ratings_5 star
+histogram. record_rating() folds a new rating in with a single F-expression
+UPDATE inside the caller's transaction, so concurrent ratings cannot lose
+updates and nothing rescans the user's rating history.
+"""
+from django.db.models import Count, DecimalField, F, FloatField, Q, Sum
+from django.db.models.functions import Cast, Round
+
+from skills.counters import record_swap_rating
+from users.models import User
+from .models import Rating
+from .stats import rating_changed
+
+HISTOGRAM_FIELDS = [f'ratings_{stars}' for stars in range(1, 6)]
+AGGREGATE_FIELDS = ['rating_sum', 'rating_count', *HISTOGRAM_FIELDS]
+
+
+def record_rating(rating):
+    """Add `rating` to its rated user's aggregates and refresh the average."""
+    value = rating.rating
+    star_field = f'ratings_{value}'
+    # `rating` is assigned first: all right-hand sides must see the old counters
+    User.objects.filter(pk=rating.rated_user_id).update(
+        rating=Cast(
+            Round(Cast(F('rating_sum') + value, FloatField()) / (F('rating_count') + 1), 2),
+            DecimalField(max_digits=3, decimal_places=2),
+        ),
+        rating_sum=F('rating_sum') + value,
+        rating_count=F('rating_count') + 1,
+        **{star_field: F(star_field) + 1},
+    )
+    rating_changed(rating.rated_user_id)
+    record_swap_rating(rating.swap_request_id, value)
+
+
+def aggregates_from_ratings(user_ids):
+    """Recompute aggregates for `user_ids` from the Rating table in one grouped query."""
+    rows = (
+        Rating.objects.filter(rated_user_id__in=user_ids)
+        .values('rated_user_id')
+        .order_by()
+        .annotate(
+            rating_sum=Sum('rating'),
+            rating_count=Count('id'),
+            **{f'ratings_{stars}': Count('id', filter=Q(rating=stars)) for stars in range(1, 6)},
+        )
+    )
+    aggregates = {user_id: dict.fromkeys(AGGREGATE_FIELDS, 0) for user_id in user_ids}
+    for row in rows:
+        aggregates[row.pop('rated_user_id')] = row
+    return aggregates
+
+
+def average(aggregate):
+    if not aggregate['rating_count']:
+        return 0
+    return round(aggregate['rating_sum'] / aggregate['rating_count'], 2)
@@ -1,11 +1,14 @@
 from rest_framework import serializers
 from .models import SwapRequest, Rating
-from users.serializers import UserSerializer
+from users.serializers import UserSerializer, UserSummaryField
 from skills.serializers import SkillSerializer
+from skillswap_backend.sparse import FastFieldsMixin, SparseFieldsMixin
 
-class RatingSerializer(serializers.ModelSerializer):
-    rater = UserSerializer(read_only=True)
-    rated_user = UserSerializer(read_only=True)
+class RatingSerializer(SparseFieldsMixin, FastFieldsMixin, serializers.ModelSerializer):
+    # Compact user summaries unless ?expand= names them
+    rater = UserSummaryField()
+    rated_user = UserSummaryField()
+    expandable_fields = {'rater': UserSerializer, 'rated_user': UserSerializer}
     
     def validate_rating(self, value):
         if value is None or value < 1 or value > 5:
@@ -17,13 +20,14 @@ class RatingSerializer(serializers.ModelSerializer):
         fields = ['id', 'swap_request', 'rater', 'rated_user', 'rating', 'comment', 'created_at']
         read_only_fields = ['swap_request', 'rater', 'rated_user', 'created_at']
 
-class SwapRequestSerializer(serializers.ModelSerializer):
-    from_user = UserSerializer(read_only=True)
-    to_user = UserSerializer(read_only=True)
+class SwapRequestSerializer(SparseFieldsMixin, FastFieldsMixin, serializers.ModelSerializer):
+    from_user = UserSummaryField()
+    to_user = UserSummaryField()
     skills_offered = SkillSerializer(many=True, read_only=True)
     skills_wanted = SkillSerializer(many=True, read_only=True)
     ratings = RatingSerializer(many=True, read_only=True)
     can_rate = serializers.SerializerMethodField()
+    expandable_fields = {'from_user': UserSerializer, 'to_user': UserSerializer}
 
     class Meta:
         model = SwapRequest
@@ -42,14 +46,21 @@ class SwapRequestSerializer(serializers.ModelSerializer):
         if obj.status != 'completed':
             return False
         
-        user = request.user
-        other_user = obj.to_user if user == obj.from_user else obj.from_user
+        user_id = request.user.id
+        other_user_id = obj.to_user_id if user_id == obj.from_user_id else obj.from_user_id
+        
+        # Answer from the prefetched ratings when load_swaps() was used
+        if 'ratings' in getattr(obj, '_prefetched_objects_cache', {}):
+            return not any(
+                rating.rater_id == user_id and rating.rated_user_id == other_user_id
+                for rating in obj.ratings.all()
+            )
         
         # Check if user has already rated the other person for this swap
         return not Rating.objects.filter(
             swap_request=obj,
-            rater=user,
-            rated_user=other_user
+            rater_id=user_id,
+            rated_user_id=other_user_id
         ).exists()
 
 class SwapRequestCreateSerializer(serializers.ModelSerializer):
@@ -65,3 +76,17 @@ class SwapRequestUpdateSerializer(serializers.ModelSerializer):
     class Meta:
         model = SwapRequest
         fields = ['status']
+
+
+def stats_payload(stats):
+    """Dashboard stats response built from a SwapStats row"""
+    return {
+        'total_swaps': stats.total,
+        'pending_swaps': stats.pending,
+        'accepted_swaps': stats.accepted,
+        'completed_swaps': stats.completed,
+        'rejected_swaps': stats.rejected,
+        'sent_swaps': stats.sent,
+        'received_swaps': stats.received,
+        'average_rating': stats.average_rating,
+    }
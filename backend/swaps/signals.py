@@ -0,0 +1,29 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import stats
+from .models import SwapRequest
+
+
+@receiver(pre_save, sender=SwapRequest)
+def read_stored_status(sender, instance, update_fields=None, **kwargs):
+    # Read at save time rather than load time, so loading swaps costs nothing
+    # extra. The API changes status with stats.change_status, which derives the
+    # transition from its own conditional UPDATE instead.
+    instance._stored_status = None
+    if not instance._state.adding and (update_fields is None or 'status' in update_fields):
+        instance._stored_status = SwapRequest.objects.filter(pk=instance.pk).values_list('status', flat=True).first()
+
+
+@receiver(post_save, sender=SwapRequest)
+def update_stats_on_save(sender, instance, created, **kwargs):
+    if created:
+        stats.swap_created(instance)
+    elif instance._stored_status is not None:
+        stats.swap_status_changed(instance, instance._stored_status, instance.status)
+
+
+@receiver(post_delete, sender=SwapRequest)
+def update_stats_on_delete(sender, instance, **kwargs):
+    # Deletes load each row as they collect it, so its status is current
+    stats.swap_deleted(instance, instance.status)
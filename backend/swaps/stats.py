@@ -0,0 +1,134 @@
+"""
+Per-user swap statistics (SwapStats).
+
+Counters move with F-expression UPDATEs as swaps are created, change status
+or are deleted (one swap at a time through change_status or signals, or a
+whole queryset at once through set_status), and average_rating follows
+User.rating whenever a rating is recorded. compute_stats() rebuilds rows
+from SwapRequest for a range of users and backs the reconcile_swap_stats
+command.
+"""
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.utils import timezone
+
+from users.models import User
+from .models import SwapRequest, SwapStats
+
+STATUSES = [choice for choice, _ in SwapRequest.STATUS_CHOICES]
+COUNTER_FIELDS = ['total', *STATUSES, 'sent', 'received']
+
+
+def _ensure_rows(user_ids):
+    SwapStats.objects.bulk_create([SwapStats(user_id=user_id) for user_id in user_ids], ignore_conflicts=True)
+
+
+def _bump(user_ids, deltas):
+    SwapStats.objects.filter(user_id__in=user_ids).update(
+        **{field: F(field) + delta for field, delta in deltas.items()}
+    )
+
+
+def swap_created(swap):
+    _ensure_rows([swap.from_user_id, swap.to_user_id])
+    _bump([swap.from_user_id], {'total': 1, swap.status: 1, 'sent': 1})
+    _bump([swap.to_user_id], {'total': 1, swap.status: 1, 'received': 1})
+
+
+def swap_status_changed(swap, old_status, new_status):
+    if old_status == new_status:
+        return
+    _ensure_rows([swap.from_user_id, swap.to_user_id])
+    _bump([swap.from_user_id, swap.to_user_id], {old_status: -1, new_status: 1})
+
+
+def change_status(swap, new_status):
+    """
+    Move `swap` from the status it was loaded with to `new_status`.
+
+    The transition is a conditional UPDATE, so when two requests race on
+    the same swap only the one that changed the row moves the counters.
+    Returns False if the swap's status was no longer the loaded one.
+    """
+    old_status = swap.status
+    if old_status == new_status:
+        return True
+    with transaction.atomic():
+        changed = SwapRequest.objects.filter(pk=swap.pk, status=old_status).update(
+            status=new_status, updated_at=timezone.now()
+        )
+        if changed:
+            swap_status_changed(swap, old_status, new_status)
+    if changed:
+        swap.status = new_status
+    return bool(changed)
+
+
+def set_status(swaps, new_status):
+    """
+    Move every swap in `swaps` to `new_status` with one UPDATE, bypassing
+    per-object saves, and apply the matching SwapStats deltas set-wise.
+
+    Returns the number of swaps whose status changed.
+    """
+    with transaction.atomic():
+        changing = swaps.exclude(status=new_status)
+        deltas = defaultdict(lambda: defaultdict(int))  # user id -> {status: delta}
+        for column in ('from_user_id', 'to_user_id'):
+            rows = changing.values_list(column, 'status').order_by().annotate(swaps=Count('id'))
+            for user_id, status, count in rows:
+                deltas[user_id][status] -= count
+                deltas[user_id][new_status] += count
+        updated = changing.update(status=new_status)
+
+        _ensure_rows(deltas)
+        # Users sharing the same deltas take a single UPDATE
+        grouped = defaultdict(list)
+        for user_id, changes in deltas.items():
+            grouped[tuple(sorted((status, delta) for status, delta in changes.items() if delta))].append(user_id)
+        for changes, user_ids in grouped.items():
+            if changes:
+                _bump(user_ids, dict(changes))
+    return updated
+
+
+def swap_deleted(swap, status):
+    _bump([swap.from_user_id], {'total': -1, status: -1, 'sent': -1})
+    _bump([swap.to_user_id], {'total': -1, status: -1, 'received': -1})
+
+
+def rating_changed(user_id):
+    """Copy the freshly updated User.rating into the user's stats row."""
+    _ensure_rows([user_id])
+    SwapStats.objects.filter(user_id=user_id).update(
+        average_rating=Subquery(User.objects.filter(pk=OuterRef('user_id')).values('rating')[:1])
+    )
+
+
+def get_stats(user_id):
+    """The user's stats row, or an unsaved zero row if they have none yet."""
+    return SwapStats.objects.filter(user_id=user_id).first() or SwapStats(user_id=user_id)
+
+
+def compute_stats(first_id, last_id):
+    """Build SwapStats rows from scratch for users with first_id <= id <= last_id."""
+    counters = defaultdict(lambda: dict.fromkeys(COUNTER_FIELDS, 0))
+    for column, direction in (('from_user_id', 'sent'), ('to_user_id', 'received')):
+        rows = (
+            SwapRequest.objects.filter(**{f'{column}__gte': first_id, f'{column}__lte': last_id})
+            .values_list(column, 'status')
+            .order_by()
+            .annotate(swaps=Count('id'))
+        )
+        for user_id, status, swaps in rows:
+            counters[user_id]['total'] += swaps
+            counters[user_id][status] += swaps
+            counters[user_id][direction] += swaps
+
+    users = User.objects.filter(id__gte=first_id, id__lte=last_id).values_list('id', 'rating')
+    return [
+        SwapStats(user_id=user_id, average_rating=rating, **counters.get(user_id, dict.fromkeys(COUNTER_FIELDS, 0)))
+        for user_id, rating in users
+    ]
@@ -1,3 +1,314 @@
+from django.db import connection
 from django.test import TestCase
- 
-# Create your tests here. 
\ No newline at end of file
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from skills.models import Skill
+from users import profiling
+from users.models import User
+from .models import Rating, SwapRequest
+
+
+def make_swaps(user, count, skills):
+    """Create `count` completed, rated swaps between `user` and fresh partners."""
+    for index in range(count):
+        partner = User.objects.create(username=f'partner{SwapRequest.objects.count()}_{index}')
+        partner.skills_offered.set(skills)
+        partner.skills_wanted.set(skills)
+        swap = SwapRequest.objects.create(from_user=user, to_user=partner, status='completed')
+        swap.skills_offered.set(skills)
+        swap.skills_wanted.set(skills)
+        Rating.objects.create(swap_request=swap, rater=partner, rated_user=user, rating=5)
+
+
+class SwapQueryCountTests(TestCase):
+    """Regression guard: swap lists must not issue queries per swap."""
+
+    def setUp(self):
+        self.user = User.objects.create(username='trader', is_staff=True)
+        self.skills = [Skill.objects.create(name=f'Skill {index}') for index in range(3)]
+        self.user.skills_offered.set(self.skills)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        # Poll for profiling sessions now, so no poll lands inside a measured request
+        profiling._sessions['checked_at'] = float('-inf')
+        profiling.armed_sessions()
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(context.captured_queries), response
+
+    def assert_constant_queries(self, url):
+        make_swaps(self.user, 2, self.skills)
+        small, _ = self.count_queries(url)
+        make_swaps(self.user, 8, self.skills)
+        large, response = self.count_queries(url)
+        self.assertEqual(small, large, f'{url} issues per-swap queries ({small} -> {large})')
+        return response
+
+    def test_swap_requests_view(self):
+        response = self.assert_constant_queries('/api/swaps/')
+        self.assertEqual(len(response.data['results']), 10)
+        self.assertTrue(all(swap['can_rate'] for swap in response.data['results']))
+
+    def test_recent_swaps_view(self):
+        self.assert_constant_queries('/api/swaps/recent/')
+
+    def test_admin_swaps_view(self):
+        self.assert_constant_queries('/api/swaps/admin/')
+
+    def test_can_rate_uses_prefetched_ratings(self):
+        make_swaps(self.user, 1, self.skills)
+        swap = SwapRequest.objects.get()
+        Rating.objects.create(swap_request=swap, rater=self.user, rated_user=swap.to_user, rating=4)
+        response = self.client.get('/api/swaps/')
+        self.assertFalse(response.data['results'][0]['can_rate'])
+
+    def test_expanded_users_keep_constant_queries(self):
+        response = self.assert_constant_queries('/api/swaps/?expand=from_user,to_user,rater')
+        swap = response.data['results'][0]
+        self.assertEqual(len(swap['to_user']['skills_offered']), 3)
+        self.assertIn('skills_wanted', swap['ratings'][0]['rater'])
+
+
+class AdminSwapListTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create(username='admin', is_staff=True)
+        self.alice = User.objects.create(username='alice')
+        self.bob = User.objects.create(username='bob')
+        self.carol = User.objects.create(username='carol')
+        self.first = SwapRequest.objects.create(from_user=self.alice, to_user=self.bob, status='completed')
+        self.second = SwapRequest.objects.create(from_user=self.bob, to_user=self.carol)
+        self.third = SwapRequest.objects.create(from_user=self.carol, to_user=self.alice)
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def ids(self, **params):
+        response = self.client.get('/api/swaps/admin/', params)
+        self.assertEqual(response.status_code, 200)
+        return [swap['id'] for swap in response.data['results']]
+
+    def test_pages_and_filters(self):
+        response = self.client.get('/api/swaps/admin/', {'limit': 2})
+        self.assertEqual((response.data['count'], response.data['count_exact']), (3, True))
+        rest = self.ids(limit=2, cursor=response.data['next_cursor'])
+        self.assertEqual([swap['id'] for swap in response.data['results']] + rest,
+                         [self.third.id, self.second.id, self.first.id])
+        self.assertEqual(self.ids(ordering='created_at', status='pending'), [self.second.id, self.third.id])
+        self.assertEqual(self.ids(user=self.alice.id), [self.third.id, self.first.id])
+        self.assertEqual(self.ids(created_from='2000-01-01', created_to='2000-12-31'), [])
+
+    def test_rejects_invalid_filters(self):
+        for params in ({'status': 'lost'}, {'user': 'alice'}, {'ordering': 'status'}, {'created_to': 'soon'}):
+            self.assertEqual(self.client.get('/api/swaps/admin/', params).status_code, 400)
+
+
+class SparseSwapFieldsTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username='trader', first_name='Tess')
+        make_swaps(self.user, 1, [Skill.objects.create(name='Go')])
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_nested_users_are_summaries(self):
+        swap = self.client.get('/api/swaps/').data['results'][0]
+        self.assertEqual(set(swap['from_user']), {'id', 'username', 'name', 'avatar', 'rating'})
+        self.assertEqual(swap['from_user']['name'], 'Tess')
+        self.assertEqual(set(swap['ratings'][0]['rated_user']), {'id', 'username', 'name', 'avatar', 'rating'})
+
+    def test_fields_limits_top_level_keys(self):
+        swap = self.client.get('/api/swaps/', {'fields': 'id,status,to_user'}).data['results'][0]
+        self.assertEqual(set(swap), {'id', 'status', 'to_user'})
+        self.assertEqual(set(swap['to_user']), {'id', 'username', 'name', 'avatar', 'rating'})
+
+
+class SwapInboxTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username='inbox')
+        self.partner = User.objects.create(username='partner')
+        self.sent = [SwapRequest.objects.create(from_user=self.user, to_user=self.partner) for _ in range(3)]
+        self.received = [
+            SwapRequest.objects.create(from_user=self.partner, to_user=self.user, status=swap_status)
+            for swap_status in ('pending', 'accepted')
+        ]
+        SwapRequest.objects.create(from_user=self.partner, to_user=User.objects.create(username='other'))
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_pages_through_both_directions_newest_first(self):
+        seen, cursor = [], None
+        while True:
+            response = self.client.get('/api/swaps/', {'limit': 2, **({'cursor': cursor} if cursor else {})})
+            self.assertEqual(response.status_code, 200)
+            seen += [swap['id'] for swap in response.data['results']]
+            cursor = response.data['next_cursor']
+            if not cursor:
+                break
+        expected = sorted(self.sent + self.received, key=lambda swap: (swap.created_at, swap.id), reverse=True)
+        self.assertEqual(seen, [swap.id for swap in expected])
+
+    def test_direction_and_status_filters(self):
+        response = self.client.get('/api/swaps/', {'direction': 'received', 'status': 'accepted'})
+        self.assertEqual([swap['id'] for swap in response.data['results']], [self.received[1].id])
+        self.assertEqual(response.data['counts']['sent']['pending'], 3)
+        self.assertEqual(response.data['counts']['received']['all'], 2)
+
+    def test_rejects_bad_parameters(self):
+        for params in ({'direction': 'sideways'}, {'status': 'lost'}, {'cursor': 'nope'}):
+            self.assertEqual(self.client.get('/api/swaps/', params).status_code, 400)
+
+
+class RatingAggregateTests(TestCase):
+    def setUp(self):
+        self.rated = User.objects.create(username='rated')
+        self.raters = [User.objects.create(username=f'rater{index}') for index in range(2)]
+        self.client = APIClient()
+
+    def rate(self, rater, stars):
+        swap = SwapRequest.objects.create(from_user=rater, to_user=self.rated, status='completed')
+        self.client.force_authenticate(rater)
+        return self.client.post(f'/api/swaps/{swap.id}/rate/', {'rating': stars}, format='json')
+
+    def test_rating_updates_running_aggregates(self):
+        self.assertEqual(self.rate(self.raters[0], 5).status_code, 201)
+        self.assertEqual(self.rate(self.raters[1], 2).status_code, 201)
+
+        self.rated.refresh_from_db()
+        self.assertEqual((self.rated.rating_sum, self.rated.rating_count), (7, 2))
+        self.assertEqual((self.rated.ratings_2, self.rated.ratings_5), (1, 1))
+        self.assertEqual(str(self.rated.rating), '3.50')
+
+    def test_rebuild_command_reports_and_fixes_drift(self):
+        from io import StringIO
+
+        from django.core.management import call_command
+
+        self.rate(self.raters[0], 4)
+        User.objects.filter(pk=self.rated.pk).update(rating_sum=99, rating=1)
+
+        output = StringIO()
+        call_command('rebuild_rating_aggregates', '--check', stdout=output)
+        self.assertIn('found drift on 1', output.getvalue())
+
+        call_command('rebuild_rating_aggregates', stdout=StringIO())
+        self.rated.refresh_from_db()
+        self.assertEqual((self.rated.rating_sum, str(self.rated.rating)), (4, '4.00'))
+
+
+class SwapStatsTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username='dashboard')
+        self.partners = [User.objects.create(username=f'peer{index}') for index in range(3)]
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def stats(self, url='/api/swaps/stats/'):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_counters_follow_swap_lifecycle(self):
+        sent = SwapRequest.objects.create(from_user=self.user, to_user=self.partners[0])
+        SwapRequest.objects.create(from_user=self.partners[1], to_user=self.user)
+        doomed = SwapRequest.objects.create(from_user=self.user, to_user=self.partners[2])
+
+        sent.status = 'completed'
+        sent.save()
+        doomed.delete()
+
+        data = self.stats()
+        self.assertEqual(
+            (data['total_swaps'], data['pending_swaps'], data['completed_swaps']),
+            (2, 1, 1),
+        )
+        self.assertEqual((data['sent_swaps'], data['received_swaps']), (1, 1))
+        self.assertEqual(self.stats('/api/users/stats/'), data)
+
+        with CaptureQueriesContext(connection) as context:
+            self.client.get('/api/swaps/stats/')
+        self.assertEqual(len(context.captured_queries), 1)
+
+    def test_racing_status_changes_move_counters_once(self):
+        from .stats import change_status
+
+        swap = SwapRequest.objects.create(from_user=self.partners[0], to_user=self.user)
+        first, second = SwapRequest.objects.get(pk=swap.pk), SwapRequest.objects.get(pk=swap.pk)
+        self.assertTrue(change_status(first, 'accepted'))
+        self.assertFalse(change_status(second, 'rejected'))
+
+        data = self.stats()
+        self.assertEqual((data['total_swaps'], data['pending_swaps'], data['accepted_swaps']), (1, 0, 1))
+        response = self.client.patch(f'/api/swaps/{swap.pk}/', {'status': 'rejected'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.stats()['accepted_swaps'], 0)
+
+    def test_rating_updates_average(self):
+        swap = SwapRequest.objects.create(from_user=self.partners[0], to_user=self.user, status='completed')
+        self.client.force_authenticate(self.partners[0])
+        self.client.post(f'/api/swaps/{swap.id}/rate/', {'rating': 4}, format='json')
+        self.client.force_authenticate(self.user)
+        self.assertEqual(str(self.stats()['average_rating']), '4.00')
+
+    def test_reconcile_command_repairs_drift(self):
+        from io import StringIO
+
+        from django.core.management import call_command
+
+        from .models import SwapStats
+
+        SwapRequest.objects.create(from_user=self.user, to_user=self.partners[0], status='accepted')
+        SwapStats.objects.filter(user=self.user).update(total=42, accepted=0)
+        SwapStats.objects.filter(user=self.partners[1]).delete()
+
+        call_command('reconcile_swap_stats', '--chunk-size', '2', '--workers', '1', stdout=StringIO())
+        stats = SwapStats.objects.get(user=self.user)
+        self.assertEqual((stats.total, stats.accepted, stats.sent), (1, 1, 1))
+        self.assertEqual(SwapStats.objects.count(), User.objects.count())
+
+    def test_admin_search_matches_participants_and_messages(self):
+        by_name = SwapRequest.objects.create(from_user=self.user, to_user=self.partners[0])
+        by_message = SwapRequest.objects.create(
+            from_user=self.partners[1], to_user=self.partners[2], message='Happy to teach watercolour',
+        )
+        self.client.force_login(User.objects.create_superuser(username='root', password='x'))
+        for term, expected in (('dashboard', [by_name]), ('WATERCOLOUR', [by_message])):
+            response = self.client.get('/admin/swaps/swaprequest/', {'q': term})
+            self.assertEqual(list(response.context['cl'].result_list), expected)
+
+    def test_admin_status_action_is_one_update_and_keeps_counters(self):
+        from unittest import mock
+
+        from . import admin as swap_admin
+        from .models import SwapStats
+        from .stats import COUNTER_FIELDS, compute_stats, set_status
+
+        admin = User.objects.create_superuser(username='root', password='x')
+        swaps = [SwapRequest.objects.create(from_user=self.user, to_user=partner) for partner in self.partners]
+        swaps[0].status = 'completed'
+        swaps[0].save()
+        self.client.force_login(admin)
+
+        with mock.patch.object(swap_admin, 'set_status', wraps=set_status) as spy, \
+                CaptureQueriesContext(connection) as context:
+            response = self.client.post('/admin/swaps/swaprequest/', {
+                'action': 'mark_accepted', '_selected_action': [swap.id for swap in swaps],
+            })
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(spy.call_args.args[1], 'accepted')
+        updates = [q for q in context.captured_queries if q['sql'].startswith('UPDATE "swaps_swaprequest"')]
+        self.assertEqual(len(updates), 1)
+        self.assertEqual(set(SwapRequest.objects.values_list('status', flat=True)), {'accepted'})
+
+        expected = {row.user_id: row for row in compute_stats(self.user.id, admin.id)}
+        for row in SwapStats.objects.all():
+            self.assertEqual(
+                [getattr(row, field) for field in COUNTER_FIELDS],
+                [getattr(expected[row.user_id], field) for field in COUNTER_FIELDS],
+            )
+        data = self.stats()
+        self.assertEqual(
+            (data['total_swaps'], data['pending_swaps'], data['accepted_swaps'], data['completed_swaps']),
+            (3, 0, 3, 0),
+        )
@@ -3,23 +3,99 @@ from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, IsAdminUser
 from rest_framework import status
 from .models import SwapRequest, Rating
-from .serializers import SwapRequestSerializer, SwapRequestCreateSerializer, SwapRequestUpdateSerializer, RatingSerializer
-from django.db.models import Avg
+from .serializers import SwapRequestSerializer, SwapRequestCreateSerializer, SwapRequestUpdateSerializer, RatingSerializer, stats_payload
+from .inbox import DIRECTIONS, INBOX_ORDERING, STATUSES, inbox_counts, inbox_queryset
+from .loaders import load_swaps
+from .ratings import record_rating
+from .stats import change_status, get_stats
+from django.db import IntegrityError, transaction
+from django.db.models import Q
 from users.models import User, Notification
 from skills.models import Skill
-from django.db import models
+from skillswap_backend.filters import date_range
+from skillswap_backend.pagination import estimated_count, paginate_keyset, parse_limit, parse_ordering
+from skillswap_backend.sparse import sparse_context
+from skillswap_backend.writequeue import run_serialized
+
+def create_swap(from_user, to_user, data):
+    """Create a swap request with its skills and notify the recipient."""
+    swap_request = SwapRequest.objects.create(
+        from_user=from_user,
+        to_user=to_user,
+        message=data.get('message', '')
+    )
+    
+    # Add skills relationships
+    if 'skills_offered' in data:
+        swap_request.skills_offered.set(Skill.objects.filter(id__in=data['skills_offered']))
+    
+    if 'skills_wanted' in data:
+        swap_request.skills_wanted.set(Skill.objects.filter(id__in=data['skills_wanted']))
+    
+    # Create notification for the recipient
+    Notification.objects.create(
+        user=to_user,
+        message=f"{from_user.first_name or from_user.username} sent you a skill swap request!"
+    )
+    return swap_request
+
+def update_swap_status(swap_request, new_status, actor):
+    """
+    Move a swap request to `new_status` and notify the sender.
+
+    Returns False, changing nothing, if another request changed its status first.
+    """
+    if swap_request.status == new_status:
+        return True
+    if not change_status(swap_request, new_status):
+        return False
+    
+    name = actor.first_name or actor.username
+    if new_status == 'accepted':
+        message = f"{name} accepted your skill swap request!"
+    elif new_status == 'rejected':
+        message = f"{name} rejected your skill swap request."
+    elif new_status == 'completed':
+        message = f"{name} marked your skill swap as completed!"
+    else:
+        message = f"Your skill swap request status was updated to {new_status}."
+    
+    Notification.objects.create(
+        user=swap_request.from_user,
+        message=message
+    )
+    return True
 
 class SwapRequestsView(APIView):
     permission_classes = [IsAuthenticated]
+    replica_reads = True
 
     def get(self, request):
-        # Get both sent and received swap requests
-        sent_swaps = SwapRequest.objects.filter(from_user=request.user)
-        received_swaps = SwapRequest.objects.filter(to_user=request.user)
-        
-        # Combine and serialize
-        all_swaps = list(sent_swaps) + list(received_swaps)
-        return Response(SwapRequestSerializer(all_swaps, many=True, context={'request': request}).data)
+        """
+        The user's swap inbox, newest first, cursor-paginated.
+
+        Query params: direction (sent|received), status, limit, cursor.
+        """
+        params = request.query_params
+        direction = params.get('direction') or None
+        if direction and direction not in DIRECTIONS:
+            return Response({'error': f'direction must be one of {", ".join(DIRECTIONS)}'}, status=status.HTTP_400_BAD_REQUEST)
+        swap_status = params.get('status') or None
+        if swap_status and swap_status not in STATUSES:
+            return Response({'error': f'status must be one of {", ".join(STATUSES)}'}, status=status.HTTP_400_BAD_REQUEST)
+
+        context = sparse_context(request)
+        swaps = load_swaps(inbox_queryset(request.user, direction, swap_status), context)
+        try:
+            page, next_cursor = paginate_keyset(swaps, INBOX_ORDERING, params.get('cursor'), parse_limit(request))
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({
+            'results': SwapRequestSerializer(page, many=True, context=context).data,
+            'next_cursor': next_cursor,
+            'counts': inbox_counts(request.user),
+        })
 
     def post(self, request):
         serializer = SwapRequestCreateSerializer(data=request.data)
@@ -36,27 +112,8 @@ class SwapRequestsView(APIView):
             except User.DoesNotExist:
                 return Response({'error': 'Target user not found'}, status=status.HTTP_404_NOT_FOUND)
             
-            # Create the swap request
-            swap_request = SwapRequest.objects.create(
-                from_user=request.user,
-                to_user=to_user,
-                message=serializer.validated_data.get('message', '')
-            )
-            
-            # Add skills relationships
-            if 'skills_offered' in serializer.validated_data:
-                skills_offered = Skill.objects.filter(id__in=serializer.validated_data['skills_offered'])
-                swap_request.skills_offered.set(skills_offered)
-            
-            if 'skills_wanted' in serializer.validated_data:
-                skills_wanted = Skill.objects.filter(id__in=serializer.validated_data['skills_wanted'])
-                swap_request.skills_wanted.set(skills_wanted)
-            
-            # Create notification for the recipient
-            Notification.objects.create(
-                user=to_user,
-                message=f"{request.user.first_name or request.user.username} sent you a skill swap request!"
-            )
+            # Hot write path: batched with other requests' writes on SQLite
+            swap_request = run_serialized(create_swap, request.user, to_user, serializer.validated_data)
             
             return Response(SwapRequestSerializer(swap_request, context={'request': request}).data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -74,24 +131,8 @@ class SwapRequestDetailView(APIView):
         if serializer.is_valid():
             new_status = serializer.validated_data.get('status')
             
-            # Update the swap request status
-            swap_request.status = new_status
-            swap_request.save()
-            
-            # Create notification for the sender
-            if new_status == 'accepted':
-                message = f"{request.user.first_name or request.user.username} accepted your skill swap request!"
-            elif new_status == 'rejected':
-                message = f"{request.user.first_name or request.user.username} rejected your skill swap request."
-            elif new_status == 'completed':
-                message = f"{request.user.first_name or request.user.username} marked your skill swap as completed!"
-            else:
-                message = f"Your skill swap request status was updated to {new_status}."
-            
-            Notification.objects.create(
-                user=swap_request.from_user,
-                message=message
-            )
+            if not run_serialized(update_swap_status, swap_request, new_status, request.user):
+                return Response({'error': 'Swap request was updated by someone else; reload it'}, status=status.HTTP_409_CONFLICT)
             
             return Response(SwapRequestSerializer(swap_request, context={'request': request}).data)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -122,16 +163,17 @@ class RatingView(APIView):
         
         serializer = RatingSerializer(data=request.data)
         if serializer.is_valid():
-            rating = serializer.save(
-                swap_request=swap_request,
-                rater=request.user,
-                rated_user=rated_user
-            )
-            
-            # Update the rated user's average rating
-            avg_rating = Rating.objects.filter(rated_user=rated_user).aggregate(Avg('rating'))['rating__avg']
-            rated_user.rating = round(avg_rating, 2) if avg_rating else 0.00
-            rated_user.save()
+            # Insert the rating and fold it into the rated user's aggregates atomically
+            try:
+                with transaction.atomic():
+                    rating = serializer.save(
+                        swap_request=swap_request,
+                        rater=request.user,
+                        rated_user=rated_user
+                    )
+                    record_rating(rating)
+            except IntegrityError:
+                return Response({'error': 'You have already rated this user for this swap'}, status=status.HTTP_400_BAD_REQUEST)
             
             # Create notification for the rated user
             Notification.objects.create(
@@ -145,31 +187,63 @@ class RatingView(APIView):
 
 class SwapStatsView(APIView):
     permission_classes = [IsAuthenticated]
+    replica_reads = True
 
     def get(self, request):
-        swaps = SwapRequest.objects.filter(
-            (models.Q(from_user=request.user) | models.Q(to_user=request.user))
-        )
-        return Response({
-            "total_swaps": swaps.count(),
-            "completed_swaps": swaps.filter(status='completed').count(),
-            "pending_swaps": swaps.filter(status='pending').count(),
-            "average_rating": request.user.rating,
-        })
+        # Served from the materialized per-user stats row
+        return Response(stats_payload(get_stats(request.user.id)))
 
 class RecentSwapsView(APIView):
     permission_classes = [IsAuthenticated]
+    replica_reads = True
 
     def get(self, request):
-        swaps = SwapRequest.objects.filter(from_user=request.user).order_by('-created_at')[:5]
-        return Response(SwapRequestSerializer(swaps, many=True, context={'request': request}).data)
+        context = sparse_context(request)
+        swaps = load_swaps(SwapRequest.objects.filter(from_user=request.user), context).order_by('-created_at')[:5]
+        return Response(SwapRequestSerializer(swaps, many=True, context=context).data)
+
+ADMIN_SWAP_ORDERINGS = {
+    '-created_at': ('-created_at', '-id'),
+    'created_at': ('created_at', 'id'),
+}
 
 class AdminSwapsListView(APIView):
     permission_classes = [IsAdminUser]
+    replica_reads = True
 
     def get(self, request):
-        status_filter = request.query_params.get('status', '')
-        swaps = SwapRequest.objects.all()
-        if status_filter:
-            swaps = swaps.filter(status=status_filter)
-        return Response(SwapRequestSerializer(swaps, many=True, context={'request': request}).data)
+        """
+        Keyset-paginated list of every swap.
+
+        Query params: status, user (either side), created_from, created_to,
+        ordering, limit, cursor.
+        """
+        params = request.query_params
+        swap_status = params.get('status') or None
+        if swap_status and swap_status not in STATUSES:
+            return Response({'error': f'status must be one of {", ".join(STATUSES)}'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            ordering = parse_ordering(request, ADMIN_SWAP_ORDERINGS, '-created_at')
+            swaps = SwapRequest.objects.filter(date_range(params, 'created_at', 'created'))
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        if swap_status:
+            swaps = swaps.filter(status=swap_status)
+        user_id = params.get('user')
+        if user_id:
+            if not user_id.isdigit():
+                return Response({'error': 'user must be a user id'}, status=status.HTTP_400_BAD_REQUEST)
+            swaps = swaps.filter(Q(from_user_id=user_id) | Q(to_user_id=user_id))
+
+        context = sparse_context(request)
+        count, count_exact = estimated_count(swaps)
+        try:
+            page, next_cursor = paginate_keyset(load_swaps(swaps, context), ordering, params.get('cursor'), parse_limit(request))
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({
+            'results': SwapRequestSerializer(page, many=True, context=context).data,
+            'next_cursor': next_cursor,
+            'count': count,
+            'count_exact': count_exact,
+        })
@@ -1,18 +1,41 @@
-from django.contrib import admin
+from django.contrib import admin, messages
 from django.contrib.auth.admin import UserAdmin
+from django.db import transaction
+from skillswap_backend.pagination import EstimatedCountPaginator
+from .authentication import invalidate_principal
 from .models import User
+from .search import admin_search
+
+
+def set_active(queryset, is_active):
+    """Ban or reactivate every user in `queryset` with one UPDATE."""
+    user_ids = list(queryset.exclude(is_active=is_active).values_list('id', flat=True))
+    User.objects.filter(id__in=user_ids).update(is_active=is_active)
+    # update() sends no post_save, so drop cached principals here (see signals.invalidate_cached_principal)
+    for user_id in user_ids:
+        invalidate_principal(user_id)
+    transaction.on_commit(lambda: [invalidate_principal(user_id) for user_id in user_ids])
+    return len(user_ids)
+
 
 @admin.register(User)
 class CustomUserAdmin(UserAdmin):
-    list_display = ['username', 'email', 'first_name', 'last_name', 'is_public', 'rating', 'created_at']
-    list_filter = ['is_public', 'is_staff', 'is_superuser', 'created_at']
+    list_display = ['username', 'email', 'first_name', 'last_name', 'is_active', 'is_public', 'rating', 'created_at']
+    list_filter = ['is_active', 'is_public', 'is_staff', 'is_superuser', 'created_at']
     search_fields = ['username', 'email', 'first_name', 'last_name']
-    ordering = ['-created_at']
+    ordering = ['-created_at', '-id']
+    autocomplete_fields = ['skills_offered', 'skills_wanted']
+    actions = ['ban_users', 'activate_users']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     
     fieldsets = UserAdmin.fieldsets + (
         ('Profile Info', {
             'fields': ('photo', 'bio', 'location', 'is_public', 'rating', 'availability')
         }),
+        ('Skills', {
+            'fields': ('skills_offered', 'skills_wanted')
+        }),
     )
     
     add_fieldsets = UserAdmin.add_fieldsets + (
@@ -20,3 +43,17 @@ class CustomUserAdmin(UserAdmin):
             'fields': ('photo', 'bio', 'location', 'is_public', 'availability')
         }),
     )
+
+    def get_search_results(self, request, queryset, search_term):
+        # Served by the trigram index instead of an icontains scan per column
+        return admin_search(queryset, search_term), False
+
+    @admin.action(description='Ban selected users', permissions=['change'])
+    def ban_users(self, request, queryset):
+        count = set_active(queryset, False)
+        self.message_user(request, f'Banned {count} user(s).', messages.SUCCESS)
+
+    @admin.action(description='Activate selected users', permissions=['change'])
+    def activate_users(self, request, queryset):
+        count = set_active(queryset, True)
+        self.message_user(request, f'Activated {count} user(s).', messages.SUCCESS)
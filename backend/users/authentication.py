@@ -0,0 +1,100 @@
+"""
+Cached JWT authentication.
+
+JWTAuthentication loads the User row on every authenticated request. Here
+the principal is cached instead: in the shared cache under the user's
+current version stamp, and in a per-process dict for AUTH_PRINCIPAL_TTL
+seconds. Each request costs one shared-cache read (the version) and no
+query. Saving or deleting a user bumps the stamp (signals.py), so bans,
+profile edits and password changes take effect on the next request.
+
+Only refresh tokens are ever blacklisted (rotation gives each access token
+a fresh jti), so access tokens are not checked against the blacklist. The
+refresh endpoint keeps simplejwt's indexed blacklist lookup.
+"""
+import pickle
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from skillswap_backend import perf
+from .models import User
+
+# Entries kept per process before the principal cache starts over
+PRINCIPAL_CACHE_SIZE = 10000
+
+_principals = {}
+
+
+def _version_key(user_id):
+    return f'auth:principal:{user_id}:version'
+
+
+def _current_version(key):
+    version = cache.get(key)
+    if version is None:
+        # Start from a fresh value, never from one an old entry may carry
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def _bump(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, time.time_ns(), timeout=None)
+
+
+def invalidate_principal(user_id):
+    _bump(_version_key(user_id))
+
+
+def get_principal(user_id):
+    """The User with `user_id` (a private copy), or None; cached as described above."""
+    version = _current_version(_version_key(user_id))
+    now = time.monotonic()
+    entry = _principals.get(user_id)
+    if entry is not None and entry[0] == version and entry[1] > now:
+        # Unpickle per request so views never share a mutable instance
+        return pickle.loads(entry[2])
+
+    shared_key = f'auth:principal:{user_id}:{version}'
+    user = cache.get(shared_key)
+    if user is None:
+        user = User.objects.filter(pk=user_id).first()
+        if user is None:
+            return None
+        cache.set(shared_key, user, timeout=settings.AUTH_PRINCIPAL_TTL)
+    if len(_principals) >= PRINCIPAL_CACHE_SIZE:
+        _principals.clear()
+    _principals[user_id] = (version, now + settings.AUTH_PRINCIPAL_TTL, pickle.dumps(user))
+    return user
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication with a cached principal."""
+
+    def authenticate(self, request):
+        with perf.timed('auth'):
+            return super().authenticate(request)
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_('Token contained no recognizable user identification'))
+
+        user = get_principal(user_id)
+        if user is None:
+            raise AuthenticationFailed(_('User not found'), code='user_not_found')
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+        return user
+
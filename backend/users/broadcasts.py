@@ -0,0 +1,102 @@
+"""
+Platform broadcasts.
+
+Sending a broadcast is a single INSERT. Each user's notification feed merges
+in the broadcasts sent since they joined, with read state kept in
+BroadcastReceipt. materialize_broadcast() optionally copies a broadcast into
+per-user Notification rows in fixed-size batches, recording progress on the
+Broadcast row so it can be resumed and polled.
+"""
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Exists, F, OuterRef, Q
+
+from skillswap_backend import background
+from .models import Broadcast, BroadcastReceipt, Notification
+
+User = get_user_model()
+
+MATERIALIZE_BATCH_SIZE = 1000
+
+
+def send_broadcast(sender, title, message, materialize=False):
+    broadcast = Broadcast.objects.create(
+        created_by=sender,
+        title=title,
+        message=message,
+        materialize_status='queued' if materialize else 'none',
+    )
+    if materialize:
+        transaction.on_commit(lambda: background.submit(materialize_broadcast, broadcast.id))
+
+    from .realtime import push_broadcast
+    push_broadcast(broadcast)
+    return broadcast
+
+
+def visible_broadcasts(user):
+    """Broadcasts `user` should see that are not already Notification rows for them."""
+    return Broadcast.objects.filter(
+        Q(materialized_through__isnull=True) | Q(materialized_through__lt=user.id),
+        created_at__gte=user.date_joined,
+    ).annotate(
+        read=Exists(BroadcastReceipt.objects.filter(broadcast=OuterRef('pk'), user=user))
+    )
+
+
+def mark_broadcasts_read(user, broadcast_ids=None):
+    """Record receipts for the given (or all visible) broadcasts; returns how many were new."""
+    unread = visible_broadcasts(user).filter(read=False)
+    if broadcast_ids is not None:
+        unread = unread.filter(id__in=broadcast_ids)
+    receipts = [BroadcastReceipt(user=user, broadcast_id=broadcast_id) for broadcast_id in unread.values_list('id', flat=True)]
+    BroadcastReceipt.objects.bulk_create(receipts, ignore_conflicts=True)
+    return len(receipts)
+
+
+def materialize_broadcast(broadcast_id, batch_size=MATERIALIZE_BATCH_SIZE, progress=None):
+    """
+    Insert one Notification per active recipient, `batch_size` users at a time.
+
+    Resumes from `materialized_through`, so a crashed or interrupted run can
+    simply be started again. `progress(count)` is called after each batch.
+    """
+    from .notifications import adjust_unread
+
+    broadcast = Broadcast.objects.get(id=broadcast_id)
+    if broadcast.materialize_status == 'done':
+        return broadcast
+    Broadcast.objects.filter(id=broadcast_id).update(materialize_status='running')
+
+    last_id = broadcast.materialized_through or 0
+    recipients = User.objects.filter(is_active=True, date_joined__lte=broadcast.created_at).order_by('id')
+    read_by = BroadcastReceipt.objects.filter(broadcast_id=broadcast_id)
+    while True:
+        batch = list(recipients.filter(id__gt=last_id).values_list('id', flat=True)[:batch_size])
+        if not batch:
+            break
+        already_read = set(read_by.filter(user_id__in=batch).values_list('user_id', flat=True))
+        with transaction.atomic():
+            Notification.objects.bulk_create([
+                Notification(user_id=user_id, message=broadcast.message, broadcast_id=broadcast_id,
+                             read=user_id in already_read)
+                for user_id in batch
+            ])
+            # bulk_create skips signals, so bump the unread counters here
+            adjust_unread([user_id for user_id in batch if user_id not in already_read], 1)
+            last_id = batch[-1]
+            Broadcast.objects.filter(id=broadcast_id).update(
+                materialized_through=last_id,
+                materialized_count=F('materialized_count') + len(batch),
+            )
+        if progress:
+            progress(Broadcast.objects.values_list('materialized_count', flat=True).get(id=broadcast_id))
+
+    # Cover every id so users who join later never see it twice
+    Broadcast.objects.filter(id=broadcast_id).update(
+        materialize_status='done',
+        materialized_through=User.objects.order_by('-id').values_list('id', flat=True).first() or last_id,
+    )
+    BroadcastReceipt.objects.filter(broadcast_id=broadcast_id).delete()
+    broadcast.refresh_from_db()
+    return broadcast
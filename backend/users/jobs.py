@@ -0,0 +1,139 @@
+"""
+Background report generation.
+
+ReportJob rows are the queue. submit_report_job() reuses a finished
+artifact for identical parameters while it is within REPORT_JOB_TTL, or
+joins a job already in flight; otherwise it queues a new row and wakes
+the shared in-process worker pool, which also purges expired artifacts
+after each run. Standalone workers can drain the same table with
+`python manage.py run_report_worker`.
+"""
+import gzip
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from skillswap_backend import background
+from .models import ReportJob
+from .reports import iter_csv
+
+logger = logging.getLogger(__name__)
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def params_hash(report_type, filters, compress):
+    payload = json.dumps({'type': report_type, 'filters': filters, 'compress': compress}, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def submit_report_job(user, report_type, filters, compress=False):
+    """Return (job, reused) for the requested report."""
+    digest = params_hash(report_type, filters, compress)
+    now = timezone.now()
+
+    existing = (
+        ReportJob.objects.filter(params_hash=digest)
+        .filter(Q(status='done', expires_at__gt=now) | Q(status__in=['queued', 'running']))
+        .order_by('-created_at')
+        .first()
+    )
+    if existing:
+        return existing, True
+
+    job = ReportJob.objects.create(
+        requested_by=user,
+        report_type=report_type,
+        filters=filters,
+        compress=compress,
+        params_hash=digest,
+    )
+    transaction.on_commit(_wake_workers)
+    return job, False
+
+
+def _wake_workers():
+    # Without an in-process pool a run_report_worker process picks the job up
+    background.submit(process_queue)
+
+
+def claim_next_job():
+    """Atomically move the oldest runnable job to 'running' and return it."""
+    stale_before = timezone.now() - timedelta(seconds=_setting('REPORT_JOB_TIMEOUT', 3600))
+    runnable = Q(status='queued') | Q(status='running', started_at__lt=stale_before)
+    while True:
+        job_id = ReportJob.objects.filter(runnable).order_by('created_at', 'id').values_list('id', flat=True).first()
+        if job_id is None:
+            return None
+        # Only one worker wins the conditional UPDATE
+        if ReportJob.objects.filter(runnable, id=job_id).update(status='running', started_at=timezone.now()):
+            return ReportJob.objects.get(id=job_id)
+
+
+def run_job(job):
+    """Build the artifact for a claimed job and record the outcome."""
+    suffix = '.csv.gz' if job.compress else '.csv'
+    handle, path = tempfile.mkstemp(suffix=suffix)
+    os.close(handle)
+    try:
+        opener = gzip.open if job.compress else open
+        with opener(path, 'wt', encoding='utf-8', newline='') as output:
+            for chunk in iter_csv(job.report_type, job.filters):
+                output.write(chunk)
+
+        with open(path, 'rb') as artifact:
+            job.file.save(f'{job.report_type}_{job.params_hash[:12]}_{job.pk}{suffix}', File(artifact), save=False)
+        job.size = job.file.size
+        job.status = 'done'
+        job.error = ''
+        job.expires_at = timezone.now() + timedelta(seconds=_setting('REPORT_JOB_TTL', 3600))
+    except Exception as e:
+        logger.exception('Report job %s failed', job.pk)
+        job.status = 'failed'
+        job.error = str(e)
+    finally:
+        os.remove(path)
+    job.finished_at = timezone.now()
+    job.save(update_fields=['file', 'size', 'status', 'error', 'expires_at', 'finished_at'])
+    return job
+
+
+def run_pending_jobs():
+    """Drain the queue; returns the number of jobs processed."""
+    processed = 0
+    while True:
+        job = claim_next_job()
+        if job is None:
+            return processed
+        run_job(job)
+        processed += 1
+
+
+def process_queue():
+    """Drain the queue, then purge expired artifacts; the in-process pool's task."""
+    processed = run_pending_jobs()
+    purge_expired_jobs()
+    return processed
+
+
+def purge_expired_jobs():
+    """Delete expired artifacts and their rows; returns the number removed."""
+    expired = ReportJob.objects.filter(status='done', expires_at__lte=timezone.now())
+    removed = 0
+    for job in expired.iterator():
+        if job.file:
+            job.file.delete(save=False)
+        job.delete()
+        removed += 1
+    return removed
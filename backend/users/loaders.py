@@ -0,0 +1,14 @@
+"""
+Batched loading for UserSerializer lists.
+
+Prefetches each user's skills in two queries for the whole list, and skips
+the prefetch when ?fields= leaves the skill lists out of the response.
+"""
+from skillswap_backend.sparse import wants
+
+USER_SKILLS = ('skills_offered', 'skills_wanted')
+
+
+def with_user_skills(queryset, context=None):
+    lookups = [name for name in USER_SKILLS if wants(context or {}, name)]
+    return queryset.prefetch_related(*lookups) if lookups else queryset
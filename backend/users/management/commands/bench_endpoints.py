@@ -0,0 +1,279 @@
+import json
+import logging
+import math
+import re
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, URLResolver, get_resolver
+from django.utils import timezone
+from rest_framework.permissions import IsAdminUser
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from skills.models import Skill
+from swaps.models import Rating, SwapRequest
+from users.models import ProfileSession, ReportJob, User
+
+URLCONFS = ('users.urls', 'skills.urls', 'swaps.urls')
+ROUTE_PARAM = re.compile(r'<(?:\w+:)?(\w+)>')
+# URL name -> reason it is never benchmarked
+SKIPPED = {
+    'notifications-stream': 'server-sent event stream',
+}
+# URL name -> query params of a representative request
+QUERY_PARAMS = {
+    'user-search': {'q': 'an', 'limit': 20},
+    'skills-autocomplete': {'q': 'py'},
+    'skills-list': {'name': 'py'},
+    'admin-user-list': {'search': 'a'},
+    'admin-skills': {'search': 'py'},
+}
+
+
+def discover_endpoints():
+    """[(name, route, view class)] for every URL of the benchmarked apps."""
+    endpoints = []
+
+    def walk(patterns, prefix, inside):
+        for pattern in patterns:
+            route = prefix + str(pattern.pattern)
+            if isinstance(pattern, URLResolver):
+                name = getattr(pattern.urlconf_name, '__name__', pattern.urlconf_name)
+                walk(pattern.url_patterns, route, inside or name in URLCONFS)
+            elif isinstance(pattern, URLPattern) and inside:
+                endpoints.append((pattern.name, route, getattr(pattern.callback, 'view_class', None)))
+
+    walk(get_resolver().url_patterns, '/', False)
+    return endpoints
+
+
+def percentile(ordered, pct):
+    """Nearest-rank percentile of an ascending list."""
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+def is_admin_view(view_class):
+    return any(issubclass(permission, IsAdminUser) for permission in getattr(view_class, 'permission_classes', ()))
+
+
+class Command(BaseCommand):
+    help = 'Drive every GET endpoint of the API with concurrent authenticated clients and report latency'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help='Requests per endpoint')
+        parser.add_argument('--concurrency', type=int, default=8, help='Concurrent clients')
+        parser.add_argument('--warmup', type=int, default=5, help='Unmeasured requests per client first')
+        parser.add_argument('--include', nargs='*', default=[], help='Only these URL names')
+        parser.add_argument('--exclude', nargs='*', default=[], help='Skip these URL names')
+        parser.add_argument('--base-url',
+                            help='Send HTTP requests to a running server instead of in-process (no query counts)')
+        parser.add_argument('--output', help='Write results to this JSON file')
+        parser.add_argument('--compare', help='Print the change against an earlier JSON result')
+
+    def handle(self, *args, **options):
+        self.options = options
+        users = self.client_users(options['concurrency'])
+        staff = User.objects.filter(is_staff=True, is_active=True).order_by('id').first()
+        self.tokens = [str(RefreshToken.for_user(user).access_token) for user in users]
+        self.staff_token = str(RefreshToken.for_user(staff).access_token) if staff else None
+        self.path_params = self.example_path_params(users[0])
+
+        # Expected 4xx responses would otherwise be logged once per request
+        logging.getLogger('django.request').setLevel(logging.ERROR)
+        results, skipped = [], []
+        for name, route, view_class in discover_endpoints():
+            if options['include'] and name not in options['include'] or name in options['exclude']:
+                continue
+            reason = self.skip_reason(name, route, view_class)
+            if reason:
+                skipped.append({'name': name, 'route': route, 'reason': reason})
+                continue
+            result = self.run_endpoint(name, self.build_path(route), is_admin_view(view_class))
+            results.append(result)
+            self.stdout.write(self.format_row(result))
+
+        report = {
+            'meta': {
+                'started_at': timezone.now().isoformat(),
+                'mode': 'http' if options['base_url'] else 'in-process',
+                'base_url': options['base_url'],
+                'concurrency': options['concurrency'],
+                'requests': options['requests'],
+                'dataset': {
+                    'users': User.objects.count(),
+                    'skills': Skill.objects.count(),
+                    'swaps': SwapRequest.objects.count(),
+                    'ratings': Rating.objects.count(),
+                },
+            },
+            'endpoints': results,
+            'skipped': skipped,
+        }
+        for entry in skipped:
+            self.stdout.write(f'skipped {entry["name"]}: {entry["reason"]}')
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                json.dump(report, output, indent=2)
+            self.stdout.write(self.style.SUCCESS(f'Results written to {options["output"]}'))
+        if options['compare']:
+            self.compare(report, options['compare'])
+
+    def client_users(self, count):
+        # Users with swaps, so inbox and stats endpoints return realistic pages
+        user_ids = list(
+            SwapRequest.objects.order_by('-id').values_list('from_user_id', flat=True)[:count * 10]
+        )
+        user_ids = list(dict.fromkeys(user_ids))[:count]
+        users = list(User.objects.filter(id__in=user_ids, is_active=True, is_staff=False))
+        if not users:
+            users = list(User.objects.filter(is_active=True, is_staff=False).order_by('id')[:count])
+        if not users:
+            raise CommandError('No users to authenticate as; run generate_dataset first')
+        # Cycle so every client has a user
+        return [users[index % len(users)] for index in range(count)]
+
+    def example_path_params(self, user):
+        params = {'user_id': user.id}
+        swap = SwapRequest.objects.filter(from_user=user).order_by('-id').first()
+        if swap:
+            params['swap_id'] = swap.id
+        # A finished job, so the download endpoint serves a file
+        jobs = ReportJob.objects.order_by('-id')
+        job = jobs.filter(status='done').first() or jobs.first()
+        if job:
+            params['job_id'] = job.id
+        profile = ProfileSession.objects.order_by('-id').first()
+        if profile:
+            params['session_id'] = profile.id
+        return params
+
+    def skip_reason(self, name, route, view_class):
+        if name in SKIPPED:
+            return SKIPPED[name]
+        if view_class is None or not hasattr(view_class, 'get'):
+            return 'no GET handler (writes are not benchmarked)'
+        if is_admin_view(view_class) and self.staff_token is None:
+            return 'no staff user'
+        missing = [param for param in self.route_params(route) if param not in self.path_params]
+        if missing:
+            return f'no example value for {", ".join(missing)}'
+        return None
+
+    def route_params(self, route):
+        return ROUTE_PARAM.findall(route)
+
+    def build_path(self, route):
+        return ROUTE_PARAM.sub(lambda match: str(self.path_params[match.group(1)]), route)
+
+    def run_endpoint(self, name, path, admin):
+        options = self.options
+        query = QUERY_PARAMS.get(name, {})
+        tokens = [self.staff_token] * options['concurrency'] if admin else self.tokens
+        per_client = [options['requests'] // options['concurrency'] +
+                      (1 if index < options['requests'] % options['concurrency'] else 0)
+                      for index in range(options['concurrency'])]
+
+        # Clients finish their warmup before any of them starts measuring
+        warmed_up = threading.Barrier(options['concurrency'])
+
+        def client_loop(index):
+            send = self.http_sender(tokens[index]) if options['base_url'] else self.local_sender(tokens[index])
+            samples = []
+            try:
+                for _ in range(options['warmup']):
+                    send(path, query)
+                warmed_up.wait()
+                started = time.perf_counter()
+                for _ in range(per_client[index]):
+                    samples.append(send(path, query))
+                return samples, started, time.perf_counter()
+            finally:
+                connections.close_all()
+
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as pool:
+            clients = list(pool.map(client_loop, range(options['concurrency'])))
+        samples = [sample for client_samples, _, _ in clients for sample in client_samples]
+        elapsed = max(client[2] for client in clients) - min(client[1] for client in clients)
+
+        latencies = sorted(sample[0] for sample in samples)
+        queries = [sample[2] for sample in samples if sample[2] is not None]
+        return {
+            'name': name,
+            'path': path,
+            'query': query,
+            'admin': admin,
+            'requests': len(samples),
+            'statuses': dict(Counter(str(sample[1]) for sample in samples)),
+            'rps': round(len(samples) / elapsed, 1) if elapsed else None,
+            'p50_ms': round(percentile(latencies, 50), 2) if latencies else None,
+            'p95_ms': round(percentile(latencies, 95), 2) if latencies else None,
+            'p99_ms': round(percentile(latencies, 99), 2) if latencies else None,
+            'mean_queries': round(statistics.mean(queries), 1) if queries else None,
+            'max_queries': max(queries) if queries else None,
+            'mean_bytes': round(statistics.mean(sample[3] for sample in samples)) if samples else None,
+        }
+
+    def server_name(self):
+        # A host the Host header validation accepts
+        hosts = [host for host in settings.ALLOWED_HOSTS if host != '*' and not host.startswith('.')]
+        return hosts[0] if hosts else 'localhost'
+
+    def local_sender(self, token):
+        client = Client(SERVER_NAME=self.server_name(), raise_request_exception=False,
+                        HTTP_AUTHORIZATION=f'Bearer {token}')
+
+        def send(path, query):
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                response = client.get(path, query)
+                body = response.getvalue()
+                latency = (time.perf_counter() - started) * 1000
+            return latency, response.status_code, len(captured.captured_queries), len(body)
+        return send
+
+    def http_sender(self, token):
+        base_url = self.options['base_url'].rstrip('/')
+
+        def send(path, query):
+            url = base_url + path + ('?' + urllib.parse.urlencode(query) if query else '')
+            request = urllib.request.Request(url, headers={'Authorization': f'Bearer {token}'})
+            started = time.perf_counter()
+            try:
+                with urllib.request.urlopen(request) as response:
+                    status_code, body = response.status, response.read()
+            except urllib.error.HTTPError as e:
+                status_code, body = e.code, e.read()
+            return (time.perf_counter() - started) * 1000, status_code, None, len(body)
+        return send
+
+    def format_row(self, row):
+        queries = '-' if row['mean_queries'] is None else f'{row["mean_queries"]:.1f}'
+        statuses = ','.join(f'{code}x{count}' for code, count in sorted(row['statuses'].items()))
+        return (f'{row["name"]:<28} {row["rps"]:>8.1f} rps  p50 {row["p50_ms"]:>7.1f}  p95 {row["p95_ms"]:>7.1f}  '
+                f'p99 {row["p99_ms"]:>7.1f} ms  {queries:>5} q  {row["mean_bytes"] / 1024:>8.1f} KB  {statuses}')
+
+    def compare(self, report, path):
+        with open(path) as previous_file:
+            previous = {row['name']: row for row in json.load(previous_file)['endpoints']}
+        self.stdout.write(f'Change against {path}:')
+        for row in report['endpoints']:
+            before = previous.get(row['name'])
+            if before is None:
+                self.stdout.write(f'{row["name"]:<28} (new)')
+                continue
+            changes = []
+            for key in ('rps', 'p50_ms', 'p95_ms', 'p99_ms', 'mean_queries', 'mean_bytes'):
+                if before.get(key) and row.get(key) is not None:
+                    changes.append(f'{key} {(row[key] - before[key]) / before[key] * 100:+.0f}%')
+            self.stdout.write(f'{row["name"]:<28} {"  ".join(changes)}')
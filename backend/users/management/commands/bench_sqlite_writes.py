@@ -0,0 +1,143 @@
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, close_old_connections, connection
+
+from skillswap_backend.writequeue import run_serialized
+from users.models import Notification, User
+
+# mode -> environment for the worker process
+MODES = {
+    'default': {'DB_SQLITE_MODE': 'default', 'DB_WRITE_QUEUE': '0'},
+    'production': {'DB_SQLITE_MODE': 'production', 'DB_WRITE_QUEUE': '0'},
+    'production+queue': {'DB_SQLITE_MODE': 'production', 'DB_WRITE_QUEUE': '1'},
+}
+
+
+def notify(user_id, index):
+    # Read-then-write, like the swap and notification endpoints
+    user = User.objects.only('username').get(id=user_id)
+    Notification.objects.create(user_id=user_id, message=f'Benchmark notification {index} for {user.username}')
+
+
+def percentile(values, fraction):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+class Command(BaseCommand):
+    help = 'Compare SQLite write throughput of the default config, production mode and the write queue'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=16)
+        parser.add_argument('--seconds', type=float, default=5)
+        parser.add_argument('--modes', default=','.join(MODES),
+                            help=f'Comma-separated subset of: {", ".join(MODES)}')
+        parser.add_argument('--json', action='store_true', help='Print results as JSON')
+        parser.add_argument('--worker', action='store_true', help='Internal: run the load in this process')
+
+    def handle(self, *args, **options):
+        if options['worker']:
+            result = self.run_load(options['threads'], options['seconds'])
+            self.stdout.write(json.dumps(result))
+            return
+
+        modes = [mode.strip() for mode in options['modes'].split(',') if mode.strip()]
+        unknown = [mode for mode in modes if mode not in MODES]
+        if unknown:
+            raise CommandError(f'Unknown mode(s): {", ".join(unknown)}')
+
+        workdir = tempfile.mkdtemp(prefix='sqlite-bench-')
+        try:
+            template = os.path.join(workdir, 'template.sqlite3')
+            self.manage(['migrate', '--no-input', '-v', '0'], template, MODES['default'])
+            results = []
+            for mode in modes:
+                path = os.path.join(workdir, f'{mode}.sqlite3')
+                shutil.copyfile(template, path)
+                output = self.manage(
+                    ['bench_sqlite_writes', '--worker', '--threads', str(options['threads']),
+                     '--seconds', str(options['seconds'])],
+                    path, MODES[mode],
+                )
+                results.append({'mode': mode, **json.loads(output.strip().splitlines()[-1])})
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+        if options['json']:
+            self.stdout.write(json.dumps({'threads': options['threads'], 'seconds': options['seconds'],
+                                          'results': results}, indent=2))
+            return
+        self.stdout.write(f'{options["threads"]} threads, {options["seconds"]}s per mode')
+        self.stdout.write(f'{"mode":<18} {"tx/s":>8} {"p50 ms":>8} {"p99 ms":>8} {"locked":>7}')
+        for row in results:
+            self.stdout.write(
+                f'{row["mode"]:<18} {row["tx_per_second"]:>8.0f} {row["p50_ms"] or 0:>8.1f} '
+                f'{row["p99_ms"] or 0:>8.1f} {row["locked_errors"]:>7}'
+            )
+
+    def manage(self, arguments, db_name, mode_env):
+        env = {**os.environ, **mode_env, 'DB_NAME': db_name}
+        completed = subprocess.run(
+            [sys.executable, str(settings.BASE_DIR / 'manage.py'), *arguments],
+            env=env, capture_output=True, text=True,
+        )
+        if completed.returncode:
+            raise CommandError(completed.stderr.strip() or f'{arguments[0]} failed')
+        return completed.stdout
+
+    def run_load(self, thread_count, seconds):
+        user_ids = [
+            User.objects.create_user(username=f'bench{index}', email=f'bench{index}@example.com', password='x').id
+            for index in range(thread_count)
+        ]
+        close_old_connections()
+        latencies = []
+        counters = {'committed': 0, 'locked': 0}
+        lock = threading.Lock()
+        deadline = time.monotonic() + seconds
+
+        def worker(user_id):
+            index = 0
+            try:
+                while time.monotonic() < deadline:
+                    started = time.perf_counter()
+                    try:
+                        run_serialized(notify, user_id, index)
+                    except OperationalError:
+                        with lock:
+                            counters['locked'] += 1
+                        continue
+                    elapsed = (time.perf_counter() - started) * 1000
+                    with lock:
+                        counters['committed'] += 1
+                        latencies.append(elapsed)
+                    index += 1
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker, args=(user_id,)) for user_id in user_ids]
+        started = time.monotonic()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.monotonic() - started
+
+        return {
+            'transactions': counters['committed'],
+            'tx_per_second': round(counters['committed'] / elapsed, 1),
+            'p50_ms': round(percentile(latencies, 0.50), 2) if latencies else None,
+            'p99_ms': round(percentile(latencies, 0.99), 2) if latencies else None,
+            'locked_errors': counters['locked'],
+        }
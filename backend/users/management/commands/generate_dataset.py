@@ -0,0 +1,230 @@
+import random
+import time
+from collections import Counter
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from skills.catalog import bump_catalog_version
+from skills.counters import adjust_holders, adjust_swaps
+from skills.models import Skill, normalize_name
+from swaps.models import Rating, SwapRequest
+from swaps.ratings import AGGREGATE_FIELDS, aggregates_from_ratings, average
+from users.models import Notification, User
+
+SCALES = {'10k': 10_000, '100k': 100_000, '1m': 1_000_000}
+
+SKILL_NAMES = [
+    'Python', 'JavaScript', 'React', 'Django', 'SQL', 'Excel', 'Photoshop', 'Figma', 'Illustrator',
+    'Video Editing', 'Photography', 'Public Speaking', 'Copywriting', 'SEO', 'Marketing', 'Accounting',
+    'Guitar', 'Piano', 'Singing', 'Drums', 'Music Production', 'Cooking', 'Baking', 'Yoga', 'Running',
+    'Spanish', 'French', 'German', 'Japanese', 'Mandarin', 'Sign Language', 'Knitting', 'Woodworking',
+    'Gardening', 'Chess', 'Calculus', 'Statistics', 'Machine Learning', 'Data Analysis', 'Go', 'Rust',
+    'Java', 'C++', 'Swift', 'Kotlin', 'Docker', 'Kubernetes', 'AWS', 'Linux', 'Networking',
+    'Interior Design', 'Painting', 'Drawing', 'Calligraphy', 'Pottery', 'Sewing', 'Carpentry',
+    'Plumbing', 'Car Repair', 'First Aid', 'Negotiation', 'Project Management', 'Resume Writing',
+]
+SKILL_QUALIFIERS = ['', 'Advanced ', 'Beginner ', 'Applied ', 'Professional ', 'Creative ', 'Practical ']
+LEVELS = ['Beginner', 'Intermediate', 'Advanced', 'Expert']
+FIRST_NAMES = ['Ada', 'Ben', 'Chloe', 'Dev', 'Elena', 'Farah', 'Gus', 'Hana', 'Ivan', 'Jade', 'Kofi', 'Lena',
+               'Mateo', 'Nia', 'Omar', 'Priya', 'Quinn', 'Rosa', 'Sam', 'Tariq', 'Uma', 'Vik', 'Wen', 'Yusuf', 'Zoe']
+LAST_NAMES = ['Adams', 'Brown', 'Chen', 'Diaz', 'Evans', 'Fischer', 'Garcia', 'Haddad', 'Ito', 'Jones', 'Khan',
+              'Lopez', 'Mehta', 'Nguyen', 'Okafor', 'Patel', 'Rossi', 'Silva', 'Tanaka', 'Weber', 'Young']
+LOCATIONS = ['Ahmedabad', 'Amsterdam', 'Berlin', 'Bangalore', 'Boston', 'Cairo', 'Chicago', 'Delhi', 'Lagos',
+             'Lisbon', 'London', 'Madrid', 'Mumbai', 'Nairobi', 'New York', 'Paris', 'Pune', 'Seoul',
+             'Singapore', 'Sydney', 'Tokyo', 'Toronto']
+AVAILABILITY = ['weekdays', 'weekends', 'evenings']
+# status -> share of generated swaps
+STATUS_WEIGHTS = {'pending': 30, 'accepted': 25, 'rejected': 15, 'completed': 30}
+# stars -> relative frequency; ratings skew positive
+STAR_WEIGHTS = {1: 3, 2: 5, 3: 12, 4: 35, 5: 45}
+
+
+class Command(BaseCommand):
+    help = 'Bulk-generate a synthetic dataset of users, skills, swaps, ratings and notifications'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', choices=SCALES, default='10k', help='Number of users')
+        parser.add_argument('--users', type=int, help='Exact number of users (overrides --scale)')
+        parser.add_argument('--skills', type=int, default=1000, help='Skill vocabulary size')
+        parser.add_argument('--zipf', type=float, default=1.1, help='Power-law exponent of skill popularity')
+        parser.add_argument('--swaps-per-user', type=float, default=2.0)
+        parser.add_argument('--notifications-per-user', type=float, default=3.0)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--prefix', default='gen', help='Username prefix of generated users')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--match-index', action='store_true',
+                            help='Also rebuild the SkillMatch index (slow at large scales)')
+
+    def handle(self, *args, **options):
+        self.random = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        user_count = options['users'] or SCALES[options['scale']]
+        if User.objects.filter(username=f'{options["prefix"]}0').exists():
+            raise CommandError(f'Users named {options["prefix"]}N already exist; pass another --prefix')
+
+        started = time.monotonic()
+        skill_ids = self.create_skills(options['skills'])
+        self.skill_weights = self.cumulative_weights(len(skill_ids), options['zipf'])
+        self.skill_ids = skill_ids
+        self.offered, self.wanted, self.swapped = Counter(), Counter(), Counter()
+
+        user_ids = self.create_users(user_count, options['prefix'], options['notifications_per_user'])
+        self.log(f'{len(user_ids)} users', started)
+        swap_ids = self.create_swaps(user_ids, int(user_count * options['swaps_per_user']))
+        self.log(f'{len(swap_ids)} swaps', started)
+        rating_count = self.create_ratings()
+        self.log(f'{rating_count} ratings', started)
+
+        self.rebuild_derived(user_ids, options['match_index'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Generated {len(user_ids)} users, {len(skill_ids)} skills, {len(swap_ids)} swaps and '
+            f'{rating_count} ratings in {time.monotonic() - started:.0f}s'
+        ))
+
+    def log(self, message, started):
+        self.stdout.write(f'[{time.monotonic() - started:6.0f}s] {message}')
+
+    def cumulative_weights(self, count, exponent):
+        total, weights = 0.0, []
+        for rank in range(count):
+            total += 1 / (rank + 1) ** exponent
+            weights.append(total)
+        return weights
+
+    def pick_skills(self, low, high):
+        count = self.random.randint(low, high)
+        return set(self.random.choices(self.skill_ids, cum_weights=self.skill_weights, k=count))
+
+    def create_skills(self, count):
+        """Skill ids in popularity-rank order; existing skills of the same name are reused."""
+        names = []
+        for qualifier in SKILL_QUALIFIERS:
+            names.extend(f'{qualifier}{name}' for name in SKILL_NAMES)
+        names.extend(f'{name} {index}' for index in range(2, count // len(SKILL_NAMES) + 2) for name in SKILL_NAMES)
+        names = names[:count]
+        Skill.objects.bulk_create(
+            [Skill(name=name, normalized_name=normalize_name(name), level=self.random.choice(LEVELS)) for name in names],
+            batch_size=self.batch_size, ignore_conflicts=True,
+        )
+        ids = dict(Skill.objects.filter(normalized_name__in=[normalize_name(name) for name in names])
+                   .values_list('normalized_name', 'id'))
+        return [ids[normalize_name(name)] for name in names]
+
+    def create_users(self, count, prefix, notifications_per_user):
+        password = make_password('password123')
+        offered_through = User.skills_offered.through
+        wanted_through = User.skills_wanted.through
+        user_ids = []
+        for start in range(0, count, self.batch_size):
+            users, unread = [], []
+            for index in range(start, min(start + self.batch_size, count)):
+                notifications = int(self.random.expovariate(1 / notifications_per_user)) if notifications_per_user else 0
+                unread_count = self.random.randint(0, notifications)
+                unread.append((notifications, unread_count))
+                users.append(User(
+                    username=f'{prefix}{index}',
+                    email=f'{prefix}{index}@example.com',
+                    password=password,
+                    first_name=self.random.choice(FIRST_NAMES),
+                    last_name=self.random.choice(LAST_NAMES),
+                    location=self.random.choice(LOCATIONS),
+                    bio='Happy to swap skills.',
+                    is_public=self.random.random() < 0.9,
+                    availability=sorted(self.random.sample(AVAILABILITY, self.random.randint(1, 3))),
+                    unread_notifications=unread_count,
+                ))
+            with transaction.atomic():
+                users = User.objects.bulk_create(users)
+                offered_rows, wanted_rows, notification_rows = [], [], []
+                for user, (notifications, unread_count) in zip(users, unread):
+                    offered = self.pick_skills(1, 5)
+                    wanted = self.pick_skills(1, 5) - offered
+                    self.offered.update(offered)
+                    self.wanted.update(wanted)
+                    offered_rows.extend(offered_through(user_id=user.id, skill_id=skill_id) for skill_id in offered)
+                    wanted_rows.extend(wanted_through(user_id=user.id, skill_id=skill_id) for skill_id in wanted)
+                    notification_rows.extend(
+                        Notification(user_id=user.id, message='Someone viewed your profile', read=index >= unread_count)
+                        for index in range(notifications)
+                    )
+                offered_through.objects.bulk_create(offered_rows, batch_size=self.batch_size)
+                wanted_through.objects.bulk_create(wanted_rows, batch_size=self.batch_size)
+                Notification.objects.bulk_create(notification_rows, batch_size=self.batch_size)
+            user_ids.extend(user.id for user in users)
+            self.stdout.write(f'  users: {len(user_ids)}/{count}')
+
+        # One staff account for the admin endpoints
+        User.objects.create(username=f'{prefix}admin', email=f'{prefix}admin@example.com', password=password,
+                            is_staff=True)
+        return user_ids
+
+    def create_swaps(self, user_ids, count):
+        statuses, weights = zip(*STATUS_WEIGHTS.items())
+        offered_through = SwapRequest.skills_offered.through
+        wanted_through = SwapRequest.skills_wanted.through
+        swap_ids, self.completed = [], []
+        for start in range(0, count, self.batch_size):
+            swaps = []
+            for _ in range(min(self.batch_size, count - start)):
+                from_id, to_id = self.random.sample(user_ids, 2)
+                swaps.append(SwapRequest(
+                    from_user_id=from_id, to_user_id=to_id,
+                    status=self.random.choices(statuses, weights)[0],
+                    message='Would you like to swap skills?',
+                ))
+            with transaction.atomic():
+                swaps = SwapRequest.objects.bulk_create(swaps)
+                offered_rows, wanted_rows = [], []
+                for swap in swaps:
+                    offered = self.pick_skills(1, 2)
+                    wanted = self.pick_skills(1, 2)
+                    self.swapped.update(offered)
+                    self.swapped.update(wanted)
+                    offered_rows.extend(offered_through(swaprequest_id=swap.id, skill_id=skill_id) for skill_id in offered)
+                    wanted_rows.extend(wanted_through(swaprequest_id=swap.id, skill_id=skill_id) for skill_id in wanted)
+                    if swap.status == 'completed':
+                        self.completed.append((swap.id, swap.from_user_id, swap.to_user_id))
+                offered_through.objects.bulk_create(offered_rows, batch_size=self.batch_size)
+                wanted_through.objects.bulk_create(wanted_rows, batch_size=self.batch_size)
+            swap_ids.extend(swap.id for swap in swaps)
+            self.stdout.write(f'  swaps: {len(swap_ids)}/{count}')
+        return swap_ids
+
+    def create_ratings(self):
+        stars, weights = zip(*STAR_WEIGHTS.items())
+        ratings = []
+        for swap_id, from_id, to_id in self.completed:
+            for rater, rated in ((from_id, to_id), (to_id, from_id)):
+                if self.random.random() < 0.7:
+                    ratings.append(Rating(swap_request_id=swap_id, rater_id=rater, rated_user_id=rated,
+                                          rating=self.random.choices(stars, weights)[0]))
+        Rating.objects.bulk_create(ratings, batch_size=self.batch_size)
+        return len(ratings)
+
+    def rebuild_derived(self, user_ids, match_index):
+        """Bring denormalized counters in line; bulk inserts bypass the signals that keep them."""
+        output = StringIO()
+        for start in range(0, len(user_ids), self.batch_size):
+            batch = user_ids[start:start + self.batch_size]
+            users = []
+            for user_id, aggregate in aggregates_from_ratings(batch).items():
+                if aggregate['rating_count']:
+                    users.append(User(id=user_id, rating=Decimal(str(average(aggregate))), **aggregate))
+            User.objects.bulk_update(users, ['rating', *AGGREGATE_FIELDS], batch_size=self.batch_size)
+        self.stdout.write('  rating aggregates rebuilt')
+
+        # Running counters and today's trending rollups, then an exact recount (ratings included)
+        adjust_holders('offered', self.offered)
+        adjust_holders('wanted', self.wanted)
+        adjust_swaps(self.swapped)
+        call_command('rebuild_skill_counters', stdout=output)
+        call_command('reconcile_swap_stats', workers=1, stdout=output)
+        if match_index:
+            call_command('rebuild_match_index', stdout=output)
+        bump_catalog_version()
+        self.stdout.write('  skill counters, swap stats' + (' and match index' if match_index else '') + ' rebuilt')
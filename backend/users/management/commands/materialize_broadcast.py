@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from users.broadcasts import MATERIALIZE_BATCH_SIZE, materialize_broadcast
+from users.models import Broadcast
+
+
+class Command(BaseCommand):
+    help = 'Copy a platform broadcast into per-user notifications in batches (resumable)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('broadcast_id', type=int)
+        parser.add_argument('--batch-size', type=int, default=MATERIALIZE_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        try:
+            broadcast = materialize_broadcast(
+                options['broadcast_id'],
+                batch_size=options['batch_size'],
+                progress=lambda count: self.stdout.write(f'Materialized {count} notifications'),
+            )
+        except Broadcast.DoesNotExist:
+            raise CommandError(f'Broadcast {options["broadcast_id"]} does not exist')
+        self.stdout.write(self.style.SUCCESS(
+            f'Broadcast {broadcast.id} materialized for {broadcast.materialized_count} users'
+        ))
@@ -0,0 +1,69 @@
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from users.models import User
+from users.photos import apply_photo, render_photo
+
+logger = logging.getLogger(__name__)
+
+
+def init_worker():
+    # Spawned workers start without Django; forked ones already have it
+    django.setup()
+
+
+def render_in_worker(row):
+    user_id, name = row
+    try:
+        return user_id, name, render_photo(name)
+    except Exception as e:
+        return user_id, name, e
+
+
+class Command(BaseCommand):
+    help = 'Re-encode profile photos and render their variants, in a pool of worker processes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                            help='Worker processes; 1 runs inline')
+        parser.add_argument('--batch-size', type=int, default=200)
+        parser.add_argument('--all', action='store_true',
+                            help='Reprocess every photo, not only those without variants')
+
+    def handle(self, *args, **options):
+        users = User.objects.exclude(photo='').exclude(photo__isnull=True)
+        if not options['all']:
+            users = users.filter(photo_variants={})
+        rows = users.order_by('id').values_list('id', 'photo')
+
+        processed = failed = 0
+        last_id = 0
+        pool = None
+        if options['workers'] > 1:
+            # Workers only touch storage; results are written from this process
+            connections.close_all()
+            pool = ProcessPoolExecutor(max_workers=options['workers'], initializer=init_worker)
+        try:
+            while True:
+                batch = list(rows.filter(id__gt=last_id)[:options['batch_size']])
+                if not batch:
+                    break
+                last_id = batch[-1][0]
+                results = pool.map(render_in_worker, batch) if pool else map(render_in_worker, batch)
+                for user_id, name, rendered in results:
+                    if isinstance(rendered, Exception):
+                        logger.warning('Could not process photo %s of user %s: %s', name, user_id, rendered)
+                        failed += 1
+                    elif apply_photo(user_id, name, *rendered):
+                        processed += 1
+                self.stdout.write(f'Processed {processed} photos')
+        finally:
+            if pool:
+                pool.shutdown()
+
+        self.stdout.write(self.style.SUCCESS(f'Processed {processed} photos, {failed} failed'))
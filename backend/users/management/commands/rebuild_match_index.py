@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+
+from users.matching import refresh_matches
+from users.models import SkillMatch, User
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the reciprocal SkillMatch index from the users\' offered/wanted skills'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        SkillMatch.objects.all().delete()
+
+        # Only users who want something can be part of a reciprocal pair
+        user_ids = (
+            User.skills_wanted.through.objects.values_list('user_id', flat=True)
+            .distinct().order_by('user_id')
+        )
+        processed = 0
+        last_id = 0
+        while True:
+            batch = list(user_ids.filter(user_id__gt=last_id)[:batch_size])
+            if not batch:
+                break
+            for user_id in batch:
+                refresh_matches(user_id)
+            processed += len(batch)
+            last_id = batch[-1]
+            self.stdout.write(f'Indexed {processed} users')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Match index rebuilt: {SkillMatch.objects.count()} rows for {processed} users'
+        ))
@@ -0,0 +1,24 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from users.jobs import purge_expired_jobs, run_pending_jobs
+
+
+class Command(BaseCommand):
+    help = 'Process queued report jobs from the database queue'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Drain the queue once and exit')
+        parser.add_argument('--interval', type=float, default=2.0, help='Seconds to sleep when the queue is empty')
+
+    def handle(self, *args, **options):
+        while True:
+            processed = run_pending_jobs()
+            purged = purge_expired_jobs()
+            if processed or purged:
+                self.stdout.write(f'Processed {processed} job(s), purged {purged} expired artifact(s)')
+            if options['once']:
+                break
+            if not processed:
+                time.sleep(options['interval'])
@@ -0,0 +1,78 @@
+"""
+Reciprocal swap-partner matching.
+
+The skills_offered/skills_wanted through tables act as the skill -> users
+inverted index. Whenever a user's skills change, refresh_matches() walks
+only the users that share one of that user's skills and rewrites the
+SkillMatch rows touching them, so recommendations are a single indexed
+lookup instead of a scan of every profile.
+"""
+from django.db import transaction
+from django.db.models import Count, Q
+
+from .models import SkillMatch, User
+
+# How many ranked rows to pull before re-ranking by rating and availability
+CANDIDATE_POOL_FACTOR = 4
+
+
+def _overlap_counts(through, user_id, skill_ids):
+    """Map partner id -> number of `skill_ids` they hold on `through`."""
+    rows = (
+        through.objects.filter(skill_id__in=skill_ids)
+        .exclude(user_id=user_id)
+        .values('user_id')
+        .annotate(total=Count('skill_id'))
+        .values_list('user_id', 'total')
+    )
+    return dict(rows)
+
+
+def refresh_matches(user_id):
+    """Recompute every SkillMatch row involving `user_id`, in both directions."""
+    offered = User.skills_offered.through
+    wanted = User.skills_wanted.through
+
+    wanted_ids = wanted.objects.filter(user_id=user_id).values('skill_id')
+    offered_ids = offered.objects.filter(user_id=user_id).values('skill_id')
+
+    # Partners offering what this user wants, and wanting what this user offers
+    gives = _overlap_counts(offered, user_id, wanted_ids)
+    takes = _overlap_counts(wanted, user_id, offered_ids)
+
+    rows = []
+    for partner_id in gives.keys() & takes.keys():
+        offers_count, wants_count = gives[partner_id], takes[partner_id]
+        overlap = offers_count + wants_count
+        rows.append(SkillMatch(user_id=user_id, partner_id=partner_id,
+                               offers_count=offers_count, wants_count=wants_count, overlap=overlap))
+        rows.append(SkillMatch(user_id=partner_id, partner_id=user_id,
+                               offers_count=wants_count, wants_count=offers_count, overlap=overlap))
+
+    with transaction.atomic():
+        SkillMatch.objects.filter(Q(user_id=user_id) | Q(partner_id=user_id)).delete()
+        SkillMatch.objects.bulk_create(rows, batch_size=500)
+
+
+def _score(match, availability):
+    partner = match.partner
+    shared_slots = len(set(availability or []) & set(partner.availability or []))
+    return match.overlap * (1 + float(partner.rating) / 5) * (1 + 0.25 * shared_slots)
+
+
+def recommend_partners(user, limit=10):
+    """
+    Return up to `limit` (match, score) pairs for `user`, best first.
+
+    Rows are pulled by reciprocal overlap from the index, then re-ranked by
+    the partner's rating and how many availability slots the two share.
+    """
+    candidates = (
+        SkillMatch.objects.filter(user=user, partner__is_active=True, partner__is_public=True)
+        .select_related('partner')
+        .prefetch_related('partner__skills_offered', 'partner__skills_wanted')
+        .order_by('-overlap', '-partner__rating')[:limit * CANDIDATE_POOL_FACTOR]
+    )
+    scored = [(match, _score(match, user.availability)) for match in candidates]
+    scored.sort(key=lambda pair: pair[1], reverse=True)
+    return scored[:limit]
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.1 on 2026-10-18 11:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('skills', '0002_alter_skill_options_skill_description_and_more'),
+        ('users', '0002_notification_userprofile'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['is_active', 'is_public', '-rating', '-id'], name='user_directory_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['location'], name='user_location_idx'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.1.1 on 2026-10-18 11:54
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_user_directory_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SkillMatch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('offers_count', models.PositiveIntegerField(default=0)),
+                ('wants_count', models.PositiveIntegerField(default=0)),
+                ('overlap', models.PositiveIntegerField(default=0)),
+                ('partner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='skill_matches', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', '-overlap'], name='skillmatch_rank_idx')],
+                'unique_together': {('user', 'partner')},
+            },
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.1.1 on 2026-10-18 12:01
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_unread_counts(apps, schema_editor):
+    User = apps.get_model('users', 'User')
+    Notification = apps.get_model('users', 'Notification')
+    unread = (
+        Notification.objects.filter(user=OuterRef('pk'), read=False)
+        .order_by()
+        .values('user')
+        .annotate(total=Count('*'))
+        .values('total')
+    )
+    User.objects.update(unread_notifications=Coalesce(Subquery(unread, output_field=IntegerField()), Value(0)))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0006_broadcasts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='unread_notifications',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='notification_feed_idx'),
+        ),
+        migrations.RunPython(backfill_unread_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,73 @@
+# Generated by Django 5.1.1 on 2026-10-18 12:03
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_rating_aggregates(apps, schema_editor):
+    User = apps.get_model('users', 'User')
+    Rating = apps.get_model('swaps', 'Rating')
+
+    def total(aggregate, **filters):
+        rows = (
+            Rating.objects.filter(rated_user=OuterRef('pk'), **filters)
+            .order_by()
+            .values('rated_user')
+            .annotate(total=aggregate)
+            .values('total')
+        )
+        return Coalesce(Subquery(rows, output_field=IntegerField()), Value(0))
+
+    User.objects.update(
+        rating_sum=total(Sum('rating')),
+        rating_count=total(Count('*')),
+        **{f'ratings_{stars}': total(Count('*'), rating=stars) for stars in range(1, 6)},
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0007_notification_unread_counter'),
+        ('swaps', '0003_alter_swaprequest_status_rating'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='ratings_1',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='ratings_2',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='ratings_3',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='ratings_4',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='ratings_5',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_rating_aggregates, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.1.1 on 2026-10-18 12:57
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0009_user_photo_variants'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProfileSession',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('path_pattern', models.CharField(max_length=200)),
+                ('max_requests', models.PositiveIntegerField(blank=True, null=True)),
+                ('requests_profiled', models.PositiveIntegerField(default=0)),
+                ('all_threads', models.BooleanField(default=False)),
+                ('interval_ms', models.PositiveIntegerField(default=10)),
+                ('status', models.CharField(choices=[('armed', 'Armed'), ('finished', 'Finished')], default='armed', max_length=10)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('expires_at', models.DateTimeField()),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('requested_by', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='profile_sessions', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ProfileChunk',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('process', models.CharField(max_length=100)),
+                ('stacks', models.JSONField(default=dict)),
+                ('samples', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('session', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='chunks', to='users.profilesession')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='profilesession',
+            index=models.Index(fields=['status', 'expires_at'], name='profilesession_armed_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='profilechunk',
+            unique_together={('session', 'process')},
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.1.1 on 2026-10-18 13:01
+
+from django.db import migrations, models
+
+
+def install_search_index(apps, schema_editor):
+    from users.search import install_search_index
+
+    install_search_index(schema_editor.connection.alias, rebuild=True)
+
+
+def drop_search_index(apps, schema_editor):
+    from users.search import drop_search_index
+
+    drop_search_index(schema_editor.connection.alias)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('skills', '0006_admin_list_indexes'),
+        ('users', '0010_profile_sessions'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['created_at', 'id'], name='user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['rating', 'id'], name='user_rating_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['email'], name='user_email_idx'),
+        ),
+        migrations.RunPython(install_search_index, drop_search_index),
+    ]
@@ -1,14 +1,26 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.db.models.functions import Lower
 from django.conf import settings
 
 class User(AbstractUser):
     photo = models.ImageField(upload_to='profile_photos/', blank=True, null=True)
+    # {size: {format: storage name}}, filled in by users.photos
+    photo_variants = models.JSONField(default=dict, blank=True)
     bio = models.TextField(blank=True, null=True)
     location = models.CharField(max_length=100, blank=True, null=True)
     is_public = models.BooleanField(default=True)
     rating = models.DecimalField(max_digits=3, decimal_places=2, default=0.00)
     
+    # Running reputation aggregates, maintained by swaps.ratings.record_rating
+    rating_sum = models.PositiveIntegerField(default=0)
+    rating_count = models.PositiveIntegerField(default=0)
+    ratings_1 = models.PositiveIntegerField(default=0)
+    ratings_2 = models.PositiveIntegerField(default=0)
+    ratings_3 = models.PositiveIntegerField(default=0)
+    ratings_4 = models.PositiveIntegerField(default=0)
+    ratings_5 = models.PositiveIntegerField(default=0)
+    
     # Skills offered and wanted (many-to-many relationships)
     skills_offered = models.ManyToManyField('skills.Skill', related_name='users_offering', blank=True)
     skills_wanted = models.ManyToManyField('skills.Skill', related_name='users_wanting', blank=True)
@@ -21,6 +33,9 @@ class User(AbstractUser):
     ]
     availability = models.JSONField(default=list, blank=True)  # Store as list of choices
     
+    # Denormalized count of unread Notification rows, maintained by users.notifications
+    unread_notifications = models.PositiveIntegerField(default=0)
+    
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -29,6 +44,17 @@ class User(AbstractUser):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Browse directory ranking and location prefix filter
+            models.Index(fields=['is_active', 'is_public', '-rating', '-id'], name='user_directory_idx'),
+            models.Index(fields=['location'], name='user_location_idx'),
+            # Admin list orderings
+            models.Index(fields=['created_at', 'id'], name='user_created_idx'),
+            models.Index(fields=['rating', 'id'], name='user_rating_idx'),
+            # Case-insensitive short-query prefix search in the admin list
+            models.Index(Lower('username'), name='user_username_lower_idx'),
+            models.Index(Lower('email'), name='user_email_lower_idx'),
+        ]
 
 class UserProfile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='profile')
@@ -53,7 +79,158 @@ class Notification(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="notifications")
     message = models.TextField()
     read = models.BooleanField(default=False)
+    # Set when the row was materialized from a platform broadcast
+    broadcast = models.ForeignKey('Broadcast', on_delete=models.CASCADE, null=True, blank=True, related_name='notifications')
     created_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
         return f"To: {self.user.username} - {self.message[:30]}"
+
+    class Meta:
+        indexes = [
+            # Keyset-paginated feed per user
+            models.Index(fields=['user', '-created_at', '-id'], name='notification_feed_idx'),
+        ]
+
+class Broadcast(models.Model):
+    """
+    A platform-wide message stored once at send time.
+
+    Users who joined before it was sent see it merged into their
+    notification feed; BroadcastReceipt records who has read it. It can
+    optionally be materialized into per-user Notification rows in the
+    background, in which case `materialized_through` is the highest user id
+    already covered.
+    """
+    MATERIALIZE_CHOICES = (
+        ('none', 'Not materialized'),
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+    )
+
+    created_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, related_name='broadcasts_sent')
+    title = models.CharField(max_length=200)
+    message = models.TextField()
+    materialize_status = models.CharField(max_length=10, choices=MATERIALIZE_CHOICES, default='none')
+    materialized_through = models.BigIntegerField(null=True, blank=True)
+    materialized_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.title
+
+    class Meta:
+        ordering = ['-created_at']
+
+class BroadcastReceipt(models.Model):
+    """Read marker for one user and one non-materialized broadcast."""
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='broadcast_receipts')
+    broadcast = models.ForeignKey(Broadcast, on_delete=models.CASCADE, related_name='receipts')
+    read_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ['user', 'broadcast']
+
+class SkillMatch(models.Model):
+    """
+    Precomputed reciprocal skill overlap between two users.
+
+    Stored once per direction and only for reciprocal pairs: `partner`
+    offers `offers_count` skills that `user` wants, and wants `wants_count`
+    skills that `user` offers. Maintained by users.matching.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='skill_matches')
+    partner = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    offers_count = models.PositiveIntegerField(default=0)
+    wants_count = models.PositiveIntegerField(default=0)
+    overlap = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.user.username} <-> {self.partner.username} ({self.overlap})"
+
+    class Meta:
+        unique_together = ['user', 'partner']
+        indexes = [
+            models.Index(fields=['user', '-overlap'], name='skillmatch_rank_idx'),
+        ]
+
+class ReportJob(models.Model):
+    """
+    A report export queued for background generation.
+
+    The table doubles as the job queue: workers claim queued rows with a
+    conditional UPDATE, so no external broker is needed.
+    """
+    STATUS_CHOICES = (
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    )
+
+    requested_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, related_name='report_jobs')
+    report_type = models.CharField(max_length=20)
+    filters = models.JSONField(default=dict, blank=True)
+    compress = models.BooleanField(default=False)
+    params_hash = models.CharField(max_length=64, db_index=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='queued')
+    file = models.FileField(upload_to='reports/', blank=True, null=True)
+    size = models.BigIntegerField(default=0)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+    expires_at = models.DateTimeField(blank=True, null=True)
+
+    def __str__(self):
+        return f"{self.report_type} report #{self.pk} ({self.status})"
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at'], name='reportjob_queue_idx'),
+        ]
+
+class ProfileSession(models.Model):
+    """
+    A sampling-profiler capture armed by an admin (see users/profiling.py).
+
+    It profiles requests whose path matches `path_pattern`, until
+    `max_requests` of them have been profiled or `expires_at` passes.
+    """
+    STATUS_CHOICES = (
+        ('armed', 'Armed'),
+        ('finished', 'Finished'),
+    )
+
+    requested_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, related_name='profile_sessions')
+    path_pattern = models.CharField(max_length=200)
+    max_requests = models.PositiveIntegerField(blank=True, null=True)
+    requests_profiled = models.PositiveIntegerField(default=0)
+    all_threads = models.BooleanField(default=False)
+    interval_ms = models.PositiveIntegerField(default=10)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='armed')
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField()
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    def __str__(self):
+        return f"Profile #{self.pk} of {self.path_pattern} ({self.status})"
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'expires_at'], name='profilesession_armed_idx'),
+        ]
+
+class ProfileChunk(models.Model):
+    """Collapsed stacks sampled by one process for a ProfileSession."""
+    session = models.ForeignKey(ProfileSession, on_delete=models.CASCADE, related_name='chunks')
+    process = models.CharField(max_length=100)
+    stacks = models.JSONField(default=dict)  # "outer;...;inner" -> samples
+    samples = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ['session', 'process']
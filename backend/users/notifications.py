@@ -0,0 +1,104 @@
+"""
+Notification feed and unread counters.
+
+User.unread_notifications is a denormalized count of unread Notification
+rows. New rows increment it (signals.count_new_notification, or in bulk
+from materialize_broadcast) and mark_read() decrements it by the number of
+rows its single UPDATE actually changed. The unread count never has to
+touch the notifications table.
+"""
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import F, Value
+from django.db.models.functions import Greatest
+
+from skillswap_backend.pagination import decode_cursor, encode_cursor, keyset_filter
+from .broadcasts import mark_broadcasts_read, visible_broadcasts
+from .models import Notification
+
+User = get_user_model()
+
+FEED_ORDERING = ('-created_at', '-id')
+
+
+def adjust_unread(user_ids, delta):
+    """Add `delta` to the unread counter of every user in `user_ids`."""
+    if not user_ids or not delta:
+        return
+    User.objects.filter(id__in=user_ids).update(
+        unread_notifications=Greatest(F('unread_notifications') + delta, Value(0))
+    )
+
+
+def unread_count(user, refresh=False):
+    """Unread notifications plus unread, not yet materialized broadcasts."""
+    if refresh:
+        user.unread_notifications = User.objects.values_list('unread_notifications', flat=True).get(pk=user.pk)
+    return user.unread_notifications + visible_broadcasts(user).filter(read=False).count()
+
+
+def mark_read(user, ids=None, up_to=None):
+    """
+    Mark the user's unread notifications read in one UPDATE; returns the count.
+
+    `ids` limits it to those notifications; `up_to` is a feed cursor and
+    limits it to rows at or newer than that position.
+    """
+    notifications = Notification.objects.filter(user=user, read=False)
+    if ids is not None:
+        notifications = notifications.filter(id__in=ids)
+    if up_to is not None:
+        notifications = notifications.exclude(keyset_filter(FEED_ORDERING, up_to))
+    with transaction.atomic():
+        changed = notifications.update(read=True)
+        adjust_unread([user.pk], -changed)
+    return changed
+
+
+def mark_feed_read(user, cursor):
+    """
+    Mark everything at or newer than a feed cursor as read, for both sources.
+
+    Returns the number of notifications and broadcasts marked; raises
+    ValueError for a malformed cursor.
+    """
+    positions = decode_cursor(cursor, 4)
+    marked = 0
+    if positions[0] is not None:
+        marked += mark_read(user, up_to=positions[:2])
+    if positions[2] is not None:
+        seen = visible_broadcasts(user).exclude(keyset_filter(FEED_ORDERING, positions[2:]))
+        marked += mark_broadcasts_read(user, list(seen.values_list('id', flat=True)))
+    return marked
+
+
+def _after(queryset, position):
+    if position[0] is None:
+        return queryset
+    return queryset.filter(keyset_filter(FEED_ORDERING, position))
+
+
+def notification_feed(user, cursor=None, limit=20):
+    """
+    One page of the user's notifications merged with visible broadcasts.
+
+    The two sources are paged independently with keyset conditions over
+    (created_at, id); the cursor carries a position for each. Raises
+    ValueError for a malformed cursor.
+    """
+    positions = decode_cursor(cursor, 4) if cursor else [None] * 4
+    notifications = _after(Notification.objects.filter(user=user), positions[:2])
+    broadcasts = _after(visible_broadcasts(user), positions[2:])
+
+    candidates = (
+        list(notifications.order_by(*FEED_ORDERING)[:limit + 1]) +
+        list(broadcasts.order_by(*FEED_ORDERING)[:limit + 1])
+    )
+    candidates.sort(key=lambda item: (item.created_at, item.id), reverse=True)
+    page = candidates[:limit]
+
+    for item in page:
+        offset = 0 if isinstance(item, Notification) else 2
+        positions[offset:offset + 2] = [item.created_at, item.id]
+    next_cursor = encode_cursor(positions) if len(candidates) > limit else None
+    return page, next_cursor
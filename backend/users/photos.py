@@ -0,0 +1,157 @@
+"""
+Profile photo pipeline.
+
+Uploads are checked in the request by validate_photo(). Once the row is
+saved, a background task (process_photo) reads the photo and does three
+things. It re-encodes the original as a JPEG with orientation applied,
+metadata stripped and size capped at PHOTO_MAX_DIMENSION. It renders a
+square WebP and JPEG variant for each of PHOTO_VARIANT_SIZES. Then it
+points the row at the new files.
+
+Every generated file is named after a hash of its bytes, so a URL never
+changes content and can be cached as immutable. Photos without variants
+(older uploads, or uploads while in-process workers are off) are handled
+by the process_photos command.
+"""
+import hashlib
+import logging
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from skillswap_backend import background
+from .models import User
+
+logger = logging.getLogger(__name__)
+
+ALLOWED_FORMATS = ('JPEG', 'PNG', 'WEBP', 'GIF')
+# variant key -> (Pillow format, file extension, save options)
+VARIANT_FORMATS = {
+    'webp': ('WEBP', 'webp', {'quality': 80, 'method': 4}),
+    'jpeg': ('JPEG', 'jpg', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+# Pixel size of the variant used for avatars in compact user payloads
+AVATAR_SIZE = 128
+PHOTO_DIR = 'profile_photos'
+VARIANT_DIR = 'profile_photos/variants'
+
+
+def validate_photo(upload):
+    """Raise ValueError unless `upload` is an image of an allowed format and size."""
+    if upload.size > settings.PHOTO_MAX_UPLOAD_BYTES:
+        raise ValueError(f'Photos must be at most {settings.PHOTO_MAX_UPLOAD_BYTES // (1024 * 1024)} MB')
+    try:
+        upload.seek(0)
+        with Image.open(upload) as image:
+            if image.format not in ALLOWED_FORMATS:
+                raise ValueError(f'Photos must be one of: {", ".join(ALLOWED_FORMATS)}')
+            if image.width * image.height > settings.PHOTO_MAX_PIXELS:
+                raise ValueError('Photo dimensions are too large')
+            image.verify()
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError, SyntaxError):
+        raise ValueError('Upload a valid image')
+    finally:
+        upload.seek(0)
+
+
+def _flatten(image):
+    image = ImageOps.exif_transpose(image)
+    if image.mode in ('RGBA', 'LA', 'P'):
+        image = image.convert('RGBA')
+        flat = Image.new('RGB', image.size, 'white')
+        flat.paste(image, mask=image.getchannel('A'))
+        return flat
+    return image.convert('RGB')
+
+
+def _store(directory, image, variant_format, suffix=''):
+    pillow_format, extension, options = VARIANT_FORMATS[variant_format]
+    buffer = BytesIO()
+    image.save(buffer, pillow_format, **options)
+    data = buffer.getvalue()
+    name = f'{directory}/{hashlib.sha256(data).hexdigest()[:24]}{suffix}.{extension}'
+    if default_storage.exists(name):
+        # Same bytes already stored (content-addressed)
+        return name
+    return default_storage.save(name, ContentFile(data))
+
+
+def render_photo(name):
+    """
+    Re-encode the stored photo `name` and render its variants.
+
+    Returns (original name, {size: {format: name}}). Touches storage only,
+    not the database, so it can run in worker processes.
+    """
+    with default_storage.open(name, 'rb') as source, Image.open(source) as image:
+        image = _flatten(image)
+
+    original = image.copy()
+    original.thumbnail((settings.PHOTO_MAX_DIMENSION, settings.PHOTO_MAX_DIMENSION), Image.LANCZOS)
+    original_name = _store(PHOTO_DIR, original, 'jpeg')
+
+    variants = {}
+    for size in settings.PHOTO_VARIANT_SIZES:
+        square = ImageOps.fit(image, (size, size), Image.LANCZOS)
+        variants[str(size)] = {
+            variant_format: _store(VARIANT_DIR, square, variant_format, f'-{size}')
+            for variant_format in VARIANT_FORMATS
+        }
+    return original_name, variants
+
+
+def apply_photo(user_id, source_name, original_name, variants):
+    """Point the user at the processed files, unless their photo changed meanwhile."""
+    from .authentication import invalidate_principal
+
+    updated = User.objects.filter(pk=user_id, photo=source_name).update(photo=original_name, photo_variants=variants)
+    if not updated:
+        return False
+    if source_name != original_name and not User.objects.filter(photo=source_name).exists():
+        default_storage.delete(source_name)
+    invalidate_principal(user_id)
+    return True
+
+
+def process_photo(user_id, name):
+    try:
+        rendered = render_photo(name)
+    except (OSError, UnidentifiedImageError, Image.DecompressionBombError):
+        logger.warning('Could not process photo %s of user %s', name, user_id, exc_info=True)
+        return False
+    return apply_photo(user_id, name, *rendered)
+
+
+def schedule_photo_processing(user):
+    """Process the user's photo in the background once the upload is committed."""
+    name = user.photo.name
+    transaction.on_commit(lambda: background.submit(process_photo, user.pk, name))
+
+
+def _url(name, request):
+    location = default_storage.url(name)
+    return request.build_absolute_uri(location) if request is not None else location
+
+
+def photo_urls(variants, request=None):
+    """{size: {format: url}} for a user's photo_variants."""
+    return {
+        size: {variant_format: _url(name, request) for variant_format, name in formats.items()}
+        for size, formats in (variants or {}).items()
+    }
+
+
+def avatar_url(user, request=None):
+    """URL of the smallest variant of at least AVATAR_SIZE (else the original), or None."""
+    if user.photo_variants:
+        sizes = sorted(user.photo_variants, key=int)
+        size = next((size for size in sizes if int(size) >= AVATAR_SIZE), sizes[-1])
+        formats = user.photo_variants[size]
+        return _url(formats.get('webp') or formats.get('jpeg'), request)
+    if user.photo:
+        return _url(user.photo.name, request)
+    return None
@@ -0,0 +1,324 @@
+"""
+On-demand sampling profiler.
+
+An admin arms a ProfileSession for the next N requests whose path matches
+a regex, or for a time window. ProfilerMiddleware notices armed sessions
+by polling a version stamp in Django's cache at most every
+PROFILER_POLL_SECONDS. When nothing is armed, a request costs one clock
+read and comparison.
+
+While a session applies, a sampler thread in the process reads the stack
+of every thread serving a matching request (or, with `all_threads`, of
+every thread) through sys._current_frames(), at the session's interval.
+The profiled code is not traced, so the overhead is set by the sampling
+rate. Each process counts identical stacks and, after each profiled
+request, writes its counts to a ProfileChunk row. Downloads merge the
+chunks into collapsed-stack text ("outer;...;inner count" per line), which
+flamegraph.pl and speedscope read directly.
+"""
+import logging
+import os
+import re
+import socket
+import sys
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.db.models import F
+from django.utils import timezone
+
+from .models import ProfileChunk, ProfileSession
+
+logger = logging.getLogger(__name__)
+
+VERSION_KEY = 'profiler:sessions:version'
+PROCESS = f'{socket.gethostname()}:{os.getpid()}'
+
+_sessions = {'version': 0, 'checked_at': float('-inf'), 'armed': ()}
+_sessions_lock = threading.Lock()
+
+
+class ArmedSession:
+    """What a process needs to know about an armed ProfileSession."""
+
+    def __init__(self, session):
+        self.id = session.id
+        self.pattern = re.compile(session.path_pattern)
+        self.max_requests = session.max_requests
+        self.all_threads = session.all_threads
+        self.interval = session.interval_ms / 1000
+        self.expires_at = session.expires_at
+
+    def applies_to(self, path, now):
+        return now < self.expires_at and self.pattern.search(path) is not None
+
+
+def sessions_version():
+    return cache.get(VERSION_KEY)
+
+
+def bump_sessions_version():
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        # Nothing cached yet; start a fresh version sequence
+        cache.add(VERSION_KEY, 1, timeout=None)
+
+
+def armed_sessions():
+    """Armed sessions, refreshed when the version stamp changes (checked every PROFILER_POLL_SECONDS)."""
+    now = time.monotonic()
+    if now - _sessions['checked_at'] < settings.PROFILER_POLL_SECONDS:
+        return _sessions['armed']
+    with _sessions_lock:
+        if now - _sessions['checked_at'] >= settings.PROFILER_POLL_SECONDS:
+            version = sessions_version()
+            if version is None:
+                # Evicted or never set: start a sequence so later polls stay in the cache
+                cache.add(VERSION_KEY, 1, timeout=None)
+                version = sessions_version()
+            if version is None or version != _sessions['version']:
+                armed = ProfileSession.objects.filter(status='armed', expires_at__gt=timezone.now())
+                _sessions['armed'] = tuple(ArmedSession(session) for session in armed)
+                _sessions['version'] = version
+                sampler.retire({session.id for session in _sessions['armed']})
+            _sessions['checked_at'] = now
+    return _sessions['armed']
+
+
+def arm_session(user, path_pattern, max_requests=None, seconds=None, all_threads=False, interval_ms=None):
+    """Create an armed ProfileSession; raises ValueError on invalid parameters."""
+    try:
+        re.compile(path_pattern)
+    except re.error as e:
+        raise ValueError(f'Invalid path pattern: {e}')
+    if max_requests is not None and not 0 < max_requests <= settings.PROFILER_MAX_REQUESTS:
+        raise ValueError(f'requests must be between 1 and {settings.PROFILER_MAX_REQUESTS}')
+    seconds = settings.PROFILER_MAX_SECONDS if seconds is None else seconds
+    if not 0 < seconds <= settings.PROFILER_MAX_SECONDS:
+        raise ValueError(f'seconds must be between 1 and {settings.PROFILER_MAX_SECONDS}')
+    interval_ms = settings.PROFILER_INTERVAL_MS if interval_ms is None else interval_ms
+    if not 1 <= interval_ms <= 1000:
+        raise ValueError('interval_ms must be between 1 and 1000')
+
+    session = ProfileSession.objects.create(
+        requested_by=user,
+        path_pattern=path_pattern,
+        max_requests=max_requests,
+        all_threads=all_threads,
+        interval_ms=interval_ms,
+        expires_at=timezone.now() + timezone.timedelta(seconds=seconds),
+    )
+    bump_sessions_version()
+    return session
+
+
+def finish_session(session_id):
+    updated = ProfileSession.objects.filter(pk=session_id, status='armed').update(
+        status='finished', finished_at=timezone.now()
+    )
+    if updated:
+        bump_sessions_version()
+    return bool(updated)
+
+
+def finish_if_complete(session):
+    """Finish a request-limited session once all of its requests have been profiled."""
+    if session.max_requests is None:
+        return False
+    updated = ProfileSession.objects.filter(
+        pk=session.id, status='armed', requests_profiled__gte=F('max_requests'),
+    ).update(status='finished', finished_at=timezone.now())
+    if updated:
+        bump_sessions_version()
+    return bool(updated)
+
+
+def claim_request(session):
+    """Count a request against the session's limit; False once the limit is reached."""
+    if session.max_requests is None:
+        return True
+    claimed = ProfileSession.objects.filter(
+        pk=session.id, status='armed', requests_profiled__lt=session.max_requests,
+    ).update(requests_profiled=F('requests_profiled') + 1)
+    if not claimed:
+        finish_session(session.id)
+    return bool(claimed)
+
+
+def collapsed_stacks(session):
+    """Merged collapsed-stack text of every process's samples."""
+    stacks = Counter()
+    for chunk in session.chunks.all():
+        stacks.update(chunk.stacks)
+    return ''.join(f'{stack} {count}\n' for stack, count in stacks.most_common())
+
+
+class Sampler:
+    """
+    One per process. Samples registered threads while any are registered,
+    and every thread while an all-threads session is active.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.threads = {}  # thread id -> ArmedSession
+        self.windows = {}  # session id -> ArmedSession sampling every thread
+        self.counts = {}  # session id -> Counter of collapsed stacks
+        self.flushed_at = {}  # session id -> monotonic time of the last flush
+        self.labels = {}  # code object -> frame label
+        self.thread = None
+
+    def start(self, thread_id, session):
+        with self.lock:
+            if session.all_threads:
+                self.windows[session.id] = session
+            else:
+                self.threads[thread_id] = session
+            self.counts.setdefault(session.id, Counter())
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, name='profiler-sampler', daemon=True)
+                self.thread.start()
+
+    def stop(self, thread_id):
+        with self.lock:
+            self.threads.pop(thread_id, None)
+
+    def release(self, session_id):
+        """Drop a finished session's counts once no thread of this process still samples it."""
+        with self.lock:
+            if session_id in self.windows or any(session.id == session_id for session in self.threads.values()):
+                return
+            self.counts.pop(session_id, None)
+            self.flushed_at.pop(session_id, None)
+
+    def retire(self, armed_ids):
+        """Release every session that is no longer armed (finished, stopped or expired elsewhere)."""
+        with self.lock:
+            stale = [session_id for session_id in self.counts if session_id not in armed_ids]
+        for session_id in stale:
+            self.release(session_id)
+
+    def interval(self):
+        sessions = [*self.threads.values(), *self.windows.values()]
+        return min(session.interval for session in sessions) if sessions else None
+
+    def run(self):
+        own_id = threading.get_ident()
+        while True:
+            with self.lock:
+                now = timezone.now()
+                expired = [key for key, session in self.windows.items() if session.expires_at <= now]
+                for session_id in expired:
+                    del self.windows[session_id]
+                interval = self.interval()
+                if interval is None:
+                    self.thread = None
+            if expired:
+                self.flush_windows(expired)
+            if interval is None:
+                return
+            with self.lock:
+                frames = sys._current_frames()
+                for thread_id, frame in frames.items():
+                    if thread_id == own_id:
+                        continue
+                    session = self.threads.get(thread_id)
+                    if session is not None:
+                        self.counts[session.id][self.collapse(frame, stop=ProfilerMiddleware.__call__.__code__)] += 1
+                    for window in self.windows.values():
+                        self.counts[window.id][self.collapse(frame)] += 1
+                del frames
+            time.sleep(interval)
+
+    def label(self, code):
+        label = self.labels.get(code)
+        if label is None:
+            filename = code.co_filename
+            base = str(settings.BASE_DIR)
+            if filename.startswith(base):
+                filename = filename[len(base) + 1:]
+            elif 'site-packages' in filename:
+                filename = filename.split('site-packages', 1)[1].lstrip(os.sep)
+            label = self.labels[code] = f'{code.co_qualname} ({filename}:{code.co_firstlineno})'.replace(';', ',')
+        return label
+
+    def collapse(self, frame, stop=None):
+        """'outer;...;inner' for the stack ending at `frame`, starting below `stop` if it is on it."""
+        labels = []
+        while frame is not None and frame.f_code is not stop:
+            labels.append(self.label(frame.f_code))
+            frame = frame.f_back
+        return ';'.join(reversed(labels))
+
+    def flush_windows(self, session_ids):
+        # Last samples of expired all-threads sessions; no request will write them
+        try:
+            for session_id in session_ids:
+                self.flush(session_id)
+        except Exception:
+            logger.exception('Could not save profile samples')
+        finally:
+            for session_id in session_ids:
+                self.release(session_id)
+            connections.close_all()
+
+    def flush(self, session_id, force=True):
+        """Write this process's counts for the session to its ProfileChunk."""
+        now = time.monotonic()
+        with self.lock:
+            if not force and now - self.flushed_at.get(session_id, float('-inf')) < settings.PROFILER_POLL_SECONDS:
+                return
+            counts = self.counts.get(session_id)
+            if not counts:
+                return
+            stacks = dict(counts)
+            self.flushed_at[session_id] = now
+        ProfileChunk.objects.update_or_create(
+            session_id=session_id, process=PROCESS,
+            defaults={'stacks': stacks, 'samples': sum(stacks.values())},
+        )
+
+
+sampler = Sampler()
+
+
+class ProfilerMiddleware:
+    """Profile requests matching an armed ProfileSession."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        armed = armed_sessions()
+        if not armed:
+            return self.get_response(request)
+
+        now = timezone.now()
+        session = next((session for session in armed if session.applies_to(request.path, now)), None)
+        if session is None or not claim_request(session):
+            return self.get_response(request)
+
+        thread_id = threading.get_ident()
+        sampler.start(thread_id, session)
+        try:
+            return self.get_response(request)
+        finally:
+            done = False
+            try:
+                # Window sessions sample continuously; write them at most every poll interval
+                sampler.flush(session.id, force=not session.all_threads)
+                done = (
+                    finish_if_complete(session) or session.expires_at <= timezone.now()
+                    or session.id not in {armed.id for armed in armed_sessions()}
+                )
+            except Exception:
+                logger.exception('Could not save profile samples for session %s', session.id)
+            finally:
+                sampler.stop(thread_id)
+            if done and not session.all_threads:
+                sampler.release(session.id)
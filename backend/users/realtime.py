@@ -0,0 +1,161 @@
+"""
+Real-time notification push.
+
+New notifications, broadcasts and unread-count changes are published on the
+pub/sub layer as soon as they are committed. Clients receive them over
+Server-Sent Events (NotificationStreamView) or a WebSocket at
+/ws/notifications/ (websocket_application, mounted in asgi.py), instead of
+polling NotificationListView. Both need the app served through ASGI; under
+WSGI the ticket endpoint answers 501 so clients do not hold a worker thread.
+
+Clients authenticate a stream with a ticket from issue_stream_ticket(): a
+random, single-use key valid for STREAM_TICKET_SECONDS. EventSource cannot
+send headers, and a ticket keeps the access token itself out of URLs and
+access logs.
+
+Events are built only when their channel has a subscriber, so a commit
+with nobody listening costs no serialization or count queries.
+"""
+import asyncio
+import json
+import secrets
+from urllib.parse import parse_qs
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.core.handlers.asgi import ASGIRequest
+from django.db import transaction
+
+from skillswap_backend.pubsub import get_broker, has_subscribers, publish
+from .authentication import get_principal
+from .notifications import unread_count
+
+BROADCAST_CHANNEL = 'broadcasts'
+WEBSOCKET_PATH = '/ws/notifications/'
+HEARTBEAT_SECONDS = 15
+
+
+def user_channel(user_id):
+    return f'user:{user_id}'
+
+
+def _publish_if_subscribed(channel, build_event):
+    if has_subscribers(channel):
+        publish(channel, build_event())
+
+
+def publish_on_commit(channel, build_event):
+    """Publish build_event() once the current transaction commits, if anyone is subscribed."""
+    transaction.on_commit(lambda: _publish_if_subscribed(channel, build_event))
+
+
+def push_notification(notification):
+    from .serializers import NotificationSerializer
+
+    publish_on_commit(user_channel(notification.user_id), lambda: {
+        'type': 'notification',
+        'notification': NotificationSerializer(notification).data,
+        'unread_count': unread_count(notification.user, refresh=True),
+    })
+
+
+def push_unread_count(user):
+    publish_on_commit(user_channel(user.id), lambda: {
+        'type': 'unread_count',
+        'unread_count': unread_count(user, refresh=True),
+    })
+
+
+def push_broadcast(broadcast):
+    from .serializers import BroadcastFeedSerializer
+
+    broadcast.read = False
+    publish_on_commit(BROADCAST_CHANNEL, lambda: {
+        'type': 'broadcast',
+        'broadcast': BroadcastFeedSerializer(broadcast).data,
+    })
+
+
+def _ticket_key(ticket):
+    return f'realtime:ticket:{ticket}'
+
+
+def push_supported(request):
+    """Whether `request` arrived through ASGI, where a stream does not pin a worker thread."""
+    return isinstance(request, ASGIRequest)
+
+
+def issue_stream_ticket(user):
+    """A single-use ticket that opens one event stream for `user`."""
+    ticket = secrets.token_urlsafe(32)
+    cache.set(_ticket_key(ticket), user.id, timeout=settings.STREAM_TICKET_SECONDS)
+    return ticket
+
+
+def user_from_ticket(ticket):
+    """Redeem a stream ticket for its active user, or None; a ticket works once."""
+    key = _ticket_key(ticket)
+    user_id = cache.get(key)
+    # Only the caller whose delete succeeds redeems it
+    if user_id is None or not cache.delete(key):
+        return None
+    user = get_principal(user_id)
+    return user if user is not None and user.is_active else None
+
+
+async def event_stream(user):
+    """Yield events for `user` as dicts; None is yielded as a keep-alive tick."""
+    async with get_broker().subscribe(user_channel(user.id), BROADCAST_CHANNEL) as subscription:
+        yield {'type': 'unread_count', 'unread_count': await sync_to_async(unread_count)(user, refresh=True)}
+        while True:
+            try:
+                event = await subscription.get(timeout=HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                yield None
+                continue
+            yield event
+
+
+async def _wait_for_disconnect(receive):
+    while True:
+        message = await receive()
+        if message['type'] == 'websocket.disconnect':
+            return
+
+
+async def websocket_application(scope, receive, send):
+    """Minimal ASGI WebSocket endpoint: authenticate with ?ticket=, then push events."""
+    if scope['path'] != WEBSOCKET_PATH:
+        await send({'type': 'websocket.close', 'code': 4404})
+        return
+
+    message = await receive()
+    if message['type'] != 'websocket.connect':
+        return
+    ticket = parse_qs(scope.get('query_string', b'').decode()).get('ticket', [''])[0]
+    user = await sync_to_async(user_from_ticket)(ticket) if ticket else None
+    if user is None:
+        await send({'type': 'websocket.close', 'code': 4401})
+        return
+    await send({'type': 'websocket.accept'})
+
+    disconnected = asyncio.ensure_future(_wait_for_disconnect(receive))
+    events = event_stream(user)
+    next_event = None
+    try:
+        while True:
+            next_event = asyncio.ensure_future(events.__anext__())
+            done, _ = await asyncio.wait({next_event, disconnected}, return_when=asyncio.FIRST_COMPLETED)
+            if disconnected in done:
+                return
+            event = next_event.result()
+            if event is not None:
+                await send({'type': 'websocket.send', 'text': json.dumps(event)})
+    finally:
+        disconnected.cancel()
+        if next_event is not None and not next_event.done():
+            # Let the pending read unwind before closing the generator
+            next_event.cancel()
+            await asyncio.gather(next_event, return_exceptions=True)
+        await events.aclose()
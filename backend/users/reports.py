@@ -0,0 +1,185 @@
+"""
+CSV report builders used by ReportsView.
+
+Each report is a header plus a generator of rows read in chunks with
+.iterator(), so memory stays flat and the first bytes go out as soon as
+the first chunk is fetched, whatever the size of the table.
+"""
+import csv
+
+from django.contrib.auth import get_user_model
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils.dateparse import parse_date
+
+from swaps.models import Rating, SwapRequest
+
+User = get_user_model()
+
+CHUNK_SIZE = 2000
+ROWS_PER_WRITE = 500
+DATETIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+def _format_datetime(value):
+    return value.strftime(DATETIME_FORMAT) if value else ''
+
+
+def clean_filters(report_type, params):
+    """
+    Validate report filters from a query dict or JSON body.
+
+    Returns a plain dict with only the filters that were set, or raises
+    ValueError with a message suitable for a 400 response.
+    """
+    filters = {}
+    for key in ('date_from', 'date_to'):
+        value = params.get(key)
+        if value:
+            if parse_date(str(value)) is None:
+                raise ValueError(f'{key} must be a date in YYYY-MM-DD format')
+            filters[key] = str(value)
+    status = params.get('status')
+    if status:
+        if report_type != 'swaps':
+            raise ValueError('status filter only applies to the swaps report')
+        if status not in dict(SwapRequest.STATUS_CHOICES):
+            raise ValueError('Invalid status')
+        filters['status'] = status
+    return filters
+
+
+def _date_range(queryset, field, filters):
+    if filters.get('date_from'):
+        queryset = queryset.filter(**{f'{field}__date__gte': filters['date_from']})
+    if filters.get('date_to'):
+        queryset = queryset.filter(**{f'{field}__date__lte': filters['date_to']})
+    return queryset
+
+
+def _count_subquery(queryset, column):
+    """Correlated COUNT(*) of `queryset` rows whose `column` matches the outer user."""
+    counts = (
+        queryset.filter(**{column: OuterRef('pk')})
+        .order_by()
+        .values(column)
+        .annotate(total=Count('*'))
+        .values('total')
+    )
+    return Coalesce(Subquery(counts, output_field=IntegerField()), Value(0))
+
+
+USERS_HEADER = [
+    'User ID', 'Username', 'Email', 'First Name', 'Last Name',
+    'Date Joined', 'Last Login', 'Is Active', 'Skills Offered Count',
+    'Skills Wanted Count', 'Total Swaps', 'Completed Swaps'
+]
+
+
+def users_rows(filters):
+    """Users activity report; all per-user counts come from the same statement"""
+    swaps = SwapRequest.objects.all()
+    completed = SwapRequest.objects.filter(status='completed')
+    users = (
+        _date_range(User.objects.order_by('id'), 'date_joined', filters)
+        .annotate(
+            offered_count=_count_subquery(User.skills_offered.through.objects.all(), 'user_id'),
+            wanted_count=_count_subquery(User.skills_wanted.through.objects.all(), 'user_id'),
+            total_swaps=_count_subquery(swaps, 'from_user') + _count_subquery(swaps, 'to_user'),
+            completed_swaps=_count_subquery(completed, 'from_user') + _count_subquery(completed, 'to_user'),
+        )
+        .values_list(
+            'id', 'username', 'email', 'first_name', 'last_name', 'date_joined', 'last_login',
+            'is_active', 'offered_count', 'wanted_count', 'total_swaps', 'completed_swaps'
+        )
+    )
+    for (user_id, username, email, first_name, last_name, date_joined, last_login,
+         is_active, offered_count, wanted_count, total_swaps, completed_swaps) in users.iterator(chunk_size=CHUNK_SIZE):
+        yield [
+            user_id,
+            username,
+            email,
+            first_name or '',
+            last_name or '',
+            _format_datetime(date_joined),
+            _format_datetime(last_login),
+            'Yes' if is_active else 'No',
+            offered_count,
+            wanted_count,
+            total_swaps,
+            completed_swaps,
+        ]
+
+
+SWAPS_HEADER = [
+    'Swap ID', 'From User', 'To User', 'Skills Offered', 'Skills Wanted',
+    'Status', 'Created Date', 'Updated Date', 'Message'
+]
+
+
+def swaps_rows(filters):
+    """Swaps activity report; skills are prefetched once per chunk"""
+    swaps = (
+        _date_range(SwapRequest.objects.order_by('id'), 'created_at', filters)
+        .select_related('from_user', 'to_user')
+        .prefetch_related('skills_offered', 'skills_wanted')
+    )
+    if filters.get('status'):
+        swaps = swaps.filter(status=filters['status'])
+    for swap in swaps.iterator(chunk_size=CHUNK_SIZE):
+        yield [
+            swap.id,
+            swap.from_user.username,
+            swap.to_user.username,
+            ', '.join(skill.name for skill in swap.skills_offered.all()),
+            ', '.join(skill.name for skill in swap.skills_wanted.all()),
+            swap.status,
+            _format_datetime(swap.created_at),
+            _format_datetime(swap.updated_at),
+            swap.message or '',
+        ]
+
+
+FEEDBACK_HEADER = [
+    'Rating ID', 'Swap ID', 'From User', 'To User', 'Rating',
+    'Comment', 'Created Date'
+]
+
+
+def feedback_rows(filters):
+    """Feedback report built from the Rating table"""
+    ratings = _date_range(Rating.objects.order_by('id'), 'created_at', filters).values_list(
+        'id', 'swap_request_id', 'rater__username', 'rated_user__username',
+        'rating', 'comment', 'created_at'
+    )
+    for rating_id, swap_id, rater, rated_user, rating, comment, created_at in ratings.iterator(chunk_size=CHUNK_SIZE):
+        yield [rating_id, swap_id, rater, rated_user, rating, comment or '', _format_datetime(created_at)]
+
+
+REPORTS = {
+    'users': (USERS_HEADER, users_rows),
+    'swaps': (SWAPS_HEADER, swaps_rows),
+    'feedback': (FEEDBACK_HEADER, feedback_rows),
+    'ratings': (FEEDBACK_HEADER, feedback_rows),
+}
+
+
+class _Echo:
+    """File-like object whose write() hands the formatted line straight back."""
+
+    def write(self, value):
+        return value
+
+
+def iter_csv(report_type, filters=None):
+    """Yield the CSV for `report_type` as text chunks of ROWS_PER_WRITE rows."""
+    header, rows = REPORTS[report_type]
+    writer = csv.writer(_Echo())
+    buffer = [writer.writerow(header)]
+    for row in rows(filters or {}):
+        buffer.append(writer.writerow(row))
+        if len(buffer) >= ROWS_PER_WRITE:
+            yield ''.join(buffer)
+            buffer = []
+    if buffer:
+        yield ''.join(buffer)
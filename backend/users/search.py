@@ -0,0 +1,204 @@
+"""
+Server-side search for the Browse directory and the admin user list.
+
+Skill filters are resolved against the skills_offered/skills_wanted through
+tables (indexed on skill_id), so a search only touches the users that hold
+one of the requested skills instead of the whole user table.
+
+Admin search matches anywhere in username, email and first and last name.
+The matching is served by a trigram index, set up like the one for skill
+names (skills/search.py). On SQLite it is an FTS5 table kept in sync by
+triggers. On PostgreSQL it is a set of pg_trgm GIN indexes on the
+UPPER(column) expressions that Django's icontains compares. Queries shorter
+than a trigram fall back to range scans over the LOWER(username) and
+LOWER(email) indexes.
+"""
+from django.db import connections
+from django.db.models import Count, Exists, IntegerField, OuterRef, Q, Subquery, TextField, Value
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Cast, Coalesce, Lower
+
+from .models import User
+
+MATCH_MODES = ('offered', 'wanted', 'any')
+
+# Ranking with a skill filter: number of requested skills matched, then
+# reputation, then newest id. Only holders of the requested skills are
+# ranked, and each score is an indexed lookup in the through tables.
+SEARCH_ORDERING = ('-match_score', '-rating', '-id')
+# Without a skill filter every score is 0, so pages walk user_directory_idx
+DIRECTORY_ORDERING = ('-rating', '-id')
+
+# Admin list ?ordering= values; each is served by an index (username is unique)
+ADMIN_USER_ORDERINGS = {
+    '-created_at': ('-created_at', '-id'),
+    'created_at': ('created_at', 'id'),
+    'username': ('username',),
+    '-username': ('-username',),
+    '-rating': ('-rating', '-id'),
+    'rating': ('rating', 'id'),
+}
+
+FTS_TABLE = 'users_user_fts'
+FTS_COLUMNS = ('username', 'email', 'first_name', 'last_name')
+MIN_TRIGRAM_LENGTH = 3
+# Highest code point, so 'abc' <= value < 'abc' + PREFIX_END covers every 'abc…'
+PREFIX_END = '\U0010ffff'
+
+_columns = ', '.join(FTS_COLUMNS)
+SQLITE_TRIGGERS = {
+    'users_user_fts_ai': f"""
+        CREATE TRIGGER IF NOT EXISTS users_user_fts_ai AFTER INSERT ON users_user BEGIN
+            INSERT INTO {FTS_TABLE}(rowid, {_columns})
+            VALUES (new.id, {', '.join(f'new.{column}' for column in FTS_COLUMNS)});
+        END""",
+    'users_user_fts_ad': f"""
+        CREATE TRIGGER IF NOT EXISTS users_user_fts_ad AFTER DELETE ON users_user BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {_columns})
+            VALUES ('delete', old.id, {', '.join(f'old.{column}' for column in FTS_COLUMNS)});
+        END""",
+    'users_user_fts_au': f"""
+        CREATE TRIGGER IF NOT EXISTS users_user_fts_au AFTER UPDATE OF {_columns} ON users_user BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {_columns})
+            VALUES ('delete', old.id, {', '.join(f'old.{column}' for column in FTS_COLUMNS)});
+            INSERT INTO {FTS_TABLE}(rowid, {_columns})
+            VALUES (new.id, {', '.join(f'new.{column}' for column in FTS_COLUMNS)});
+        END""",
+}
+
+
+def install_search_index(using='default', rebuild=False):
+    """Create the backend's trigram index if missing; rebuild it if asked or if it was missing."""
+    connection = connections[using]
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.execute(
+                "SELECT name FROM sqlite_master WHERE type IN ('table', 'trigger') AND name LIKE %s",
+                [f'{FTS_TABLE}%'],
+            )
+            existing = {row[0] for row in cursor.fetchall()}
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+                f"{_columns}, content='users_user', content_rowid='id', tokenize='trigram')"
+            )
+            for sql in SQLITE_TRIGGERS.values():
+                cursor.execute(sql)
+            if rebuild or not existing.issuperset([FTS_TABLE, *SQLITE_TRIGGERS]):
+                cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+        elif connection.vendor == 'postgresql':
+            cursor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+            for column in FTS_COLUMNS:
+                cursor.execute(
+                    f'CREATE INDEX IF NOT EXISTS users_user_{column}_trgm '
+                    f'ON users_user USING gin ((UPPER({column}::text)) gin_trgm_ops)'
+                )
+
+
+def drop_search_index(using='default'):
+    connection = connections[using]
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            for trigger in SQLITE_TRIGGERS:
+                cursor.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+            cursor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+        elif connection.vendor == 'postgresql':
+            for column in FTS_COLUMNS:
+                cursor.execute(f'DROP INDEX IF EXISTS users_user_{column}_trgm')
+
+
+def admin_search(users, query):
+    """Filter `users` to those with `query` in their username, email or name."""
+    query = query.strip()
+    if not query:
+        return users
+    if len(query) < MIN_TRIGRAM_LENGTH:
+        # Too short for a trigram; match case-folded username and email prefixes by index range
+        lowered = query.lower()
+        return users.alias(username_lower=Lower('username'), email_lower=Lower('email')).filter(
+            Q(username_lower__gte=lowered, username_lower__lt=lowered + PREFIX_END) |
+            Q(email_lower__gte=lowered, email_lower__lt=lowered + PREFIX_END)
+        )
+    if connections[users.db].vendor == 'sqlite':
+        # Quote as an FTS5 phrase so user input is never parsed as query syntax
+        phrase = '"%s"' % query.replace('"', '""')
+        return users.filter(id__in=RawSQL(f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', [phrase]))
+    # PostgreSQL serves each icontains from its pg_trgm index
+    condition = Q()
+    for column in FTS_COLUMNS:
+        condition |= Q(**{f'{column}__icontains': query})
+    return users.filter(condition)
+
+
+def _skill_holders(through, skill_ids=None, name_prefix=''):
+    rows = through.objects.filter(user_id=OuterRef('pk'))
+    if skill_ids:
+        rows = rows.filter(skill_id__in=skill_ids)
+    if name_prefix:
+        rows = rows.filter(skill__name__istartswith=name_prefix)
+    return rows
+
+
+def _match_count(through, skill_ids):
+    # Correlated count over the (user_id, skill_id) index; no GROUP BY over the users
+    rows = _skill_holders(through, skill_ids).order_by().values('user_id').annotate(matches=Count('*')).values('matches')
+    return Coalesce(Subquery(rows, output_field=IntegerField()), Value(0))
+
+
+def search_ordering(skill_ids):
+    """The keyset ordering for a search, ranking by match_score only when skills are requested."""
+    return SEARCH_ORDERING if skill_ids else DIRECTORY_ORDERING
+
+
+def search_users(viewer, query='', skill_ids=None, match='offered', availability=None, location=''):
+    """
+    Build the ranked directory queryset for `viewer`.
+
+    `match` selects which side of a profile `skill_ids` are matched against:
+    people offering the skills, wanting them, or either.
+    """
+    offered = User.skills_offered.through
+    wanted = User.skills_wanted.through
+
+    users = User.objects.filter(is_active=True, is_public=True).exclude(id=viewer.id)
+
+    if query:
+        users = users.filter(
+            Q(username__istartswith=query) |
+            Q(first_name__istartswith=query) |
+            Q(last_name__istartswith=query) |
+            Exists(_skill_holders(offered, name_prefix=query)) |
+            Exists(_skill_holders(wanted, name_prefix=query))
+        )
+
+    if location:
+        users = users.filter(location__istartswith=location)
+
+    if availability:
+        # availability is a JSON list; match on the serialized value so the
+        # filter works on every backend, including SQLite
+        users = users.annotate(availability_text=Cast('availability', output_field=TextField()))
+        condition = Q()
+        for slot in availability:
+            condition |= Q(availability_text__contains=f'"{slot}"')
+        users = users.filter(condition)
+
+    if skill_ids:
+        score = Value(0, output_field=IntegerField())
+        if match in ('offered', 'any'):
+            users = users.alias(offers_match=Exists(_skill_holders(offered, skill_ids)))
+            score += _match_count(offered, skill_ids)
+        if match in ('wanted', 'any'):
+            users = users.alias(wants_match=Exists(_skill_holders(wanted, skill_ids)))
+            score += _match_count(wanted, skill_ids)
+
+        if match == 'offered':
+            users = users.filter(offers_match=True)
+        elif match == 'wanted':
+            users = users.filter(wants_match=True)
+        else:
+            users = users.filter(Q(offers_match=True) | Q(wants_match=True))
+        users = users.annotate(match_score=score)
+    else:
+        users = users.annotate(match_score=Value(0, output_field=IntegerField()))
+
+    return users
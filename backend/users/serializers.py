@@ -1,32 +1,85 @@
 from rest_framework import serializers
-from .models import User, UserProfile, Notification
+from django.utils import timezone
+from .models import User, UserProfile, Notification, SkillMatch, ReportJob, Broadcast, ProfileSession
 from skills.serializers import SkillSerializer
 from skills.models import Skill
+from skillswap_backend.sparse import FastFieldsMixin, SparseFieldsMixin
+from . import photos
 
-class UserSerializer(serializers.ModelSerializer):
+def display_name(user):
+    if user.first_name and user.last_name:
+        return f"{user.first_name} {user.last_name}"
+    return user.first_name or user.last_name or user.username
+
+def user_summary(user, request=None):
+    """Compact representation of a user nested in another object, built without serializer fields."""
+    return {
+        'id': user.id,
+        'username': user.username,
+        'name': display_name(user),
+        'avatar': photos.avatar_url(user, request),
+        'rating': '%.2f' % user.rating,
+    }
+
+class UserSummaryField(serializers.Field):
+    """Read-only nested user rendered by user_summary(); expandable to UserSerializer."""
+
+    def __init__(self, **kwargs):
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, user):
+        return user_summary(user, self.context.get('request'))
+
+def validate_photo_upload(value):
+    if value:
+        try:
+            photos.validate_photo(value)
+        except ValueError as e:
+            raise serializers.ValidationError(str(e))
+    return value
+
+class UserSerializer(SparseFieldsMixin, FastFieldsMixin, serializers.ModelSerializer):
     skills_offered = SkillSerializer(many=True, read_only=True)
     skills_wanted = SkillSerializer(many=True, read_only=True)
     name = serializers.SerializerMethodField()
+    photo_variants = serializers.SerializerMethodField()
     
     class Meta:
         model = User
         fields = [
             'id', 'username', 'email', 'first_name', 'last_name', 'name',
-            'photo', 'bio', 'location', 'is_public', 'rating',
+            'photo', 'photo_variants', 'bio', 'location', 'is_public', 'rating',
             'skills_offered', 'skills_wanted', 'availability',
             'created_at', 'updated_at'
         ]
         read_only_fields = ['id', 'created_at', 'updated_at', 'rating']
     
     def get_name(self, obj):
-        if obj.first_name and obj.last_name:
-            return f"{obj.first_name} {obj.last_name}"
-        elif obj.first_name:
-            return obj.first_name
-        elif obj.last_name:
-            return obj.last_name
-        else:
-            return obj.username
+        return display_name(obj)
+
+    def get_photo_variants(self, obj):
+        return photos.photo_urls(obj.photo_variants, self.context.get('request'))
+
+    def validate_photo(self, value):
+        return validate_photo_upload(value)
+
+class UserSearchResultSerializer(UserSerializer):
+    match_score = serializers.IntegerField(read_only=True)
+
+    class Meta(UserSerializer.Meta):
+        fields = UserSerializer.Meta.fields + ['match_score']
+
+class SkillMatchSerializer(serializers.ModelSerializer):
+    partner = UserSerializer(read_only=True)
+    score = serializers.SerializerMethodField()
+
+    class Meta:
+        model = SkillMatch
+        fields = ['partner', 'offers_count', 'wants_count', 'overlap', 'score']
+
+    def get_score(self, obj):
+        return round(self.context.get('scores', {}).get(obj.pk, 0), 3)
 
 class UserRegistrationSerializer(serializers.ModelSerializer):
     password = serializers.CharField(write_only=True, min_length=6)
@@ -60,6 +113,9 @@ class UserProfileUpdateSerializer(serializers.ModelSerializer):
             'is_public', 'availability', 'skills_offered_ids', 'skills_wanted_ids'
         ]
     
+    def validate_photo(self, value):
+        return validate_photo_upload(value)
+    
     def update(self, instance, validated_data):
         skills_offered_ids = validated_data.pop('skills_offered_ids', None)
         skills_wanted_ids = validated_data.pop('skills_wanted_ids', None)
@@ -120,7 +176,77 @@ class UserSkillsWantedSerializer(serializers.ModelSerializer):
         }
 
 class NotificationSerializer(serializers.ModelSerializer):
+    kind = serializers.SerializerMethodField()
+
     class Meta:
         model = Notification
-        fields = ['id', 'message', 'read', 'created_at']
-        read_only_fields = ['id', 'created_at']
\ No newline at end of file
+        fields = ['id', 'kind', 'message', 'read', 'created_at']
+        read_only_fields = ['id', 'created_at']
+
+    def get_kind(self, obj):
+        return 'notification'
+
+class BroadcastFeedSerializer(serializers.ModelSerializer):
+    """A broadcast as it appears in a user's notification feed"""
+    kind = serializers.SerializerMethodField()
+    read = serializers.BooleanField(read_only=True)
+
+    class Meta:
+        model = Broadcast
+        fields = ['id', 'kind', 'title', 'message', 'read', 'created_at']
+        read_only_fields = fields
+
+    def get_kind(self, obj):
+        return 'broadcast'
+
+class BroadcastSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Broadcast
+        fields = [
+            'id', 'title', 'message', 'materialize_status', 'materialized_count',
+            'materialized_through', 'created_at'
+        ]
+        read_only_fields = fields
+
+class ReportJobSerializer(serializers.ModelSerializer):
+    download_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ReportJob
+        fields = [
+            'id', 'report_type', 'filters', 'compress', 'status', 'size', 'error',
+            'created_at', 'started_at', 'finished_at', 'expires_at', 'download_url'
+        ]
+        read_only_fields = fields
+
+    def get_download_url(self, obj):
+        if obj.status != 'done':
+            return None
+        url = f'/api/users/admin/reports/jobs/{obj.id}/download/'
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request else url
+
+class ProfileSessionSerializer(serializers.ModelSerializer):
+    status = serializers.SerializerMethodField()
+    samples = serializers.SerializerMethodField()
+    download_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ProfileSession
+        fields = [
+            'id', 'path_pattern', 'max_requests', 'requests_profiled', 'all_threads', 'interval_ms',
+            'status', 'created_at', 'expires_at', 'finished_at', 'samples', 'download_url'
+        ]
+        read_only_fields = fields
+
+    def get_status(self, obj):
+        # A window that ran out is finished even if no request noticed yet
+        return 'finished' if obj.status == 'armed' and obj.expires_at <= timezone.now() else obj.status
+
+    def get_samples(self, obj):
+        return sum(chunk.samples for chunk in obj.chunks.all())
+
+    def get_download_url(self, obj):
+        url = f'/api/users/admin/profiles/{obj.id}/download/'
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request else url
@@ -0,0 +1,108 @@
+from django.db import connections, transaction
+from django.db.models.signals import m2m_changed, post_delete, post_init, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from skills.models import Skill
+from skills.registry import skills_merged
+from .authentication import invalidate_principal
+from .matching import refresh_matches
+from .models import Notification, User
+from .notifications import adjust_unread
+from .photos import schedule_photo_processing
+from .realtime import push_notification
+from .search import install_search_index
+
+
+def _schedule_refresh(user_ids):
+    # Run after commit so the index reflects the final skill set
+    for user_id in set(user_ids):
+        transaction.on_commit(lambda user_id=user_id: refresh_matches(user_id))
+
+
+@receiver(m2m_changed, sender=User.skills_offered.through)
+@receiver(m2m_changed, sender=User.skills_wanted.through)
+def update_match_index(sender, instance, action, reverse, pk_set, **kwargs):
+    """Keep SkillMatch in sync when a user's offered/wanted skills change."""
+    if not reverse:
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            _schedule_refresh([instance.pk])
+        return
+
+    # Reverse side (skill.users_offering.add(...)): pk_set holds user ids
+    if action == 'pre_clear':
+        instance._match_index_users = list(sender.objects.filter(skill_id=instance.pk).values_list('user_id', flat=True))
+    elif action == 'post_clear':
+        _schedule_refresh(getattr(instance, '_match_index_users', []))
+    elif action in ('post_add', 'post_remove'):
+        _schedule_refresh(pk_set or [])
+
+
+@receiver(pre_delete, sender=Skill)
+def refresh_matches_for_deleted_skill(sender, instance, **kwargs):
+    """Deleting a skill cascades its through rows without firing m2m_changed."""
+    holders = set(User.skills_offered.through.objects.filter(skill_id=instance.pk).values_list('user_id', flat=True))
+    holders |= set(User.skills_wanted.through.objects.filter(skill_id=instance.pk).values_list('user_id', flat=True))
+    _schedule_refresh(holders)
+
+
+@receiver(skills_merged)
+def refresh_matches_for_merged_skill(sender, target, **kwargs):
+    """A merge rewrites through rows in bulk; everyone now holding the target may match differently."""
+    holders = set(User.skills_offered.through.objects.filter(skill_id=target.pk).values_list('user_id', flat=True))
+    holders |= set(User.skills_wanted.through.objects.filter(skill_id=target.pk).values_list('user_id', flat=True))
+    _schedule_refresh(holders)
+
+
+@receiver(post_save, sender=Notification)
+def count_new_notification(sender, instance, created, **kwargs):
+    """Count new unread notifications and push them to connected clients."""
+    if created:
+        if not instance.read:
+            adjust_unread([instance.user_id], 1)
+        push_notification(instance)
+
+
+@receiver(post_delete, sender=Notification)
+def uncount_deleted_notification(sender, instance, **kwargs):
+    if not instance.read:
+        adjust_unread([instance.user_id], -1)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cached_principal(sender, instance, **kwargs):
+    """Drop the cached principal now, and again once the change is visible to other connections."""
+    invalidate_principal(instance.pk)
+    transaction.on_commit(lambda: invalidate_principal(instance.pk))
+
+
+def _photo_name(instance):
+    # Read the raw attribute: going through the descriptor would load a deferred field
+    value = instance.__dict__.get('photo')
+    return getattr(value, 'name', value) or ''
+
+
+@receiver(post_init, sender=User)
+def remember_loaded_photo(sender, instance, **kwargs):
+    instance._loaded_photo = _photo_name(instance)
+
+
+@receiver(pre_save, sender=User)
+def reset_photo_variants(sender, instance, **kwargs):
+    """Variants of the previous photo no longer apply."""
+    if _photo_name(instance) != instance._loaded_photo:
+        instance.photo_variants = {}
+
+
+@receiver(post_save, sender=User)
+def process_new_photo(sender, instance, created, **kwargs):
+    name = _photo_name(instance)
+    if name and (created or name != instance._loaded_photo):
+        schedule_photo_processing(instance)
+    instance._loaded_photo = name
+
+
+def ensure_search_index(using, **kwargs):
+    # Table rebuilds during migrate drop the SQLite triggers; put them back
+    if User._meta.db_table in connections[using].introspection.table_names():
+        install_search_index(using)
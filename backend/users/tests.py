@@ -1,3 +1,878 @@
-from django.test import TestCase
+from django.core.cache import cache
+from django.test import TestCase, TransactionTestCase
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from skills.models import Skill
+from .models import ReportJob, User
+
+
+class UserSearchTests(TestCase):
+    def setUp(self):
+        self.viewer = User.objects.create_user(username='viewer', password='pass1234')
+        self.python = Skill.objects.create(name='Python')
+        self.guitar = Skill.objects.create(name='Guitar')
+
+        self.alice = User.objects.create_user(username='alice', password='pass1234', availability=['weekends'], rating=4)
+        self.alice.skills_offered.add(self.python, self.guitar)
+        self.bob = User.objects.create_user(username='bob', password='pass1234', availability=['evenings'], rating=5)
+        self.bob.skills_offered.add(self.python)
+        self.carol = User.objects.create_user(username='carol', password='pass1234', is_public=False)
+        self.carol.skills_offered.add(self.python)
+
+        self.client = APIClient()
+        self.client.force_authenticate(self.viewer)
+
+    def search(self, **params):
+        response = self.client.get('/api/users/search/', params)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_ranks_by_matched_skills_then_rating(self):
+        data = self.search(skills=f'{self.python.id},{self.guitar.id}')
+        self.assertEqual([row['username'] for row in data['results']], ['alice', 'bob'])
+        self.assertEqual(data['results'][0]['match_score'], 2)
+
+    def test_filters_by_availability_and_query(self):
+        data = self.search(availability='evenings')
+        self.assertEqual([row['username'] for row in data['results']], ['bob'])
+        data = self.search(q='gui')
+        self.assertEqual([row['username'] for row in data['results']], ['alice'])
+
+    def test_cursor_pagination_walks_every_row_once(self):
+        first = self.search(skills=str(self.python.id), limit=1)
+        self.assertIsNotNone(first['next_cursor'])
+        second = self.search(skills=str(self.python.id), limit=1, cursor=first['next_cursor'])
+        self.assertIsNone(second['next_cursor'])
+        usernames = [row['username'] for row in first['results'] + second['results']]
+        self.assertEqual(usernames, ['bob', 'alice'])
+
+    def test_without_skills_pages_by_rating(self):
+        first = self.search(limit=1)
+        second = self.search(limit=1, cursor=first['next_cursor'])
+        self.assertEqual([row['username'] for row in first['results'] + second['results']], ['bob', 'alice'])
+
+    def test_fields_limits_result_keys(self):
+        results = self.search(skills=str(self.python.id), fields='id,username')['results']
+        self.assertEqual([set(row) for row in results], [{'id', 'username'}] * 2)
+
+    def test_rejects_malformed_cursor(self):
+        response = self.client.get('/api/users/search/', {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 400)
+
+
+class AdminUserListTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_user(username='admin', password='pass1234', is_staff=True, email='root@example.com')
+        self.alice = User.objects.create_user(username='alice', password='pass1234', email='alice@example.com', last_name='Lovelace')
+        self.bob = User.objects.create_user(username='bob', password='pass1234', email='bob@example.org', is_active=False)
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def list(self, **params):
+        response = self.client.get('/api/users/admin/users/', params)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_pages_newest_first_with_exact_count(self):
+        first = self.list(limit=2)
+        self.assertEqual([row['username'] for row in first['results']], ['bob', 'alice'])
+        self.assertEqual((first['count'], first['count_exact']), (3, True))
+        second = self.list(limit=2, cursor=first['next_cursor'])
+        self.assertEqual([row['username'] for row in second['results']], ['admin'])
+        self.assertIsNone(second['next_cursor'])
+
+    def test_search_uses_prefix_and_substring_matching(self):
+        self.assertEqual([row['username'] for row in self.list(search='al')['results']], ['alice'])
+        self.assertEqual([row['username'] for row in self.list(search='ovela')['results']], ['alice'])
+        self.assertEqual([row['username'] for row in self.list(search='example.org')['results']], ['bob'])
+        self.alice.last_name = 'Hopper'
+        self.alice.save()
+        self.assertEqual(self.list(search='ovela')['results'], [])
+
+    def test_short_search_ignores_case(self):
+        User.objects.create_user(username='Alfred', password='pass1234', email='Al@Example.com')
+        self.assertEqual([row['username'] for row in self.list(search='al', ordering='username')['results']], ['Alfred', 'alice'])
+        self.assertEqual([row['username'] for row in self.list(search='AL', ordering='username')['results']], ['Alfred', 'alice'])
+
+    def test_filters_and_ordering(self):
+        self.assertEqual([row['username'] for row in self.list(is_active='false')['results']], ['bob'])
+        self.assertEqual([row['username'] for row in self.list(ordering='username')['results']], ['admin', 'alice', 'bob'])
+        self.assertEqual(self.list(joined_to='2000-01-01')['results'], [])
+        for params in ({'ordering': 'email'}, {'is_staff': 'maybe'}, {'joined_from': 'yesterday'}):
+            self.assertEqual(self.client.get('/api/users/admin/users/', params).status_code, 400)
+
+    def test_count_is_estimated_past_the_exact_limit(self):
+        with self.settings(EXACT_COUNT_LIMIT=1):
+            data = self.list(limit=1)
+            self.assertEqual((data['count'], data['count_exact']), (3, False))
+            data = self.list(is_active='true')
+            self.assertEqual((data['count'], data['count_exact']), (1, False))
+
+
+class UserMatchesTests(TestCase):
+    def setUp(self):
+        self.python = Skill.objects.create(name='Python')
+        self.spanish = Skill.objects.create(name='Spanish')
+        self.me = User.objects.create_user(username='me', password='pass1234')
+        self.partner = User.objects.create_user(username='partner', password='pass1234')
+        self.one_way = User.objects.create_user(username='one_way', password='pass1234')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.me.skills_offered.add(self.python)
+            self.me.skills_wanted.add(self.spanish)
+            self.partner.skills_offered.add(self.spanish)
+            self.partner.skills_wanted.add(self.python)
+            self.one_way.skills_offered.add(self.spanish)
+
+        self.client = APIClient()
+        self.client.force_authenticate(self.me)
+
+    def test_returns_only_reciprocal_partners(self):
+        response = self.client.get('/api/users/matches/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row['partner']['username'] for row in response.data], ['partner'])
+        self.assertEqual(response.data[0]['overlap'], 2)
+
+    def test_index_follows_skill_removal(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.partner.skills_wanted.remove(self.python)
+        response = self.client.get('/api/users/matches/')
+        self.assertEqual(response.data, [])
+
+
+class ReportsTests(TestCase):
+    def setUp(self):
+        from swaps.models import Rating, SwapRequest
+
+        self.admin = User.objects.create(username='admin', is_staff=True)
+        self.other = User.objects.create(username='other')
+        self.other.skills_offered.add(Skill.objects.create(name='Python'))
+        swap = SwapRequest.objects.create(from_user=self.admin, to_user=self.other, status='completed')
+        SwapRequest.objects.create(from_user=self.other, to_user=self.admin)
+        Rating.objects.create(swap_request=swap, rater=self.admin, rated_user=self.other, rating=4, comment='Great')
+
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def fetch_rows(self, report_type):
+        import csv
+
+        response = self.client.get('/api/users/admin/reports/', {'type': report_type})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return list(csv.reader(b''.join(response.streaming_content).decode().splitlines()))
+
+    def test_users_report_counts(self):
+        rows = {row[1]: row for row in self.fetch_rows('users')[1:]}
+        self.assertEqual(rows['other'][8:], ['1', '0', '2', '1'])
+
+    def test_feedback_report_reads_ratings(self):
+        rows = self.fetch_rows('feedback')
+        self.assertEqual(rows[1][2:6], ['admin', 'other', '4', 'Great'])
+
+    def test_invalid_report_type(self):
+        response = self.client.get('/api/users/admin/reports/', {'type': 'nope'})
+        self.assertEqual(response.status_code, 400)
+
+
+class ReportJobTests(TestCase):
+    def setUp(self):
+        import shutil
+        import tempfile
+
+        from django.test import override_settings
+
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root, BACKGROUND_WORKERS=0)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.admin = User.objects.create(username='admin', is_staff=True)
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def submit(self, **payload):
+        return self.client.post('/api/users/admin/reports/jobs/', payload, format='json')
+
+    def test_job_lifecycle_with_range_download(self):
+        from .jobs import run_pending_jobs
+
+        response = self.submit(type='users')
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data['status'], 'queued')
+        job_id = response.data['id']
+
+        self.assertEqual(run_pending_jobs(), 1)
+        detail = self.client.get(f'/api/users/admin/reports/jobs/{job_id}/')
+        self.assertEqual(detail.data['status'], 'done')
+
+        url = f'/api/users/admin/reports/jobs/{job_id}/download/'
+        full = b''.join(self.client.get(url).streaming_content)
+        self.assertTrue(full.startswith(b'User ID,Username'))
+
+        partial = self.client.get(url, HTTP_RANGE='bytes=5-')
+        self.assertEqual(partial.status_code, 206)
+        self.assertEqual(b''.join(partial.streaming_content), full[5:])
+        self.assertEqual(partial['Content-Range'], f'bytes 5-{len(full) - 1}/{len(full)}')
+
+    def test_identical_request_reuses_job(self):
+        first = self.submit(type='swaps', filters={'status': 'pending'})
+        second = self.submit(type='swaps', filters={'status': 'pending'})
+        self.assertEqual(second.status_code, 200)
+        self.assertTrue(second.data['reused'])
+        self.assertEqual(first.data['id'], second.data['id'])
+
+    def test_compressed_artifact(self):
+        import gzip
+
+        from .jobs import run_pending_jobs
+
+        job_id = self.submit(type='ratings', compress=True).data['id']
+        run_pending_jobs()
+        response = self.client.get(f'/api/users/admin/reports/jobs/{job_id}/download/')
+        self.assertEqual(response['Content-Type'], 'application/gzip')
+        content = gzip.decompress(b''.join(response.streaming_content))
+        self.assertTrue(content.startswith(b'Rating ID'))
+
+    def test_rejects_invalid_filters(self):
+        self.assertEqual(self.submit(type='users', filters={'date_from': 'yesterday'}).status_code, 400)
+
+    def test_compress_accepts_form_booleans(self):
+        job_id = self.client.post('/api/users/admin/reports/jobs/', {'type': 'users', 'compress': 'false'}).data['id']
+        self.assertFalse(ReportJob.objects.get(id=job_id).compress)
+
+    def test_expired_job_is_gone_and_purged_after_the_next_run(self):
+        from django.utils import timezone
+
+        from .jobs import process_queue
+
+        expired_id = self.submit(type='users').data['id']
+        process_queue()
+        ReportJob.objects.filter(id=expired_id).update(expires_at=timezone.now())
+        self.assertEqual(self.client.get(f'/api/users/admin/reports/jobs/{expired_id}/download/').status_code, 410)
+
+        self.submit(type='swaps')
+        self.assertEqual(process_queue(), 1)
+        self.assertFalse(ReportJob.objects.filter(id=expired_id).exists())
+
+
+class BroadcastTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create(username='admin', is_staff=True)
+        self.members = [User.objects.create(username=f'member{index}') for index in range(3)]
+        self.client = APIClient()
+
+    def send(self, **extra):
+        self.client.force_authenticate(self.admin)
+        response = self.client.post('/api/users/admin/messages/', {'title': 'Hi', 'message': 'Maintenance tonight', **extra}, format='json')
+        self.assertEqual(response.status_code, 201)
+        return response.data['broadcast']['id']
+
+    def feed(self, user):
+        self.client.force_authenticate(user)
+        return self.client.get('/api/users/notifications/').data['results']
+
+    def test_send_is_a_single_row_merged_on_read(self):
+        self.send()
+        from .models import Notification
+        self.assertEqual(Notification.objects.count(), 0)
+
+        feed = self.feed(self.members[0])
+        self.assertEqual([(item['kind'], item['read']) for item in feed], [('broadcast', False)])
+
+        self.client.post('/api/users/notifications/mark-read/')
+        self.assertTrue(self.feed(self.members[0])[0]['read'])
+        self.assertFalse(self.feed(self.members[1])[0]['read'])
+
+    def test_materialize_in_batches_without_duplicates(self):
+        from .broadcasts import materialize_broadcast
+
+        with self.settings(BACKGROUND_WORKERS=0):
+            broadcast_id = self.send(materialize=True)
+        self.feed(self.members[0])
+        self.client.patch('/api/users/notifications/mark-read/', {'broadcast_id': broadcast_id}, format='json')
+
+        progress = []
+        broadcast = materialize_broadcast(broadcast_id, batch_size=2, progress=progress.append)
+        self.assertEqual(broadcast.materialize_status, 'done')
+        self.assertEqual(progress, [2, 4])
+
+        feed = self.feed(self.members[0])
+        self.assertEqual([(item['kind'], item['read']) for item in feed], [('notification', True)])
+
+
+class RealtimePushTests(TestCase):
+    def create_notification(self, user):
+        from .models import Notification
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Notification.objects.create(user=user, message='You have a new swap request')
+
+    async def test_websocket_receives_notifications_as_they_commit(self):
+        import asyncio
+        import json
+
+        from asgiref.sync import sync_to_async
+
+        from .realtime import issue_stream_ticket, websocket_application
+
+        user = await User.objects.acreate(username='listener')
+        ticket = await sync_to_async(issue_stream_ticket)(user)
+        incoming, outgoing = asyncio.Queue(), asyncio.Queue()
+        await incoming.put({'type': 'websocket.connect'})
+        scope = {'type': 'websocket', 'path': '/ws/notifications/', 'query_string': f'ticket={ticket}'.encode()}
+        connection = asyncio.ensure_future(websocket_application(scope, incoming.get, outgoing.put))
+
+        async def next_message():
+            return await asyncio.wait_for(outgoing.get(), timeout=5)
+
+        self.assertEqual((await next_message())['type'], 'websocket.accept')
+        self.assertEqual(json.loads((await next_message())['text']), {'type': 'unread_count', 'unread_count': 0})
+
+        await sync_to_async(self.create_notification)(user)
+        event = json.loads((await next_message())['text'])
+        self.assertEqual(event['type'], 'notification')
+        self.assertEqual(event['unread_count'], 1)
+
+        await incoming.put({'type': 'websocket.disconnect'})
+        await asyncio.wait_for(connection, timeout=5)
+
+    async def test_websocket_rejects_missing_token(self):
+        import asyncio
+
+        from .realtime import websocket_application
+
+        incoming, outgoing = asyncio.Queue(), asyncio.Queue()
+        await incoming.put({'type': 'websocket.connect'})
+        await websocket_application({'type': 'websocket', 'path': '/ws/notifications/'}, incoming.get, outgoing.put)
+        self.assertEqual(await outgoing.get(), {'type': 'websocket.close', 'code': 4401})
+
+    def test_tickets_are_single_use_and_need_asgi(self):
+        from .realtime import issue_stream_ticket, user_from_ticket
+
+        user = User.objects.create(username='listener')
+        client = APIClient()
+        client.force_authenticate(user)
+        self.assertEqual(client.post('/api/users/notifications/stream/ticket/').status_code, 501)
+        self.assertEqual(self.client.get('/api/users/notifications/stream/').status_code, 501)
+
+        ticket = issue_stream_ticket(user)
+        self.assertEqual(user_from_ticket(ticket), user)
+        self.assertIsNone(user_from_ticket(ticket))
+
+    def test_events_are_not_built_without_subscribers(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        user = User.objects.create(username='offline')
+        with CaptureQueriesContext(connection) as queries:
+            self.create_notification(user)
+        self.assertFalse([q for q in queries if 'COUNT(' in q['sql']])
+
+
+class NotificationFeedTests(TestCase):
+    def setUp(self):
+        from .models import Notification
+
+        self.user = User.objects.create(username='reader')
+        self.notifications = [Notification.objects.create(user=self.user, message=f'Event {index}') for index in range(5)]
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def unread(self):
+        response = self.client.get('/api/users/notifications/unread-count/')
+        return response.data['unread_count']
+
+    def test_counter_tracks_creates_and_bulk_mark_read(self):
+        self.assertEqual(self.unread(), 5)
+        ids = [notification.id for notification in self.notifications[:2]]
+        response = self.client.patch('/api/users/notifications/mark-read/', {'ids': ids}, format='json')
+        self.assertEqual(response.data['marked'], 2)
+        self.assertEqual(self.unread(), 3)
+
+        # Marking the same rows again must not double-decrement
+        self.client.patch('/api/users/notifications/mark-read/', {'ids': ids}, format='json')
+        self.assertEqual(self.unread(), 3)
+
+        self.client.post('/api/users/notifications/mark-read/')
+        self.assertEqual(self.unread(), 0)
+
+    def test_mark_read_rejects_non_integer_ids(self):
+        for payload in ({'ids': ['x']}, {'notification_id': 'x'}, {'broadcast_id': 'x'}):
+            response = self.client.patch('/api/users/notifications/mark-read/', payload, format='json')
+            self.assertEqual(response.status_code, 400)
+
+    def test_unread_count_does_not_query_notifications(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        with CaptureQueriesContext(connection) as context:
+            self.unread()
+        self.assertFalse(any('users_notification' in query['sql'] for query in context.captured_queries))
+
+    def test_keyset_pages_and_mark_read_up_to_cursor(self):
+        first = self.client.get('/api/users/notifications/', {'limit': 2}).data
+        self.assertEqual([item['message'] for item in first['results']], ['Event 4', 'Event 3'])
+        second = self.client.get('/api/users/notifications/', {'limit': 2, 'cursor': first['next_cursor']}).data
+        self.assertEqual([item['message'] for item in second['results']], ['Event 2', 'Event 1'])
+
+        response = self.client.patch('/api/users/notifications/mark-read/', {'up_to': first['next_cursor']}, format='json')
+        self.assertEqual(response.data['marked'], 2)
+        self.assertEqual(self.unread(), 3)
+
+
+class DatabaseRoutingTests(TestCase):
+    def setUp(self):
+        from django.core.cache import cache
+
+        cache.clear()
+        self.user = User.objects.create_user(username='router', password='pass1234')
+
+    def route(self, user=None, allowed=True, wrote=False):
+        from django.http import HttpRequest
+
+        from skillswap_backend import routers
+
+        request = HttpRequest()
+        if user is not None:
+            request.user = user
+        state = routers.RoutingState(request)
+        state.replica_allowed, state.wrote = allowed, wrote
+        token = routers._routing.set(state)
+        try:
+            return routers.PrimaryReplicaRouter().db_for_read(User)
+        finally:
+            routers._routing.reset(token)
+
+    def test_reads_go_to_healthy_replica_unless_pinned(self):
+        import time
+
+        from django.core.cache import cache
+        from django.test import override_settings
+
+        from skillswap_backend import routers
+
+        with override_settings(DATABASE_REPLICAS=['replica']):
+            routers._health['replica'] = (True, time.monotonic())
+            try:
+                self.assertEqual(self.route(self.user), 'replica')
+                self.assertEqual(self.route(allowed=False), 'default')
+                self.assertEqual(self.route(wrote=True), 'default')
+                cache.set(routers._pin_key(self.user.pk), 1)
+                self.assertEqual(self.route(self.user), 'default')
+
+                routers._health['replica'] = (False, time.monotonic())
+                self.assertEqual(self.route(), 'default')
+            finally:
+                routers._health.clear()
+
+    def test_unknown_replica_fails_health_check(self):
+        from skillswap_backend.routers import _health, replica_is_healthy
+
+        self.assertFalse(replica_is_healthy('missing'))
+        _health.clear()
+
+    def test_writes_pin_user_to_primary(self):
+        from django.core.cache import cache
+
+        from skillswap_backend.routers import _pin_key
+
+        client = APIClient()
+        client.force_authenticate(self.user)
+        client.get('/api/users/list/')
+        self.assertIsNone(cache.get(_pin_key(self.user.pk)))
+        client.post('/api/users/skills/offered/', {'name': 'Go'}, format='json')
+        self.assertEqual(cache.get(_pin_key(self.user.pk)), 1)
+
+
+class WriteQueueTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='writer', email='writer@example.com', password='x')
+
+    def test_runs_inline_inside_a_transaction(self):
+        from skillswap_backend.writequeue import run_serialized
+        from .models import Notification
+
+        note = run_serialized(Notification.objects.create, user=self.user, message='hi')
+        self.assertTrue(Notification.objects.filter(id=note.id).exists())
+
+    def test_failed_write_only_rolls_back_itself(self):
+        from concurrent.futures import Future
+
+        from skillswap_backend.writequeue import _commit_batch
+        from .models import Notification
+
+        def create(message):
+            return Notification.objects.create(user=self.user, message=message)
+
+        def fail():
+            Notification.objects.create(user=self.user, message='lost')
+            raise ValueError('boom')
+
+        batch = [(Future(), create, ('first',), {}), (Future(), fail, (), {}), (Future(), create, ('second',), {})]
+        _commit_batch(batch)
+
+        self.assertEqual(batch[0][0].result().message, 'first')
+        with self.assertRaises(ValueError):
+            batch[1][0].result()
+        self.assertEqual(batch[2][0].result().message, 'second')
+        self.assertEqual(
+            sorted(Notification.objects.filter(user=self.user).values_list('message', flat=True)),
+            ['first', 'second'],
+        )
+
+
+class CachedAuthenticationTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='member', email='member@example.com', password='x')
+        self.admin = User.objects.create_user(username='admin', email='admin@example.com', password='x', is_staff=True)
+        self.client = APIClient()
+
+    def bearer(self, user):
+        from rest_framework_simplejwt.tokens import RefreshToken
+
+        return f'Bearer {RefreshToken.for_user(user).access_token}'
+
+    def test_repeat_requests_skip_the_user_query(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        auth = self.bearer(self.user)
+        self.assertEqual(self.client.get('/api/users/stats/', HTTP_AUTHORIZATION=auth).status_code, 200)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.client.get('/api/users/stats/', HTTP_AUTHORIZATION=auth).status_code, 200)
+        self.assertFalse([q for q in queries if 'FROM "users_user"' in q['sql']])
+
+    def test_ban_takes_effect_on_the_next_request(self):
+        auth = self.bearer(self.user)
+        self.assertEqual(self.client.get('/api/users/stats/', HTTP_AUTHORIZATION=auth).status_code, 200)
+
+        self.client.patch(f'/api/users/admin/users/{self.user.id}/', {'is_banned': True},
+                          format='json', HTTP_AUTHORIZATION=self.bearer(self.admin))
+        self.assertEqual(self.client.get('/api/users/stats/', HTTP_AUTHORIZATION=auth).status_code, 401)
+
+    def test_rotated_refresh_token_is_rejected(self):
+        from rest_framework_simplejwt.tokens import RefreshToken
+
+        refresh = str(RefreshToken.for_user(self.user))
+        with self.captureOnCommitCallbacks(execute=True):
+            first = self.client.post('/api/token/refresh/', {'refresh': refresh}, format='json')
+        self.assertEqual(first.status_code, 200)
+        again = self.client.post('/api/token/refresh/', {'refresh': refresh}, format='json')
+        self.assertEqual(again.status_code, 401)
+
+    def test_access_tokens_skip_the_blacklist(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from rest_framework_simplejwt.tokens import RefreshToken
+
+        # Refreshing blacklists the old refresh token
+        refreshed = self.client.post('/api/token/refresh/', {'refresh': str(RefreshToken.for_user(self.user))}, format='json')
+        auth = f"Bearer {refreshed.data['access']}"
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.client.get('/api/users/stats/', HTTP_AUTHORIZATION=auth).status_code, 200)
+        self.assertFalse([q for q in queries if 'token_blacklist' in q['sql']])
+
+
+class AdminSiteTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.root = User.objects.create_superuser(username='root', email='root@example.com', password='x')
+        self.alice = User.objects.create_user(username='alice', email='alice@example.com', password='x', last_name='Lovelace')
+        self.bob = User.objects.create_user(username='bob', email='bob@example.com', password='x')
+        self.client.force_login(self.root)
+
+    def test_changelist_search_uses_the_user_index(self):
+        response = self.client.get('/admin/users/user/', {'q': 'ovela'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(response.context['cl'].result_list), [self.alice])
+
+    def test_skills_use_autocomplete_widgets(self):
+        Skill.objects.create(name='Python')
+        response = self.client.get(f'/admin/users/user/{self.alice.id}/change/')
+        self.assertContains(response, 'admin-autocomplete')
+        self.assertNotContains(response, '>Python</option>')
+
+    def run_action(self, action, users):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        with self.captureOnCommitCallbacks(execute=True), CaptureQueriesContext(connection) as queries:
+            response = self.client.post('/admin/users/user/', {
+                'action': action, '_selected_action': [user.id for user in users],
+            })
+        self.assertEqual(response.status_code, 302)
+        updates = [q for q in queries.captured_queries if q['sql'].startswith('UPDATE "users_user"')]
+        self.assertEqual(len(updates), 1)
+
+    def test_ban_action_updates_in_bulk_and_drops_cached_principals(self):
+        from rest_framework_simplejwt.tokens import RefreshToken
+
+        auth = f'Bearer {RefreshToken.for_user(self.alice).access_token}'
+        self.assertEqual(self.client.get('/api/users/stats/', HTTP_AUTHORIZATION=auth).status_code, 200)
+        self.run_action('ban_users', [self.alice, self.bob])
+        self.assertEqual(User.objects.filter(is_active=False).count(), 2)
+        self.assertEqual(self.client.get('/api/users/stats/', HTTP_AUTHORIZATION=auth).status_code, 401)
+
+    def test_activate_action_updates_in_bulk_and_drops_cached_principals(self):
+        from rest_framework_simplejwt.tokens import RefreshToken
+
+        from .authentication import get_principal
+
+        User.objects.filter(id=self.alice.id).update(is_active=False)
+        # Cache the banned principal; update() above sent no signal
+        self.assertFalse(get_principal(self.alice.id).is_active)
+        auth = f'Bearer {RefreshToken.for_user(self.alice).access_token}'
+        self.run_action('activate_users', [self.alice, self.bob])
+        self.assertTrue(get_principal(self.alice.id).is_active)
+        self.assertEqual(self.client.get('/api/users/stats/', HTTP_AUTHORIZATION=auth).status_code, 200)
+
+
+class PhotoPipelineTests(TestCase):
+    def setUp(self):
+        import shutil
+        import tempfile
+
+        from django.test import override_settings
+
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root, BACKGROUND_WORKERS=0)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.user = User.objects.create_user(username='pictured', email='pictured@example.com', password='x')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def upload(self, content, name='me.png'):
+        from django.core.files.uploadedfile import SimpleUploadedFile
+
+        return self.client.put('/api/users/profile/', {'photo': SimpleUploadedFile(name, content)}, format='multipart')
+
+    def png(self):
+        from io import BytesIO
+
+        from PIL import Image
+
+        buffer = BytesIO()
+        Image.new('RGBA', (300, 200), (200, 30, 30, 255)).save(buffer, 'PNG')
+        return buffer.getvalue()
+
+    def test_rejects_files_that_are_not_images(self):
+        self.assertEqual(self.upload(b'not an image', 'me.jpg').status_code, 400)
+
+    def test_upload_is_reencoded_with_hashed_variants(self):
+        from io import StringIO
+
+        from django.core.management import call_command
+
+        from .photos import VARIANT_DIR
+
+        self.assertEqual(self.upload(self.png()).status_code, 200)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.photo_variants, {})
+
+        call_command('process_photos', workers=1, stdout=StringIO())
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.photo.name.endswith('.jpg'))
+        self.assertEqual(set(self.user.photo_variants), {'64', '128', '256'})
+        self.assertTrue(self.user.photo_variants['64']['webp'].startswith(f'{VARIANT_DIR}/'))
+
+        profile = self.client.get('/api/users/profile/').json()
+        self.assertTrue(profile['photo_variants']['128']['jpeg'].endswith('-128.jpg'))
+
+        # Same picture again: same content-hashed files, no new ones
+        variants = self.user.photo_variants
+        self.upload(self.png())
+        call_command('process_photos', workers=1, stdout=StringIO())
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.photo_variants, variants)
+
+
+class FastFieldsTests(TestCase):
+    def test_matches_drf_rendering(self):
+        from rest_framework import serializers
+
+        from skills.serializers import SkillSerializer
+        from .serializers import UserSerializer
+
+        skill = Skill.objects.create(name='Rust', level='Expert', description='Systems')
+        user = User.objects.create_user(username='fast', first_name='Fay', rating=4.5, availability=['weekends'])
+        user.skills_offered.add(skill)
+        user = User.objects.get(pk=user.pk)
+        skill = Skill.objects.get(pk=skill.pk)
+
+        class PlainSkill(serializers.ModelSerializer):
+            class Meta(SkillSerializer.Meta):
+                pass
+
+        class PlainUser(UserSerializer):
+            def to_representation(self, instance):
+                return serializers.ModelSerializer.to_representation(self, instance)
+
+        self.assertEqual(SkillSerializer(skill).data, PlainSkill(skill).data)
+        self.assertEqual(dict(UserSerializer(user).data), dict(PlainUser(user).data))
+
+
+class BenchmarkToolingTests(TransactionTestCase):
+    def test_generated_dataset_is_consistent_and_benchmarkable(self):
+        import json
+        import tempfile
+        from io import StringIO
+
+        from django.core.management import call_command
+
+        from swaps.models import Rating, SwapRequest
+
+        call_command('generate_dataset', users=60, skills=40, batch_size=25, stdout=StringIO())
+        self.assertEqual(User.objects.filter(username__startswith='gen').count(), 61)
+        self.assertTrue(SwapRequest.objects.filter(status='completed').exists())
+
+        # Counters bypassed by bulk inserts are rebuilt
+        skill = Skill.objects.order_by('-offered_count').first()
+        self.assertEqual(skill.offered_count, skill.users_offering.count())
+        rated = User.objects.filter(rating_count__gt=0).first()
+        self.assertEqual(rated.rating_count, Rating.objects.filter(rated_user=rated).count())
+
+        with tempfile.NamedTemporaryFile(suffix='.json') as output:
+            call_command('bench_endpoints', requests=4, concurrency=2, warmup=0, output=output.name,
+                         include=['profile', 'swap-requests', 'admin-swaps', 'rate-swap'], stdout=StringIO())
+            report = json.load(output)
+        self.assertEqual([row['name'] for row in report['endpoints']], ['profile', 'swap-requests', 'admin-swaps'])
+        self.assertEqual([row['statuses'] for row in report['endpoints']], [{'200': 4}] * 3)
+        self.assertEqual(report['skipped'][0]['name'], 'rate-swap')
+        self.assertEqual(report['meta']['dataset']['users'], 61)
+
+
+class PerfInstrumentationTests(TestCase):
+    def setUp(self):
+        from skillswap_backend import perf
+
+        perf.reset_metrics()
+        self.user = User.objects.create_user(username='timed', password='x')
+        self.admin = User.objects.create_user(username='ops', password='x', is_staff=True)
+
+    def bearer(self, user):
+        from rest_framework_simplejwt.tokens import RefreshToken
+
+        return f'Bearer {RefreshToken.for_user(user).access_token}'
+
+    def test_server_timing_header_breaks_down_the_request(self):
+        response = self.client.get('/api/users/profile/', HTTP_AUTHORIZATION=self.bearer(self.user))
+        self.assertEqual(response.status_code, 200)
+        phases = [part.split(';')[0] for part in response['Server-Timing'].split(', ')]
+        self.assertEqual(phases[0], 'db')
+        self.assertEqual(phases[-1], 'total')
+        self.assertTrue({'auth', 'serialize', 'render'} <= set(phases))
+
+    def test_metrics_endpoint_exports_per_view_histograms(self):
+        self.client.get('/api/users/stats/', HTTP_AUTHORIZATION=self.bearer(self.user))
+        self.assertEqual(
+            self.client.get('/api/users/admin/metrics/', HTTP_AUTHORIZATION=self.bearer(self.user)).status_code, 403
+        )
+        response = self.client.get('/api/users/admin/metrics/', HTTP_AUTHORIZATION=self.bearer(self.admin))
+        self.assertEqual(response.status_code, 200)
+        body = response.content.decode()
+        self.assertIn('skillswap_requests_total{view="user-stats",method="GET",status="200"} 1', body)
+        self.assertIn('skillswap_db_queries_bucket{view="user-stats",method="GET",le="+Inf"} 1', body)
+
+    def test_duplicate_queries_are_counted(self):
+        from skillswap_backend import perf
+
+        metrics = perf.RequestMetrics()
+        for _ in range(3):
+            metrics.record_query('SELECT 1 FROM users_user WHERE id = %s', 1.0)
+        metrics.record_query('SELECT 2', 5.0)
+        self.assertEqual((metrics.query_count, metrics.duplicate_count), (4, 2))
+        self.assertEqual(metrics.costliest_statements(1), [('SELECT 2', 1, 5.0)])
+
+    def test_slow_requests_are_logged_with_their_sql(self):
+        from django.test import override_settings
+
+        with override_settings(PERF_SLOW_REQUEST_MS=0), self.assertLogs('skillswap_backend.perf') as logs:
+            self.client.get('/api/users/profile/', HTTP_AUTHORIZATION=self.bearer(self.user))
+        self.assertIn('Slow request GET /api/users/profile/ (profile) -> 200', logs.output[0])
+        self.assertIn('FROM "users_user"', logs.output[0])
+
+
+class ProfilerTests(TestCase):
+    def setUp(self):
+        from skillswap_backend import perf
+
+        perf.reset_metrics()
+        self.admin = User.objects.create_user(username='profiler', password='x', is_staff=True)
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def test_profiles_the_next_matching_requests(self):
+        import time as time_module
+        from unittest import mock
+
+        from django.test import override_settings
+
+        from . import profiling
+        from .views import UserStatsView
+
+        response = self.client.post('/api/users/admin/profiles/', {
+            'path_pattern': '^/api/users/stats/', 'requests': 2, 'interval_ms': 1,
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        session_id = response.data['id']
+
+        real_view = UserStatsView.get
+
+        def slow_get(view, request):
+            time_module.sleep(0.05)
+            return real_view(view, request)
+
+        with override_settings(PROFILER_POLL_SECONDS=0), mock.patch.object(UserStatsView, 'get', slow_get):
+            self.client.get('/api/users/profile/')
+            for _ in range(3):
+                self.assertEqual(self.client.get('/api/users/stats/').status_code, 200)
+            self.assertEqual(profiling.armed_sessions(), ())
+        # The finished session's counts are written out and released
+        self.assertNotIn(session_id, profiling.sampler.counts)
+
+        data = self.client.get(f'/api/users/admin/profiles/{session_id}/').data
+        self.assertEqual((data['status'], data['requests_profiled']), ('finished', 2))
+        self.assertGreater(data['samples'], 10)
+
+        response = self.client.get(f'/api/users/admin/profiles/{session_id}/download/')
+        folded = response.content.decode()
+        self.assertIn('slow_get', folded)
+        self.assertNotIn('ProfileView', folded)
+        stack, count = folded.splitlines()[0].rsplit(' ', 1)
+        # Stacks start below the profiler middleware
+        self.assertNotIn('ProfilerMiddleware', stack)
+        self.assertGreater(int(count), 0)
+
+    def test_rejects_invalid_sessions(self):
+        for data in (
+            {}, {'path_pattern': '('}, {'path_pattern': 'x', 'seconds': 10 ** 6}, {'path_pattern': 'x', 'requests': 'a'},
+            {'path_pattern': 'x', 'all_threads': 'maybe'},
+        ):
+            self.assertEqual(self.client.post('/api/users/admin/profiles/', data, format='json').status_code, 400)
+
+    def test_all_threads_parses_false(self):
+        response = self.client.post('/api/users/admin/profiles/', {
+            'path_pattern': '^/nowhere/', 'requests': 1, 'all_threads': 'false',
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertFalse(response.data['all_threads'])
+
+    def test_unarmed_requests_skip_the_profiler(self):
+        from django.db import connection
+        from django.test import override_settings
+        from django.test.utils import CaptureQueriesContext
+
+        from . import profiling
+
+        with override_settings(PROFILER_POLL_SECONDS=3600):
+            profiling._sessions['checked_at'] = float('-inf')
+            self.client.get('/api/users/stats/')
+            with CaptureQueriesContext(connection) as queries:
+                self.client.get('/api/users/stats/')
+        self.assertFalse(any('profilesession' in query['sql'] for query in queries.captured_queries))
@@ -3,7 +3,12 @@ from .views import (
     RegisterView, 
     ProfileView, 
     UserListView, 
+    UserSearchView,
+    UserMatchesView,
     NotificationListView,
+    NotificationStreamView,
+    NotificationStreamTicketView,
+    UnreadCountView,
     MarkNotificationsReadView,
     UserSkillsOfferedView,
     UserSkillsWantedView,
@@ -12,6 +17,13 @@ from .views import (
     AdminUserDetailView,
     PlatformMessagesView,
     ReportsView,
+    ReportJobsView,
+    ReportJobDetailView,
+    ReportJobDownloadView,
+    MetricsView,
+    ProfileSessionsView,
+    ProfileSessionDetailView,
+    ProfileSessionDownloadView,
     GoogleLoginView
 )
 
@@ -20,7 +32,12 @@ urlpatterns = [
     path('google-login/', GoogleLoginView.as_view(), name='google-login'),
     path('profile/', ProfileView.as_view(), name='profile'),
     path('list/', UserListView.as_view(), name='user-list'),
+    path('search/', UserSearchView.as_view(), name='user-search'),
+    path('matches/', UserMatchesView.as_view(), name='user-matches'),
     path('notifications/', NotificationListView.as_view(), name='notifications'),
+    path('notifications/unread-count/', UnreadCountView.as_view(), name='notifications-unread-count'),
+    path('notifications/stream/', NotificationStreamView.as_view(), name='notifications-stream'),
+    path('notifications/stream/ticket/', NotificationStreamTicketView.as_view(), name='notifications-stream-ticket'),
     path('notifications/mark-read/', MarkNotificationsReadView.as_view(), name='mark-notifications-read'),
     path('skills/offered/', UserSkillsOfferedView.as_view(), name='skills-offered'),
     path('skills/wanted/', UserSkillsWantedView.as_view(), name='skills-wanted'),
@@ -30,4 +47,11 @@ urlpatterns = [
     path('admin/users/<int:user_id>/', AdminUserDetailView.as_view(), name='admin-user-detail'),
     path('admin/messages/', PlatformMessagesView.as_view(), name='platform-messages'),
     path('admin/reports/', ReportsView.as_view(), name='reports'),
+    path('admin/reports/jobs/', ReportJobsView.as_view(), name='report-jobs'),
+    path('admin/reports/jobs/<int:job_id>/', ReportJobDetailView.as_view(), name='report-job-detail'),
+    path('admin/reports/jobs/<int:job_id>/download/', ReportJobDownloadView.as_view(), name='report-job-download'),
+    path('admin/metrics/', MetricsView.as_view(), name='metrics'),
+    path('admin/profiles/', ProfileSessionsView.as_view(), name='profile-sessions'),
+    path('admin/profiles/<int:session_id>/', ProfileSessionDetailView.as_view(), name='profile-session-detail'),
+    path('admin/profiles/<int:session_id>/download/', ProfileSessionDownloadView.as_view(), name='profile-session-download'),
 ]
@@ -1,22 +1,48 @@
+import json
+
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.views import View
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny, IsAdminUser
 from rest_framework import status
+from django.conf import settings
 from django.contrib.auth import get_user_model, authenticate
-from django.db.models import Avg, Count, Q
 from rest_framework_simplejwt.tokens import RefreshToken
-from .models import Notification, UserProfile
+from .models import Notification, UserProfile, ReportJob, Broadcast, ProfileSession
+from .broadcasts import mark_broadcasts_read, send_broadcast, visible_broadcasts
 from .serializers import (
     NotificationSerializer, 
     UserSerializer, 
+    UserSearchResultSerializer,
+    SkillMatchSerializer,
+    ReportJobSerializer,
+    ProfileSessionSerializer,
+    BroadcastFeedSerializer,
+    BroadcastSerializer,
     UserRegistrationSerializer,
     UserProfileSerializer,
     UserSkillsOfferedSerializer,
     UserSkillsWantedSerializer
 )
-from swaps.models import SwapRequest
-from skills.models import Skill
+from .jobs import submit_report_job
+from .notifications import mark_feed_read, mark_read, notification_feed, unread_count
+from .realtime import event_stream, issue_stream_ticket, push_supported, push_unread_count, user_from_ticket
+from .matching import recommend_partners
+from .profiling import arm_session, collapsed_stacks, finish_session
+from .reports import REPORTS, clean_filters, iter_csv
+from .loaders import with_user_skills
+from .search import ADMIN_USER_ORDERINGS, MATCH_MODES, admin_search, search_ordering, search_users
+from swaps.serializers import stats_payload
+from swaps.stats import get_stats
+from skills.registry import resolve_skill
 from django.utils import timezone
+from skillswap_backend import perf
+from skillswap_backend.http import ranged_file_response
+from skillswap_backend.filters import date_range, parse_bool
+from skillswap_backend.pagination import estimated_count, paginate_keyset, parse_limit, parse_ordering
+from skillswap_backend.sparse import sparse_context
 
 User = get_user_model()
 
@@ -88,11 +114,12 @@ class ProfileView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        serializer = UserSerializer(request.user)
+        # request.user may be the cached principal; show the current row
+        serializer = UserSerializer(User.objects.get(pk=request.user.pk), context=sparse_context(request))
         return Response(serializer.data)
 
     def put(self, request):
-        serializer = UserSerializer(request.user, data=request.data, partial=True)
+        serializer = UserSerializer(User.objects.get(pk=request.user.pk), data=request.data, partial=True)
         if serializer.is_valid():
             serializer.save()
             return Response(serializer.data)
@@ -100,41 +127,183 @@ class ProfileView(APIView):
 
 class UserListView(APIView):
     permission_classes = [IsAuthenticated]
+    replica_reads = True
 
     def get(self, request):
         # Exclude the current user from the results
-        users = User.objects.filter(is_active=True).exclude(id=request.user.id)
-        serializer = UserSerializer(users, many=True)
+        context = sparse_context(request)
+        users = with_user_skills(User.objects.filter(is_active=True).exclude(id=request.user.id), context)
+        serializer = UserSerializer(users, many=True, context=context)
         return Response(serializer.data)
 
-class NotificationListView(APIView):
+class UserSearchView(APIView):
+    permission_classes = [IsAuthenticated]
+    replica_reads = True
+
+    def get(self, request):
+        """
+        Ranked, cursor-paginated directory search.
+
+        Query params: q, skills (comma-separated ids), match (offered|wanted|any),
+        availability (comma-separated), location, limit, cursor.
+        """
+        params = request.query_params
+        match = params.get('match', 'offered')
+        if match not in MATCH_MODES:
+            return Response({'error': f'match must be one of {", ".join(MATCH_MODES)}'}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            skill_ids = [int(value) for value in params.get('skills', '').split(',') if value]
+        except ValueError:
+            return Response({'error': 'skills must be a comma-separated list of ids'}, status=status.HTTP_400_BAD_REQUEST)
+        availability = [value for value in params.get('availability', '').split(',') if value]
+
+        context = sparse_context(request)
+        users = with_user_skills(search_users(
+            request.user,
+            query=params.get('q', '').strip(),
+            skill_ids=skill_ids,
+            match=match,
+            availability=availability,
+            location=params.get('location', '').strip(),
+        ), context)
+        try:
+            page, next_cursor = paginate_keyset(users, search_ordering(skill_ids), params.get('cursor'), parse_limit(request))
+        except ValueError:
+            return Response({'error': 'Invalid cursor'}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({
+            'results': UserSearchResultSerializer(page, many=True, context=context).data,
+            'next_cursor': next_cursor,
+        })
+
+class UserMatchesView(APIView):
     permission_classes = [IsAuthenticated]
+    replica_reads = True
 
     def get(self, request):
-        notifications = Notification.objects.filter(user=request.user).order_by('-created_at')[:10]
-        serializer = NotificationSerializer(notifications, many=True)
+        """Top-K reciprocal swap partners from the precomputed match index"""
+        limit = parse_limit(request, default=10, maximum=50)
+        ranked = recommend_partners(request.user, limit)
+        scores = {match.pk: score for match, score in ranked}
+        serializer = SkillMatchSerializer([match for match, _ in ranked], many=True, context={'scores': scores})
         return Response(serializer.data)
 
+class NotificationListView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        """
+        Keyset-paginated feed of notifications merged with platform broadcasts
+        """
+        try:
+            feed, next_cursor = notification_feed(request.user, request.query_params.get('cursor'), parse_limit(request))
+        except ValueError:
+            return Response({'error': 'Invalid cursor'}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({
+            'results': [
+                BroadcastFeedSerializer(item).data if isinstance(item, Broadcast) else NotificationSerializer(item).data
+                for item in feed
+            ],
+            'next_cursor': next_cursor,
+            'unread_count': unread_count(request.user, refresh=True),
+        })
+
+class UnreadCountView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        """Unread count from the user's counter; never scans notifications"""
+        return Response({'unread_count': unread_count(request.user, refresh=True)})
+
+class NotificationStreamTicketView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        """Issue a single-use ticket for the event stream; 501 when push is unavailable"""
+        if not push_supported(request._request):
+            return Response({'error': 'Notification push requires the ASGI server'}, status=status.HTTP_501_NOT_IMPLEMENTED)
+        return Response({'ticket': issue_stream_ticket(request.user), 'expires_in': settings.STREAM_TICKET_SECONDS})
+
+class NotificationStreamView(View):
+    """
+    Server-Sent Events feed of new notifications and unread-count changes.
+
+    EventSource cannot send headers, so the stream is opened with a
+    single-use ?ticket= from NotificationStreamTicketView. Only served
+    through the ASGI entry point; under WSGI it would hold a worker thread
+    for as long as the tab stays open.
+    """
+
+    async def get(self, request):
+        if not push_supported(request):
+            return JsonResponse({'error': 'Notification push requires the ASGI server'}, status=501)
+        ticket = request.GET.get('ticket', '')
+        user = await sync_to_async(user_from_ticket)(ticket) if ticket else None
+        if user is None:
+            return JsonResponse({'error': 'Authentication required'}, status=401)
+
+        async def stream():
+            async for event in event_stream(user):
+                if event is None:
+                    yield ': keep-alive\n\n'
+                else:
+                    yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+
+        response = StreamingHttpResponse(stream(), content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
 class MarkNotificationsReadView(APIView):
     permission_classes = [IsAuthenticated]
 
     def post(self, request):
         # Mark all notifications as read for the current user
-        Notification.objects.filter(user=request.user, read=False).update(read=True)
+        mark_read(request.user)
+        mark_broadcasts_read(request.user)
+        push_unread_count(request.user)
         return Response({'message': 'Notifications marked as read'}, status=status.HTTP_200_OK)
 
     def patch(self, request):
-        # Mark specific notification as read
+        """
+        Mark notifications read in bulk: "ids" (or a single "notification_id"),
+        "broadcast_id", or "up_to" (a feed cursor; everything at or newer than it)
+        """
+        broadcast_id = request.data.get('broadcast_id')
+        if broadcast_id:
+            if not str(broadcast_id).isdigit():
+                return Response({'error': 'broadcast_id must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+            if not visible_broadcasts(request.user).filter(id=broadcast_id).exists():
+                return Response({'error': 'Broadcast not found'}, status=status.HTTP_404_NOT_FOUND)
+            mark_broadcasts_read(request.user, [broadcast_id])
+            push_unread_count(request.user)
+            return Response({'message': 'Broadcast marked as read'}, status=status.HTTP_200_OK)
+        
+        up_to = request.data.get('up_to')
+        if up_to:
+            try:
+                marked = mark_feed_read(request.user, up_to)
+            except ValueError:
+                return Response({'error': 'Invalid cursor'}, status=status.HTTP_400_BAD_REQUEST)
+            push_unread_count(request.user)
+            return Response({'message': 'Notifications marked as read', 'marked': marked}, status=status.HTTP_200_OK)
+        
+        ids = request.data.get('ids')
         notification_id = request.data.get('notification_id')
         if notification_id:
-            try:
-                notification = Notification.objects.get(id=notification_id, user=request.user)
-                notification.read = True
-                notification.save()
-                return Response({'message': 'Notification marked as read'}, status=status.HTTP_200_OK)
-            except Notification.DoesNotExist:
-                return Response({'error': 'Notification not found'}, status=status.HTTP_404_NOT_FOUND)
-        return Response({'error': 'notification_id is required'}, status=status.HTTP_400_BAD_REQUEST)
+            ids = [notification_id]
+        if not ids or not isinstance(ids, list):
+            return Response({'error': 'notification_id, ids, broadcast_id or up_to is required'}, status=status.HTTP_400_BAD_REQUEST)
+        if not all(str(value).isdigit() for value in ids):
+            return Response({'error': 'ids must be a list of integers'}, status=status.HTTP_400_BAD_REQUEST)
+        ids = [int(value) for value in ids]
+        
+        marked = mark_read(request.user, ids=ids)
+        if notification_id and not marked and not Notification.objects.filter(id=ids[0], user=request.user).exists():
+            return Response({'error': 'Notification not found'}, status=status.HTTP_404_NOT_FOUND)
+        push_unread_count(request.user)
+        return Response({'message': 'Notifications marked as read', 'marked': marked}, status=status.HTTP_200_OK)
 
 class UserSkillsOfferedView(APIView):
     permission_classes = [IsAuthenticated]
@@ -149,11 +318,11 @@ class UserSkillsOfferedView(APIView):
         skill_level = request.data.get('level', 'Beginner')
         skill_description = request.data.get('description', '')
         
-        # Create or get the skill
-        skill, created = Skill.objects.get_or_create(
-            name=skill_name,
-            defaults={'description': skill_description}
-        )
+        # Resolve to the canonical skill, creating it if it is new
+        try:
+            skill, created = resolve_skill(skill_name, defaults={'description': skill_description})
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
         
         # Add to user's offered skills
         request.user.skills_offered.add(skill)
@@ -179,11 +348,11 @@ class UserSkillsWantedView(APIView):
         skill_priority = request.data.get('priority', 'Medium')
         skill_description = request.data.get('description', '')
         
-        # Create or get the skill
-        skill, created = Skill.objects.get_or_create(
-            name=skill_name,
-            defaults={'description': skill_description}
-        )
+        # Resolve to the canonical skill, creating it if it is new
+        try:
+            skill, created = resolve_skill(skill_name, defaults={'description': skill_description})
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
         
         # Add to user's wanted skills
         request.user.skills_wanted.add(skill)
@@ -198,51 +367,49 @@ class UserSkillsWantedView(APIView):
 
 class UserStatsView(APIView):
     permission_classes = [IsAuthenticated]
+    replica_reads = True
 
     def get(self, request):
-        # Get user's swap statistics
-        total_swaps = SwapRequest.objects.filter(
-            requester=request.user
-        ).count()
-        
-        completed_swaps = SwapRequest.objects.filter(
-            requester=request.user,
-            status='completed'
-        ).count()
-        
-        pending_swaps = SwapRequest.objects.filter(
-            requester=request.user,
-            status='pending'
-        ).count()
-        
-        # Calculate average rating (placeholder - you can implement rating system)
-        average_rating = 4.5  # This would come from a rating model
-        
-        return Response({
-            'total_swaps': total_swaps,
-            'completed_swaps': completed_swaps,
-            'pending_swaps': pending_swaps,
-            'average_rating': average_rating
-        })
+        # Get user's swap statistics from the materialized stats row
+        return Response(stats_payload(get_stats(request.user.id)))
 
 class AdminUserListView(APIView):
     permission_classes = [IsAdminUser]
+    replica_reads = True
 
     def get(self, request):
+        """
+        Keyset-paginated user list.
+
+        Query params: search, is_active, is_staff, is_public, joined_from,
+        joined_to, ordering, limit, cursor.
+        """
         if not request.user.is_staff:
             return Response({'error': 'Unauthorized access'}, status=status.HTTP_403_FORBIDDEN)
-        # Optional search by username/email
-        search = request.GET.get('search', '')
-        users = User.objects.all()
-        if search:
-            users = users.filter(
-                Q(username__icontains=search) |
-                Q(email__icontains=search) |
-                Q(first_name__icontains=search) |
-                Q(last_name__icontains=search)
-            )
-        serializer = UserSerializer(users, many=True)
-        return Response(serializer.data)
+        params = request.query_params
+        try:
+            ordering = parse_ordering(request, ADMIN_USER_ORDERINGS, '-created_at')
+            users = admin_search(User.objects.all(), params.get('search', ''))
+            for flag in ('is_active', 'is_staff', 'is_public'):
+                value = parse_bool(params, flag)
+                if value is not None:
+                    users = users.filter(**{flag: value})
+            users = users.filter(date_range(params, 'created_at', 'joined'))
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        context = sparse_context(request)
+        count, count_exact = estimated_count(users)
+        try:
+            page, next_cursor = paginate_keyset(with_user_skills(users, context), ordering, params.get('cursor'), parse_limit(request))
+        except ValueError:
+            return Response({'error': 'Invalid cursor'}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({
+            'results': UserSerializer(page, many=True, context=context).data,
+            'next_cursor': next_cursor,
+            'count': count,
+            'count_exact': count_exact,
+        })
 
 class AdminUserDetailView(APIView):
     permission_classes = [IsAdminUser]
@@ -262,9 +429,20 @@ class AdminUserDetailView(APIView):
 class PlatformMessagesView(APIView):
     permission_classes = [IsAdminUser]
 
+    def get(self, request):
+        """
+        List recent broadcasts with their materialization progress
+        """
+        broadcasts = Broadcast.objects.all()[:parse_limit(request)]
+        return Response(BroadcastSerializer(broadcasts, many=True).data)
+
     def post(self, request):
         """
         Send a platform-wide message to all users
+        
+        The message is stored once and merged into each user's feed when they
+        read it. Pass "materialize": true to also copy it into per-user
+        notifications in the background.
         """
         title = request.data.get('title')
         message = request.data.get('message')
@@ -275,165 +453,159 @@ class PlatformMessagesView(APIView):
             }, status=status.HTTP_400_BAD_REQUEST)
         
         try:
-            users = User.objects.filter(is_active=True)
-            notifications = []
-            for user in users:
-                notification = Notification(
-                    user=user,
-                    message=message,
-                    # Only include fields that exist in your Notification model
-                )
-                notifications.append(notification)
-            Notification.objects.bulk_create(notifications)
-            return Response({
-                'message': f'Platform message sent to {len(users)} users successfully',
-                'users_notified': len(users)
-            }, status=status.HTTP_201_CREATED)
-        except Exception as e:
-            import traceback
-            print(traceback.format_exc())
-            return Response({
-                'error': f'Failed to send platform message: {str(e)}'
-            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+            materialize = bool(parse_bool(request.data, 'materialize'))
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        broadcast = send_broadcast(request.user, title, message, materialize=materialize)
+        return Response({
+            'message': 'Platform message sent successfully',
+            'broadcast': BroadcastSerializer(broadcast).data
+        }, status=status.HTTP_201_CREATED)
 
 class ReportsView(APIView):
     permission_classes = [IsAdminUser]
 
     def get(self, request):
         """
-        Generate and return CSV reports
+        Stream CSV reports (users, swaps or feedback)
         """
-        import csv
-        import io
-        from datetime import datetime
-        from django.http import HttpResponse
-        
         report_type = request.GET.get('type', 'users')
-        
-        if report_type == 'users':
-            return self._generate_users_report()
-        elif report_type == 'swaps':
-            return self._generate_swaps_report()
-        elif report_type == 'feedback':
-            return self._generate_feedback_report()
-        else:
+        if report_type not in REPORTS:
             return Response({'error': 'Invalid report type'}, status=400)
-
-    def _generate_users_report(self):
-        """Generate users activity report"""
-        import csv
-        import io
-        from django.http import HttpResponse
-        from datetime import datetime
-        
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = f'attachment; filename="users_report_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv"'
-        
-        writer = csv.writer(response)
-        writer.writerow([
-            'User ID', 'Username', 'Email', 'First Name', 'Last Name', 
-            'Date Joined', 'Last Login', 'Is Active', 'Skills Offered Count', 
-            'Skills Wanted Count', 'Total Swaps', 'Completed Swaps'
-        ])
-        
-        users = User.objects.all().prefetch_related('skills_offered', 'skills_wanted')
-        
-        for user in users:
-            # Get swap statistics
-            total_swaps = SwapRequest.objects.filter(
-                Q(from_user=user) | Q(to_user=user)
-            ).count()
-            
-            completed_swaps = SwapRequest.objects.filter(
-                Q(from_user=user) | Q(to_user=user),
-                status='completed'
-            ).count()
-            
-            writer.writerow([
-                user.id,
-                user.username,
-                user.email,
-                user.first_name or '',
-                user.last_name or '',
-                user.date_joined.strftime('%Y-%m-%d %H:%M:%S') if user.date_joined else '',
-                user.last_login.strftime('%Y-%m-%d %H:%M:%S') if user.last_login else '',
-                'Yes' if user.is_active else 'No',
-                user.skills_offered.count(),
-                user.skills_wanted.count(),
-                total_swaps,
-                completed_swaps
-            ])
+        try:
+            filters = clean_filters(report_type, request.GET)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=400)
         
+        response = StreamingHttpResponse(iter_csv(report_type, filters), content_type='text/csv')
+        response['Content-Disposition'] = f'attachment; filename="{report_type}_report_{timezone.localtime().strftime("%Y%m%d_%H%M%S")}.csv"'
         return response
 
-    def _generate_swaps_report(self):
-        """Generate swaps activity report"""
-        import csv
-        import io
-        from django.http import HttpResponse
-        from datetime import datetime
-        
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = f'attachment; filename="swaps_report_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv"'
-        
-        writer = csv.writer(response)
-        writer.writerow([
-            'Swap ID', 'From User', 'To User', 'Skills Offered', 'Skills Wanted',
-            'Status', 'Created Date', 'Updated Date', 'Message'
-        ])
-        
-        swaps = SwapRequest.objects.all().select_related('from_user', 'to_user').prefetch_related('skills_offered', 'skills_wanted')
-        
-        for swap in swaps:
-            skills_offered = ', '.join([skill.name for skill in swap.skills_offered.all()])
-            skills_wanted = ', '.join([skill.name for skill in swap.skills_wanted.all()])
-            
-            writer.writerow([
-                swap.id,
-                swap.from_user.username if swap.from_user else '',
-                swap.to_user.username if swap.to_user else '',
-                skills_offered,
-                skills_wanted,
-                swap.status,
-                swap.created_at.strftime('%Y-%m-%d %H:%M:%S') if swap.created_at else '',
-                swap.updated_at.strftime('%Y-%m-%d %H:%M:%S') if swap.updated_at else '',
-                swap.message or ''
-            ])
-        
-        return response
+class ReportJobsView(APIView):
+    permission_classes = [IsAdminUser]
 
-    def _generate_feedback_report(self):
-        """Generate feedback/ratings report"""
-        import csv
-        import io
-        from django.http import HttpResponse
-        from datetime import datetime
-        
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = f'attachment; filename="feedback_report_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv"'
-        
-        writer = csv.writer(response)
-        writer.writerow([
-            'Rating ID', 'Swap ID', 'From User', 'To User', 'Rating', 
-            'Comment', 'Created Date'
-        ])
-        
-        # Get all ratings from swap requests
-        ratings = []
-        swaps = SwapRequest.objects.filter(status='completed').select_related('from_user', 'to_user')
+    def get(self, request):
+        """List the most recent report jobs"""
+        jobs = ReportJob.objects.all()[:parse_limit(request)]
+        return Response(ReportJobSerializer(jobs, many=True, context={'request': request}).data)
+
+    def post(self, request):
+        """
+        Queue a report for background generation, or reuse a cached one
+        """
+        report_type = request.data.get('type', 'users')
+        if report_type not in REPORTS:
+            return Response({'error': 'Invalid report type'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            filters = clean_filters(report_type, request.data.get('filters') or {})
+        except (ValueError, AttributeError) as e:
+            return Response({'error': str(e) or 'Invalid filters'}, status=status.HTTP_400_BAD_REQUEST)
         
-        for swap in swaps:
-            # This is a simplified version - you might have a separate Rating model
-            # For now, we'll include completed swaps as feedback
-            writer.writerow([
-                f'SWAP_{swap.id}',
-                swap.id,
-                swap.from_user.username if swap.from_user else '',
-                swap.to_user.username if swap.to_user else '',
-                'Completed',  # Placeholder for actual rating
-                swap.message or '',
-                swap.updated_at.strftime('%Y-%m-%d %H:%M:%S') if swap.updated_at else ''
-            ])
+        try:
+            compress = bool(parse_bool(request.data, 'compress'))
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        job, reused = submit_report_job(request.user, report_type, filters, compress)
+        data = ReportJobSerializer(job, context={'request': request}).data
+        data['reused'] = reused
+        return Response(data, status=status.HTTP_200_OK if reused else status.HTTP_202_ACCEPTED)
+
+class ReportJobDetailView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, job_id):
+        try:
+            job = ReportJob.objects.get(id=job_id)
+        except ReportJob.DoesNotExist:
+            return Response({'error': 'Report job not found'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(ReportJobSerializer(job, context={'request': request}).data)
+
+class ReportJobDownloadView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, job_id):
+        """Download a finished report; supports HTTP Range for resumable downloads"""
+        try:
+            job = ReportJob.objects.get(id=job_id)
+        except ReportJob.DoesNotExist:
+            return Response({'error': 'Report job not found'}, status=status.HTTP_404_NOT_FOUND)
+        if job.status != 'done' or not job.file:
+            return Response({'error': f'Report is not ready (status: {job.status})'}, status=status.HTTP_409_CONFLICT)
+        if job.expires_at and job.expires_at <= timezone.now():
+            return Response({'error': 'Report has expired; request it again'}, status=status.HTTP_410_GONE)
         
-        return response
+        filename = job.file.name.rsplit('/', 1)[-1]
+        content_type = 'application/gzip' if job.compress else 'text/csv'
+        return ranged_file_response(request, job.file, content_type, filename)
+
+class MetricsView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        """Per-view request metrics of this process, in the Prometheus text format"""
+        return HttpResponse(perf.render_metrics(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+class ProfileSessionsView(APIView):
+    permission_classes = [IsAdminUser]
 
+    def get(self, request):
+        """List recent profiling sessions"""
+        sessions = ProfileSession.objects.prefetch_related('chunks')[:parse_limit(request)]
+        return Response(ProfileSessionSerializer(sessions, many=True, context={'request': request}).data)
+
+    def post(self, request):
+        """
+        Arm the sampling profiler for requests whose path matches `path_pattern`
+
+        Profiles the next `requests` matching requests, or every matching
+        request for `seconds`. With `all_threads`, every thread of a process
+        is sampled from its first matching request until the window ends.
+        """
+        path_pattern = request.data.get('path_pattern')
+        if not path_pattern:
+            return Response({'error': 'path_pattern is required'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            options = {
+                name: int(request.data[name])
+                for name in ('requests', 'seconds', 'interval_ms') if request.data.get(name) not in (None, '')
+            }
+            session = arm_session(
+                request.user, path_pattern,
+                max_requests=options.get('requests'),
+                seconds=options.get('seconds'),
+                all_threads=bool(parse_bool(request.data, 'all_threads')),
+                interval_ms=options.get('interval_ms'),
+            )
+        except (TypeError, ValueError) as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(ProfileSessionSerializer(session, context={'request': request}).data, status=status.HTTP_201_CREATED)
+
+class ProfileSessionDetailView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, session_id):
+        try:
+            session = ProfileSession.objects.prefetch_related('chunks').get(id=session_id)
+        except ProfileSession.DoesNotExist:
+            return Response({'error': 'Profile session not found'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(ProfileSessionSerializer(session, context={'request': request}).data)
+
+    def delete(self, request, session_id):
+        """Stop profiling; samples collected so far stay downloadable"""
+        if not ProfileSession.objects.filter(id=session_id).exists():
+            return Response({'error': 'Profile session not found'}, status=status.HTTP_404_NOT_FOUND)
+        finish_session(session_id)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+class ProfileSessionDownloadView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, session_id):
+        """Collapsed stacks ("frame;frame;frame count" lines) for flamegraph.pl or speedscope"""
+        try:
+            session = ProfileSession.objects.get(id=session_id)
+        except ProfileSession.DoesNotExist:
+            return Response({'error': 'Profile session not found'}, status=status.HTTP_404_NOT_FOUND)
+        response = HttpResponse(collapsed_stacks(session), content_type='text/plain; charset=utf-8')
+        response['Content-Disposition'] = f'attachment; filename="profile_{session.id}.folded"'
+        return response
@@ -31,7 +31,7 @@ import {
 } from '@mui/icons-material';
 import { useNavigate } from 'react-router-dom';
 import { useAuth } from '../context/AuthContext';
-import { notificationsAPI } from '../services/apiService';
+import { notificationsAPI, apiUtils } from '../services/apiService';
 
 const Header = () => {
   const [anchorEl, setAnchorEl] = useState(null);
@@ -50,26 +50,29 @@ const Header = () => {
     }
   }, [isAuthenticated]);
 
-  // Refresh notifications when component becomes visible (user returns to page)
+  // Receive new notifications and unread-count changes as they happen
   useEffect(() => {
-    const handleVisibilityChange = () => {
-      if (!document.hidden && isAuthenticated()) {
-        loadNotifications();
+    if (!isAuthenticated()) {
+      return undefined;
+    }
+    return notificationsAPI.subscribe((event) => {
+      if (event.type === 'notification') {
+        setNotifications(prev => [event.notification, ...prev]);
+      } else if (event.type === 'broadcast') {
+        setNotifications(prev => [event.broadcast, ...prev]);
+        setUnreadCount(count => count + 1);
       }
-    };
-
-    document.addEventListener('visibilitychange', handleVisibilityChange);
-    return () => {
-      document.removeEventListener('visibilitychange', handleVisibilityChange);
-    };
+      if (event.unread_count !== undefined) {
+        setUnreadCount(event.unread_count);
+      }
+    });
   }, [isAuthenticated]);
 
   const loadNotifications = async () => {
     try {
-      const userNotifications = await notificationsAPI.getNotifications();
-      setNotifications(userNotifications);
-      const unread = userNotifications.filter(n => !n.read).length;
-      setUnreadCount(unread);
+      const data = await notificationsAPI.getNotifications();
+      setNotifications(data.results);
+      setUnreadCount(data.unread_count);
     } catch (error) {
       console.error('Failed to load notifications:', error);
     }
@@ -203,7 +206,7 @@ const Header = () => {
               <Avatar
                 sx={{ width: 32, height: 32, cursor: 'pointer' }}
                 onClick={handleProfileMenuOpen}
-                src={user.photo}
+                src={apiUtils.photoUrl(user, 64)}
               >
                 {user.photo ? null : (user.name ? user.name.charAt(0) : (user.email ? user.email.charAt(0) : 'U'))}
               </Avatar>
@@ -44,10 +44,24 @@ import {
   Edit,
   Search as SearchIcon,
 } from '@mui/icons-material';
-import { adminAPI } from '../services/apiService';
+import { adminAPI, apiUtils } from '../services/apiService';
 
 const drawerWidth = 240;
 
+// Total and "Load more" below a keyset-paginated admin list
+const ListFooter = ({ shown, page, loading, noun, onLoadMore }) => (
+  <Box sx={{ display: 'flex', alignItems: 'center', justifyContent: 'space-between', mt: 2 }}>
+    <Typography variant="body2" color="text.secondary">
+      Showing {shown} of {page.count_exact ? '' : 'about '}{page.count.toLocaleString()} {noun}
+    </Typography>
+    {page.next_cursor && (
+      <Button variant="outlined" onClick={onLoadMore} disabled={loading}>
+        {loading ? 'Loading...' : 'Load more'}
+      </Button>
+    )}
+  </Box>
+);
+
 const sections = [
   { label: 'User Management', icon: <People /> },
   { label: 'Skill Moderation', icon: <Warning /> },
@@ -60,19 +74,25 @@ const AdminPanel = () => {
   const [selectedSection, setSelectedSection] = useState(0);
   // User Management state
   const [users, setUsers] = useState([]);
+  const [usersPage, setUsersPage] = useState({ next_cursor: null, count: 0, count_exact: true });
   const [loading, setLoading] = useState(false);
   const [search, setSearch] = useState('');
+  // The search that produced the rows shown; Load more pages through it, not the text field
+  const [usersQuery, setUsersQuery] = useState('');
   const [snackbar, setSnackbar] = useState({ open: false, message: '', severity: 'success' });
   const [unauthorized, setUnauthorized] = useState(false);
 
   // Skill Moderation state
   const [skills, setSkills] = useState([]);
+  const [skillsPage, setSkillsPage] = useState({ next_cursor: null, count: 0, count_exact: true });
   const [skillsLoading, setSkillsLoading] = useState(false);
   const [skillSearch, setSkillSearch] = useState('');
+  const [skillsQuery, setSkillsQuery] = useState('');
   const [skillSnackbar, setSkillSnackbar] = useState({ open: false, message: '', severity: 'success' });
 
   // Swap Monitoring state
   const [swaps, setSwaps] = useState([]);
+  const [swapsPage, setSwapsPage] = useState({ next_cursor: null, count: 0, count_exact: true });
   const [swapsLoading, setSwapsLoading] = useState(false);
   const [swapStatus, setSwapStatus] = useState('');
   const [swapSnackbar, setSwapSnackbar] = useState({ open: false, message: '', severity: 'success' });
@@ -100,15 +120,18 @@ const AdminPanel = () => {
     // eslint-disable-next-line
   }, [selectedSection]);
 
-  const fetchUsers = async (searchTerm = '') => {
+  // With a cursor, the next page is appended to the rows already shown
+  const fetchUsers = async (searchTerm = '', cursor = null) => {
     setLoading(true);
     try {
-      const data = await adminAPI.getAllUsers(searchTerm);
+      const data = await adminAPI.getAllUsers({ search: searchTerm, cursor });
       if (data && data.error === 'Unauthorized access') {
         setUnauthorized(true);
         setUsers([]);
       } else {
-        setUsers(data);
+        setUsers(prev => (cursor ? [...prev, ...data.results] : data.results));
+        setUsersPage(data);
+        if (!cursor) setUsersQuery(searchTerm);
       }
     } catch (err) {
       setUnauthorized(true);
@@ -121,17 +144,19 @@ const AdminPanel = () => {
     try {
       await adminAPI.toggleUserBan(userId, isBanned);
       setSnackbar({ open: true, message: `User ${isBanned ? 'banned' : 'unbanned'} successfully!`, severity: 'success' });
-      fetchUsers(search);
+      fetchUsers(usersQuery);
     } catch (err) {
       setSnackbar({ open: true, message: 'Failed to update user status', severity: 'error' });
     }
   };
 
-  const fetchSkills = async (searchTerm = '') => {
+  const fetchSkills = async (searchTerm = '', cursor = null) => {
     setSkillsLoading(true);
     try {
-      const data = await adminAPI.getAllSkills(searchTerm);
-      setSkills(data);
+      const data = await adminAPI.getAllSkills({ search: searchTerm, cursor });
+      setSkills(prev => (cursor ? [...prev, ...data.results] : data.results));
+      setSkillsPage(data);
+      if (!cursor) setSkillsQuery(searchTerm);
     } catch (err) {
       setSkillSnackbar({ open: true, message: 'Failed to load skills', severity: 'error' });
     } finally {
@@ -143,17 +168,18 @@ const AdminPanel = () => {
     try {
       await adminAPI.deleteSkill(skillId);
       setSkillSnackbar({ open: true, message: 'Skill rejected (deleted) successfully!', severity: 'success' });
-      fetchSkills(skillSearch);
+      fetchSkills(skillsQuery);
     } catch (err) {
       setSkillSnackbar({ open: true, message: 'Failed to reject skill', severity: 'error' });
     }
   };
 
-  const fetchSwaps = async (status = '') => {
+  const fetchSwaps = async (status = '', cursor = null) => {
     setSwapsLoading(true);
     try {
-      const data = await adminAPI.getAllSwaps(status);
-      setSwaps(data);
+      const data = await adminAPI.getAllSwaps({ status, cursor });
+      setSwaps(prev => (cursor ? [...prev, ...data.results] : data.results));
+      setSwapsPage(data);
     } catch (err) {
       setSwapSnackbar({ open: true, message: 'Failed to load swaps', severity: 'error' });
     } finally {
@@ -187,7 +213,7 @@ const AdminPanel = () => {
 
       setMessageSnackbar({ 
         open: true, 
-        message: `Message sent successfully to ${response.users_notified} users!`, 
+        message: `"${response.broadcast.title}" was sent to all users!`, 
         severity: 'success' 
       });
 
@@ -251,7 +277,7 @@ const AdminPanel = () => {
         />
         <Button variant="outlined" onClick={() => fetchUsers(search)}>Search</Button>
       </Box>
-      {loading ? (
+      {loading && users.length === 0 ? (
         <Box sx={{ display: 'flex', justifyContent: 'center', py: 4 }}>
           <CircularProgress />
         </Box>
@@ -272,7 +298,7 @@ const AdminPanel = () => {
                 <TableRow key={user.id}>
                   <TableCell>
                     <Stack direction="row" alignItems="center" spacing={1}>
-                      <Avatar src={user.photo} />
+                      <Avatar src={apiUtils.photoUrl(user, 64)} />
                       <Box>
                         <Typography variant="subtitle2">{user.name || user.username}</Typography>
                         <Typography variant="body2" color="text.secondary">{user.username}</Typography>
@@ -305,6 +331,13 @@ const AdminPanel = () => {
           </Table>
         </TableContainer>
       )}
+      <ListFooter
+        shown={users.length}
+        page={usersPage}
+        loading={loading}
+        noun="users"
+        onLoadMore={() => fetchUsers(usersQuery, usersPage.next_cursor)}
+      />
       <Snackbar
         open={snackbar.open}
         autoHideDuration={4000}
@@ -333,7 +366,7 @@ const AdminPanel = () => {
         />
         <Button variant="outlined" onClick={() => fetchSkills(skillSearch)}>Search</Button>
       </Box>
-      {skillsLoading ? (
+      {skillsLoading && skills.length === 0 ? (
         <Box sx={{ display: 'flex', justifyContent: 'center', py: 4 }}>
           <CircularProgress />
         </Box>
@@ -369,6 +402,13 @@ const AdminPanel = () => {
           </Table>
         </TableContainer>
       )}
+      <ListFooter
+        shown={skills.length}
+        page={skillsPage}
+        loading={skillsLoading}
+        noun="skills"
+        onLoadMore={() => fetchSkills(skillsQuery, skillsPage.next_cursor)}
+      />
       <Snackbar
         open={skillSnackbar.open}
         autoHideDuration={4000}
@@ -401,7 +441,7 @@ const AdminPanel = () => {
           <MenuItem value="completed">Completed</MenuItem>
         </TextField>
       </Box>
-      {swapsLoading ? (
+      {swapsLoading && swaps.length === 0 ? (
         <Box sx={{ display: 'flex', justifyContent: 'center', py: 4 }}>
           <CircularProgress />
         </Box>
@@ -440,6 +480,13 @@ const AdminPanel = () => {
           </Table>
         </TableContainer>
       )}
+      <ListFooter
+        shown={swaps.length}
+        page={swapsPage}
+        loading={swapsLoading}
+        noun="swaps"
+        onLoadMore={() => fetchSwaps(swapStatus, swapsPage.next_cursor)}
+      />
       <Snackbar
         open={swapSnackbar.open}
         autoHideDuration={4000}
@@ -28,7 +28,7 @@ import {
 import { Search, LocationOn, Star, Schedule } from '@mui/icons-material';
 import { useNavigate } from 'react-router-dom';
 import { useAuth } from '../context/AuthContext';
-import { userAPI, swapAPI, skillsAPI } from '../services/apiService';
+import { userAPI, swapAPI, skillsAPI, apiUtils } from '../services/apiService';
 
 const Browse = () => {
   const { user, isAuthenticated } = useAuth();
@@ -43,20 +43,43 @@ const Browse = () => {
   const [loading, setLoading] = useState(true);
   const usersPerPage = 3;
 
-  // Load users and skills on component mount
+  // Cursor for each page visited so far; cursors[0] is the first page
+  const [cursors, setCursors] = useState([null]);
+  const [nextCursor, setNextCursor] = useState(null);
+
+  // Load skills once on mount
   useEffect(() => {
-    loadData();
+    skillsAPI.getSkills()
+      .then(skillsData => setSkills(skillsData.results || skillsData))
+      .catch(error => console.error('Failed to load skills:', error));
   }, []);
 
-  const loadData = async () => {
+  // Restart from the first page whenever the filters change
+  useEffect(() => {
+    setCursors([null]);
+    setPage(1);
+  }, [searchTerm, availability]);
+
+  // Fetch the current page from the server-side search
+  useEffect(() => {
+    const timer = setTimeout(() => loadUsers(cursors[page - 1]), 250);
+    return () => clearTimeout(timer);
+  }, [searchTerm, availability, page, cursors]);
+
+  const loadUsers = async (cursor) => {
     try {
       setLoading(true);
-      const [usersData, skillsData] = await Promise.all([
-        userAPI.getUsers(),
-        skillsAPI.getSkills()
-      ]);
-      setUsers(usersData.results || usersData);
-      setSkills(skillsData.results || skillsData);
+      const data = await userAPI.searchUsers({
+        q: searchTerm.trim(),
+        availability,
+        limit: usersPerPage,
+        cursor,
+      });
+      setUsers(data.results);
+      setNextCursor(data.next_cursor);
+      if (data.next_cursor) {
+        setCursors(prev => (prev.length > page ? prev : [...prev, data.next_cursor]));
+      }
     } catch (error) {
       console.error('Failed to load data:', error);
       setSnackbar({ open: true, message: 'Failed to load users', severity: 'error' });
@@ -65,22 +88,8 @@ const Browse = () => {
     }
   };
 
-  // Filter by search and availability
-  const filteredUsers = users.filter(user => {
-    const matchesSearch = !searchTerm || 
-      user.username.toLowerCase().includes(searchTerm.toLowerCase()) ||
-      user.skills_offered.some(skill => skill.name.toLowerCase().includes(searchTerm.toLowerCase())) ||
-      user.skills_wanted.some(skill => skill.name.toLowerCase().includes(searchTerm.toLowerCase()));
-    
-    const matchesAvailability = !availability || 
-      (user.availability && user.availability.includes(availability));
-    
-    return matchesSearch && matchesAvailability;
-  });
-
-  // Pagination
-  const pageCount = Math.ceil(filteredUsers.length / usersPerPage);
-  const paginatedUsers = filteredUsers.slice((page - 1) * usersPerPage, page * usersPerPage);
+  // Pages visited so far, plus one more if the server reported a next cursor
+  const pageCount = nextCursor ? Math.max(cursors.length, page + 1) : page;
 
   const navigate = useNavigate();
 
@@ -160,14 +169,14 @@ const Browse = () => {
         </Box>
       ) : (
         <Stack spacing={3}>
-          {paginatedUsers.length === 0 ? (
+          {users.length === 0 ? (
             <Typography variant="h6" textAlign="center" color="text.secondary" sx={{ py: 4 }}>
               No users found matching your criteria.
             </Typography>
           ) : (
-            paginatedUsers.map(user => (
+            users.map(user => (
               <Card key={user.id} sx={{ p: 2, display: 'flex', alignItems: 'center' }}>
-                <Avatar sx={{ width: 64, height: 64, mr: 3 }} src={user.photo}>
+                <Avatar sx={{ width: 64, height: 64, mr: 3 }} src={apiUtils.photoUrl(user, 128)}>
                   {user.photo ? null : user.username.charAt(0).toUpperCase()}
                 </Avatar>
                 <Box sx={{ flex: 1 }}>
@@ -40,7 +40,7 @@ import {
 } from '@mui/icons-material';
 import { useNavigate } from 'react-router-dom';
 import { useAuth } from '../context/AuthContext';
-import { swapAPI, userSkillsAPI, notificationsAPI } from '../services/apiService';
+import { swapAPI, userSkillsAPI, notificationsAPI, apiUtils } from '../services/apiService';
 
 const Dashboard = () => {
   const navigate = useNavigate();
@@ -132,7 +132,7 @@ const Dashboard = () => {
           },
         ];
         
-        notificationsData = [
+        notificationsData = { results: [
           {
             id: 1,
             type: 'swap_request',
@@ -154,7 +154,7 @@ const Dashboard = () => {
             time: '2 days ago',
             read: true,
           },
-        ];
+        ], next_cursor: null, unread_count: 1 };
       }
 
       // Set stats
@@ -218,7 +218,8 @@ const Dashboard = () => {
         };
       });
       setRecentSwaps(mappedRecentSwaps);
-      setNotifications(notificationsData);
+      // The feed endpoint returns { results, next_cursor, unread_count }
+      setNotifications(notificationsData.results);
     } catch (err) {
       console.error('Failed to load dashboard data:', err);
       setError('Failed to load dashboard data. Please try again.');
@@ -347,7 +348,7 @@ const Dashboard = () => {
               <Box sx={{ display: 'flex', alignItems: 'center', mb: 3 }}>
                 <Avatar
                   sx={{ width: 64, height: 64, mr: 2 }}
-                  src={user?.photo}
+                  src={apiUtils.photoUrl(user, 128)}
                 >
                   {user?.photo ? null : (user?.name ? user.name.charAt(0) : (user?.email ? user.email.charAt(0) : 'U'))}
                 </Avatar>
@@ -525,7 +526,7 @@ const Dashboard = () => {
                   
       <List>
                     {notifications.map((notification, index) => (
-                      <React.Fragment key={notification.id}>
+                      <React.Fragment key={`${notification.kind}-${notification.id}`}>
         <ListItem>
                           <ListItemAvatar>
                             <Badge
@@ -540,7 +541,7 @@ const Dashboard = () => {
                           </ListItemAvatar>
                           <ListItemText
                             primary={notification.message}
-                            secondary={notification.time}
+                            secondary={notification.time || (notification.created_at && new Date(notification.created_at).toLocaleString())}
                           />
         </ListItem>
                         {index < notifications.length - 1 && <Divider />}
@@ -28,7 +28,7 @@ const NotificationsPage = () => {
       setError('');
       try {
         const data = await notificationsAPI.getNotifications();
-        setNotifications(data);
+        setNotifications(data.results);
       } catch (err) {
         setError('Failed to load notifications');
       } finally {
@@ -60,7 +60,7 @@ const NotificationsPage = () => {
         ) : (
           <List>
             {notifications.map((n, idx) => (
-              <React.Fragment key={n.id || idx}>
+              <React.Fragment key={n.id ? `${n.kind}-${n.id}` : idx}>
                 <ListItem alignItems="flex-start">
                   <ListItemIcon>
                     {n.read ? (
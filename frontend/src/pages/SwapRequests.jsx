@@ -114,6 +114,10 @@ const SwapRequests = () => {
   const [filter, setFilter] = useState('All');
   const [page, setPage] = useState(1);
   const [requests, setRequests] = useState([]);
+  const [counts, setCounts] = useState({ sent: {}, received: {} });
+  // Cursor for each page visited so far; cursors[0] is the first page
+  const [cursors, setCursors] = useState([null]);
+  const [nextCursor, setNextCursor] = useState(null);
   const [loading, setLoading] = useState(true);
   const [activeTab, setActiveTab] = useState(0); // 0 = Received, 1 = Sent
   const [ratingDialog, setRatingDialog] = useState({ open: false, swapId: null, otherUser: null });
@@ -128,11 +132,21 @@ const SwapRequests = () => {
       return;
     }
     
-    loadSwapRequests();
     // Mark notifications as read when user visits the swap requests page
     markNotificationsAsRead();
   }, [user]);
 
+  useEffect(() => {
+    if (isAuthenticated()) {
+      loadSwapRequests();
+    }
+  }, [user, activeTab, filter, page, cursors]);
+
+  const resetPages = () => {
+    setPage(1);
+    setCursors([null]);
+  };
+
   const markNotificationsAsRead = async () => {
     try {
       await notificationsAPI.markAllAsRead();
@@ -143,14 +157,24 @@ const SwapRequests = () => {
 
   const handleTabChange = (event, newValue) => {
     setActiveTab(newValue);
-    setPage(1); // Reset to first page when switching tabs
+    resetPages(); // Reset to first page when switching tabs
   };
 
   const loadSwapRequests = async () => {
     try {
       setLoading(true);
-      const userRequests = await swapAPI.getSwapRequests();
-      setRequests(userRequests.results || userRequests);
+      const data = await swapAPI.getSwapRequests({
+        direction: activeTab === 0 ? 'received' : 'sent',
+        status: filter === 'All' ? '' : filter,
+        limit: requestsPerPage,
+        cursor: cursors[page - 1],
+      });
+      setRequests(data.results);
+      setCounts(data.counts);
+      setNextCursor(data.next_cursor);
+      if (data.next_cursor) {
+        setCursors(prev => (prev.length > page ? prev : [...prev, data.next_cursor]));
+      }
     } catch (error) {
       console.error('Failed to load swap requests:', error);
       setSnackbar({ open: true, message: 'Failed to load swap requests', severity: 'error' });
@@ -159,25 +183,12 @@ const SwapRequests = () => {
     }
   };
 
-  // Separate received and sent requests
-  const receivedRequests = requests.filter(req => req.to_user.id === user.id);
-  const sentRequests = requests.filter(req => req.from_user.id === user.id);
+  // The server filters by tab and status; counts cover every status
+  const countFor = (direction) => counts[direction][filter === 'All' ? 'all' : filter] || 0;
+  const paginatedRequests = requests;
 
-  // Filter based on active tab and status filter
-  const getFilteredRequests = () => {
-    const tabRequests = activeTab === 0 ? receivedRequests : sentRequests;
-    return filter === 'All' 
-      ? tabRequests 
-      : tabRequests.filter((req) => req.status === filter);
-  };
-
-  const filteredRequests = getFilteredRequests();
-
-  const pageCount = Math.ceil(filteredRequests.length / requestsPerPage);
-  const paginatedRequests = filteredRequests.slice(
-    (page - 1) * requestsPerPage,
-    page * requestsPerPage
-  );
+  // Pages visited so far, plus one more if the server reported a next cursor
+  const pageCount = nextCursor ? Math.max(cursors.length, page + 1) : page;
 
   const handleAccept = async (id) => {
     try {
@@ -257,7 +268,7 @@ const SwapRequests = () => {
             label="Status"
             onChange={(e) => {
               setFilter(e.target.value);
-              setPage(1);
+              resetPages();
             }}
           >
             <MenuItem value="All">All</MenuItem>
@@ -275,12 +286,12 @@ const SwapRequests = () => {
       <Box sx={{ borderBottom: 1, borderColor: 'divider', mb: 3 }}>
         <Tabs value={activeTab} onChange={handleTabChange} aria-label="swap request tabs">
           <Tab 
-            label={`Received (${filter === 'All' ? receivedRequests.length : receivedRequests.filter(req => req.status === filter).length})`} 
+            label={`Received (${countFor('received')})`} 
             id="tab-0"
             aria-controls="tabpanel-0"
           />
           <Tab 
-            label={`Sent (${filter === 'All' ? sentRequests.length : sentRequests.filter(req => req.status === filter).length})`} 
+            label={`Sent (${countFor('sent')})`} 
             id="tab-1"
             aria-controls="tabpanel-1"
           />
@@ -307,12 +318,12 @@ const SwapRequests = () => {
               
               return (
                 <Card key={req.id} sx={{ p: 2, display: 'flex', alignItems: 'center', borderRadius: 3, border: '1px solid #ccc' }}>
-                  <Avatar sx={{ width: 64, height: 64, mr: 3 }} src={otherUser.photo}>
-                    {!otherUser.photo && otherUser.username.charAt(0).toUpperCase()}
+                  <Avatar sx={{ width: 64, height: 64, mr: 3 }} src={otherUser.avatar}>
+                    {!otherUser.avatar && otherUser.username.charAt(0).toUpperCase()}
                   </Avatar>
                   <Box sx={{ flex: 1 }}>
                     <Typography variant="h6" sx={{ mb: 1 }}>
-                      {otherUser.first_name} {otherUser.last_name}
+                      {otherUser.name}
                     </Typography>
                     <Box sx={{ display: 'flex', gap: 1, flexWrap: 'wrap', mb: 1 }}>
                       <Typography variant="body2" color="text.secondary">
@@ -93,6 +93,14 @@ export const userAPI = {
     const params = new URLSearchParams(filters);
     return apiRequest(`/users/list/?${params}`);
   },
+
+  // Ranked, cursor-paginated directory search (q, skills, match, availability, location, cursor)
+  searchUsers: async (filters = {}) => {
+    const params = new URLSearchParams(
+      Object.entries(filters).filter(([, value]) => value !== undefined && value !== null && value !== '')
+    );
+    return apiRequest(`/users/search/?${params}`);
+  },
 };
 
 // Skills API
@@ -114,9 +122,12 @@ export const skillsAPI = {
 
 // Swap Requests API
 export const swapAPI = {
-  // Get user's swap requests (sent and received)
-  getSwapRequests: async () => {
-    return apiRequest('/swaps/');
+  // Get one page of the user's swap inbox (direction, status, cursor, limit)
+  getSwapRequests: async (filters = {}) => {
+    const params = new URLSearchParams(
+      Object.entries(filters).filter(([, value]) => value !== undefined && value !== null && value !== '')
+    );
+    return apiRequest(`/swaps/?${params}`);
   },
 
   // Create new swap request
@@ -216,10 +227,12 @@ export const userSkillsAPI = {
 
 // Admin API
 export const adminAPI = {
-  // Get all users (admin only)
-  getAllUsers: async (search = '') => {
-    const params = search ? `?search=${encodeURIComponent(search)}` : '';
-    return apiRequest(`/users/admin/users/${params}`);
+  // Get a page of users (admin only; search, is_active, is_staff, ordering, cursor)
+  getAllUsers: async (filters = {}) => {
+    const params = new URLSearchParams(
+      Object.entries(filters).filter(([, value]) => value !== undefined && value !== null && value !== '')
+    );
+    return apiRequest(`/users/admin/users/?${params}`);
   },
 
   // Get platform statistics
@@ -253,10 +266,12 @@ export const adminAPI = {
     });
   },
 
-  // Get all skills (admin only)
-  getAllSkills: async (search = '') => {
-    const params = search ? `?search=${encodeURIComponent(search)}` : '';
-    return apiRequest(`/skills/admin/${params}`);
+  // Get a page of skills (admin only; search, level, ordering, cursor)
+  getAllSkills: async (filters = {}) => {
+    const params = new URLSearchParams(
+      Object.entries(filters).filter(([, value]) => value !== undefined && value !== null && value !== '')
+    );
+    return apiRequest(`/skills/admin/?${params}`);
   },
 
   // Delete (reject) a skill
@@ -267,10 +282,12 @@ export const adminAPI = {
     });
   },
 
-  // Get all swaps (admin only)
-  getAllSwaps: async (status = '') => {
-    const params = status ? `?status=${encodeURIComponent(status)}` : '';
-    return apiRequest(`/swaps/admin/${params}`);
+  // Get a page of swaps (admin only; status, user, ordering, cursor)
+  getAllSwaps: async (filters = {}) => {
+    const params = new URLSearchParams(
+      Object.entries(filters).filter(([, value]) => value !== undefined && value !== null && value !== '')
+    );
+    return apiRequest(`/swaps/admin/?${params}`);
   },
 
   // Send platform-wide message
@@ -311,9 +328,15 @@ export const adminAPI = {
 
 // Notifications API
 export const notificationsAPI = {
-  // Get user notifications
-  getNotifications: async () => {
-    return apiRequest('/users/notifications/');
+  // Get a page of notifications ({ results, next_cursor, unread_count })
+  getNotifications: async (cursor = null) => {
+    const params = cursor ? `?cursor=${encodeURIComponent(cursor)}` : '';
+    return apiRequest(`/users/notifications/${params}`);
+  },
+
+  // Get the unread notification count
+  getUnreadCount: async () => {
+    return apiRequest('/users/notifications/unread-count/');
   },
 
   // Mark specific notification as read
@@ -330,6 +353,51 @@ export const notificationsAPI = {
       method: 'POST',
     });
   },
+
+  // Subscribe to pushed notification events (Server-Sent Events); returns an unsubscribe function.
+  // Each connection uses a single-use ticket, so a dropped stream reconnects with a fresh one.
+  // Does nothing when the server does not offer push (for example under a WSGI server).
+  subscribe: (onEvent) => {
+    if (!getAuthToken() || typeof EventSource === 'undefined') {
+      return () => {};
+    }
+    let source = null;
+    let retryTimer = null;
+    let closed = false;
+
+    const connect = async () => {
+      let ticket;
+      try {
+        ({ ticket } = await apiRequest('/users/notifications/stream/ticket/', { method: 'POST' }));
+      } catch (error) {
+        // Push unavailable or not signed in; the feed still loads on demand
+        return;
+      }
+      if (closed) {
+        return;
+      }
+      source = new EventSource(`${API_BASE_URL}/users/notifications/stream/?ticket=${encodeURIComponent(ticket)}`);
+      ['notification', 'broadcast', 'unread_count'].forEach(type => {
+        source.addEventListener(type, (event) => onEvent(JSON.parse(event.data)));
+      });
+      source.onerror = () => {
+        // The browser would retry with the spent ticket; reconnect with a new one instead
+        source.close();
+        if (!closed) {
+          retryTimer = setTimeout(connect, 5000);
+        }
+      };
+    };
+
+    connect();
+    return () => {
+      closed = true;
+      clearTimeout(retryTimer);
+      if (source) {
+        source.close();
+      }
+    };
+  },
 };
 
 // Utility functions
@@ -345,6 +413,14 @@ export const apiUtils = {
     localStorage.removeItem('refreshToken');
   },
 
+  // Smallest processed photo variant of at least `size` px, falling back to the original
+  photoUrl: (user, size) => {
+    const variants = user?.photo_variants || {};
+    const sizes = Object.keys(variants).map(Number).sort((a, b) => a - b);
+    const best = sizes.find(s => s >= size) || sizes[sizes.length - 1];
+    return best ? (variants[best].webp || variants[best].jpeg) : user?.photo;
+  },
+
   // Set tokens after login
   setTokens: (accessToken, refreshToken) => {
     localStorage.setItem('authToken', accessToken);